@@ -1,22 +1,22 @@
 from fastapi import APIRouter, HTTPException
-from backend.database.utils import read_dataframe_from_db, get_table_name_for_dataset
-from backend.ml.auto_profiler import generate_ml_profile
+from backend.database.utils import get_table_name_for_dataset
+from backend.ml.profiling import profile_table
 
 from backend.ml.chart_rules import recommend_chart_types
+from backend.utils.executors import PoolSaturated, run_cpu, run_io
 
 router = APIRouter(tags=["charts"])
 
 @router.get("/charts")
-def recommend_charts_api(dataset_id: str):
+async def recommend_charts_api(dataset_id: str):
     """
     Recommends chart types based on the dataset's profile.
     """
     try:
-        table_name = get_table_name_for_dataset(dataset_id)
+        table_name = await run_io(get_table_name_for_dataset, dataset_id)
         
-        df = read_dataframe_from_db(table_name)
-        
-        profile = generate_ml_profile(df)
+        # Shares the cached profile with /profile
+        profile = await run_cpu(profile_table, table_name)
         
         charts = recommend_chart_types(profile)
         
@@ -26,5 +26,7 @@ def recommend_charts_api(dataset_id: str):
             "charts": charts
         }
         
+    except PoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -26,6 +26,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from backend.database.utils import read_dataframe_from_db, get_table_name_for_dataset
+from backend.utils.executors import run_io
 
 router = APIRouter(tags=["charts"])
 
@@ -36,14 +37,14 @@ class ChartRequest(BaseModel):
     chart_type: str
 
 @router.post("/charts/plot")
-def plot_chart(req: ChartRequest):
-    table = get_table_name_for_dataset(req.dataset_id)
+async def plot_chart(req: ChartRequest):
+    table = await run_io(get_table_name_for_dataset, req.dataset_id)
     if not table:
         raise HTTPException(status_code=404, detail="Dataset not found")
 
-    df = read_dataframe_from_db(table)
-
-    if req.x not in df.columns or req.y not in df.columns:
+    try:
+        df = await run_io(read_dataframe_from_db, table, columns=[req.x, req.y])
+    except ValueError:
         raise HTTPException(status_code=400, detail="Invalid columns")
 
     return {
@@ -1,15 +1,18 @@
 from fastapi import APIRouter, HTTPException
 from backend.database.utils import get_columns_for_dataset
+from backend.utils.executors import PoolSaturated, run_io
 
 router = APIRouter(tags=["columns"])
 
 @router.get("/columns")
-def list_columns(dataset_id: str):
+async def list_columns(dataset_id: str):
     try:
         return {
             "dataset_id": dataset_id,
-            "columns": get_columns_for_dataset(dataset_id)
+            "columns": await run_io(get_columns_for_dataset, dataset_id)
         }
+    except PoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -2,17 +2,18 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any
 
 from backend.database.utils import get_dataset_metadata, delete_dataset
+from backend.utils.executors import run_io
 
 router = APIRouter(tags=["datasets"])
 
 
 @router.get("/datasets/{dataset_id}")#(, response_model=List[Dict[str, Any]])
-def get_datasets(dataset_id: str):
+async def get_datasets(dataset_id: str):
     """
     GET /v1/datasets/{dataset_id}
     Returns all datasets from the registry
     """
-    dataset = get_dataset_metadata(dataset_id)
+    dataset = await run_io(get_dataset_metadata, dataset_id)
     
     if not dataset:
         raise HTTPException(status_code=404, detail="Dataset not found")
@@ -26,12 +27,12 @@ def get_datasets(dataset_id: str):
     }
     
 @router.delete("/datasets/{dataset_id}")
-def delete_datasets(dataset_id: str):
+async def delete_datasets(dataset_id: str):
     """
     DELETE /v1/datasets/{dataset_id}
     Deletes a dataset from the registry
     """
-    success = delete_dataset(dataset_id)
+    success = await run_io(delete_dataset, dataset_id)
     
     if not success:
         raise HTTPException(status_code=404, detail="Dataset not found or could not be deleted")
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Dict, Any
-from backend.ml.insights_engine import generate_insights
+from typing import List, Dict, Any, Optional
+from backend.ml.insights_engine import generate_insights, MAX_CATEGORY_LEVELS
+from backend.utils.executors import PoolSaturated, run_cpu
 
 router = APIRouter(tags=["insights"])
 
@@ -14,13 +15,28 @@ class InsightsResponse(BaseModel):
     correlations: Dict[str, Any]
     category_insights: Dict[str, Any]
     extremes: Dict[str, Any]
+    approximate: bool = False
+    approximation: Optional[Dict[str, Any]] = None
 
 
 @router.post("/insights/{dataset_id}", response_model=InsightsResponse)
-async def insights_auto(dataset_id: str):
+async def insights_auto(
+    dataset_id: str,
+    category_aggs: List[str] = Query(["mean"], description="Per-category aggregates: mean, count, sum, std"),
+    max_categories: int = Query(MAX_CATEGORY_LEVELS, ge=1, description="Skip text columns with more distinct values"),
+    group_engine: str = Query("numpy", description="numpy (factorized codes) or sqlite (GROUP BY pushdown)"),
+    approximate: bool = Query(False, description="Stream the table through sketches; quantiles carry error bounds"),
+):
     try:
         # insights = generate_insights(dataset_id)
-        return generate_insights(dataset_id)
+        return await run_cpu(
+            generate_insights,
+            dataset_id,
+            category_aggregations=category_aggs,
+            max_categories=max_categories,
+            group_engine=group_engine,
+            approximate=approximate,
+        )
 
         # return InsightsResponse(
         #     dataset_id=dataset_id,
@@ -28,5 +44,9 @@ async def insights_auto(dataset_id: str):
         # )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
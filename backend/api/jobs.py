@@ -0,0 +1,69 @@
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+
+from backend.jobs import store
+from backend.jobs.runner import submit_job
+from backend.utils.executors import run_io
+
+router = APIRouter(tags=["jobs"])
+
+
+class JobRequest(BaseModel):
+    dataset_id: str
+    params: Dict[str, Any] = {}
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: str
+    deduplicated: bool
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    dataset_id: Optional[str]
+    status: str
+    progress: float
+    message: Optional[str]
+    error: Optional[str]
+    created_at: Optional[str]
+    started_at: Optional[str]
+    finished_at: Optional[str]
+
+
+@router.post("/jobs/{kind}", response_model=JobSubmitResponse, status_code=202)
+async def create_job(kind: str, req: JobRequest) -> JobSubmitResponse:
+    """
+    POST /v1/api/jobs/{profile|insights|clean|report}
+    Queues the work in a worker process. An identical job that is still
+    queued or running is returned instead of starting a new one.
+    """
+    try:
+        job, created = await run_io(submit_job, kind, req.dataset_id, req.params)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JobSubmitResponse(job_id=job["job_id"], status=job["status"], deduplicated=not created)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def job_status(job_id: str) -> JobStatusResponse:
+    """GET /v1/api/jobs/{job_id}: status and progress (0..1) of a job"""
+    job = await run_io(store.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatusResponse(**job)
+
+
+@router.get("/jobs/{job_id}/result")
+async def job_result(job_id: str) -> Dict[str, Any]:
+    """GET /v1/api/jobs/{job_id}/result: the job's result once it has succeeded"""
+    job = await run_io(store.get_job, job_id, include_result=True)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] == store.FAILED:
+        raise HTTPException(status_code=500, detail=job["error"] or "Job failed")
+    if job["status"] != store.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']} ({job['progress']:.0%})")
+    return {"job_id": job_id, "kind": job["kind"], "result": job["result"]}
@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+
+from backend.database.nlq_cache import nlq_cache_stats
+from backend.database.pool import pool_metrics
+from backend.database.query_cache import query_cache_stats
+from backend.database.result_stream import cursor_metrics
+from backend.database.result_cache import result_cache_stats
+from backend.database.running_queries import running_query_metrics
+from backend.database.schema_store import schema_cache_stats
+from backend.utils.executors import executor_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics")
+def get_metrics():
+    """
+    GET /v1/api/metrics
+    Returns runtime metrics for the database pool, request executors and in-process caches
+    """
+    return {
+        "db_pool": pool_metrics(),
+        "executors": executor_metrics(),
+        "nlq_cursors": cursor_metrics(),
+        "queries": running_query_metrics(),
+        "caches": {
+            "schema": schema_cache_stats(),
+            "results": result_cache_stats(),
+            "nlq_indexes": nlq_cache_stats(),
+            "query_results": query_cache_stats(),
+        },
+    }
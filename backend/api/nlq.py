@@ -1,7 +1,22 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
-from backend.ml.nlq_engine import run_nlq
+from starlette.concurrency import iterate_in_threadpool
+from typing import Dict, Any, AsyncIterator, Callable, Iterator, List, Optional
+from backend.config import NLQ_MAX_PAGE_SIZE, NLQ_PAGE_SIZE, NLQ_STREAM_BATCH_ROWS, QUERY_DISCONNECT_POLL_SECONDS
+from backend.database.nlq_cache import nlq_cache_report
+from backend.database.result_stream import (
+    ResultCursor,
+    close_cursor,
+    encode_json,
+    fetch_page,
+    iter_ndjson,
+    register_cursor,
+)
+from backend.database.running_queries import QueryCancelled, QueryScope, cancel_query, query_scope
+from backend.ml.nlq_engine import prepare_nlq, remember_nlq, run_nlq
+from backend.utils.executors import PoolSaturated, run_io
 import traceback
 
 router = APIRouter(tags=["nlq"])
@@ -19,20 +34,143 @@ class NLQResponse(BaseModel):
     columns: List[str]
     rows: List[Any]
     row_count: int
+    truncated: bool = False  # More rows than NLQ_JSON_MAX_ROWS; use mode=stream or mode=page for all of them
+    cache: Optional[str] = None  # "exact" | "semantic" when the SQL came from the NL-to-SQL cache
+    result_cached: bool = False  # Rows served from the query result cache
 
 
 
 @router.post("/nlq/run", response_model=NLQResponse)
-async def nlq_run(req: NLQRequest):
+async def nlq_run(
+    req: NLQRequest,
+    request: Request,
+    mode: str = Query("json", description="json | stream (NDJSON) | page (server-side cursor)"),
+    page_size: int = Query(NLQ_PAGE_SIZE, ge=1, le=NLQ_MAX_PAGE_SIZE),
+):
+    """
+    POST /v1/api/nlq/run
+    - json: one response with up to NLQ_JSON_MAX_ROWS rows (`truncated` if there are more)
+    - stream: application/x-ndjson; a meta object with the columns, one JSON
+      array per row, then {"row_count", "truncated"}
+    - page: the first page plus a `cursor` token for GET /nlq/cursor/{token}
+
+    The query is cancelled if the client disconnects before the response.
+    """
+    if mode not in ("json", "stream", "page"):
+        raise HTTPException(status_code=400, detail={"error": f"Unknown mode '{mode}'"})
     try:
-        return NLQResponse(**run_nlq(req.dataset_id, req.question))
+        with query_scope(f"nlq:{req.dataset_id}") as scope:
+            # Mostly waits on the LLM and SQLite, so it runs on the io pool
+            if mode == "json":
+                return NLQResponse(**await _run_until_disconnect(request, scope, run_nlq, req.dataset_id, req.question))
+
+            prepared = await _run_until_disconnect(request, scope, prepare_nlq, req.dataset_id, req.question)
+            # Executed before the response starts, so a failing statement is still an HTTP error
+            cursor = await _run_until_disconnect(request, scope, _open_cursor, prepared, req.question)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Dataset not found")
     except ValueError as e:
         raise HTTPException(status_code=400, detail={"error": str(e)})
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail={"error": str(e)})
+    except QueryCancelled as e:
+        raise HTTPException(status_code=499, detail={"error": f"Query cancelled: {e}"})
+    except PoolSaturated:
+        raise
     except Exception as e:
         print("nlq_run error:", repr(e))
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=repr(e))
 
+    meta = {key: prepared[key] for key in ("dataset_id", "table", "sql", "cache")}
+    if mode == "stream":
+        return StreamingResponse(
+            _stream_until_disconnect(iter_ndjson(meta, cursor, NLQ_STREAM_BATCH_ROWS), cursor),
+            media_type="application/x-ndjson",
+        )
+    token = register_cursor(cursor)
+    try:
+        page = await run_io(fetch_page, token, page_size, cursor)
+    except BaseException:
+        # The client never got the token, so nothing else would close the cursor before its TTL
+        close_cursor(token)
+        raise
+    return _page_response(meta, page)
+
+
+def _open_cursor(prepared: Dict[str, Any], question: str) -> ResultCursor:
+    """Opens the result cursor and caches the SQL that opened it; the cursor is closed if caching fails."""
+    cursor = ResultCursor(prepared["sql"])
+    try:
+        remember_nlq(prepared, question)
+    except BaseException:
+        cursor.close()
+        raise
+    return cursor
+
+
+async def _run_until_disconnect(request: Request, scope: QueryScope, fn: Callable[..., Any], *args: Any) -> Any:
+    """run_io(fn, *args), cancelling the scope's queries if the client disconnects meanwhile."""
+    work = asyncio.ensure_future(run_io(fn, *args))
+    while True:
+        done, _ = await asyncio.wait({work}, timeout=QUERY_DISCONNECT_POLL_SECONDS)
+        if done:
+            return work.result()
+        if scope.cancelled is None and await request.is_disconnected():
+            scope.cancel("client disconnected")
+
+
+async def _stream_until_disconnect(chunks: Iterator[bytes], cursor: ResultCursor) -> AsyncIterator[bytes]:
+    # Starlette stops iterating when the client goes away; interrupt the fetch in flight too
+    try:
+        async for chunk in iterate_in_threadpool(chunks):
+            yield chunk
+    finally:
+        if not cursor.done:
+            cancel_query(cursor.query_id, "client disconnected")
+
+
+@router.get("/nlq/cursor/{token}")
+async def nlq_cursor_page(token: str, page_size: int = Query(NLQ_PAGE_SIZE, ge=1, le=NLQ_MAX_PAGE_SIZE)):
+    """
+    GET /v1/api/nlq/cursor/{token}
+    The next page of a paginated /nlq/run result; `cursor` is null on the last page
+    """
+    try:
+        page = await run_io(fetch_page, token, page_size)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Cursor not found or expired")
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail={"error": str(e)})
+    except QueryCancelled as e:
+        raise HTTPException(status_code=499, detail={"error": f"Query cancelled: {e}"})
+    return _page_response({}, page)
+
+
+@router.delete("/nlq/cursor/{token}")
+async def nlq_cursor_close(token: str):
+    """Closes a cursor the client no longer needs before its last page."""
+    if not close_cursor(token):
+        raise HTTPException(status_code=404, detail="Cursor not found or expired")
+    return {"closed": token}
+
+
+def _page_response(meta: Dict[str, Any], page: Dict[str, Any]) -> Response:
+    # The rows are already JSON-encoded (that is how the byte ceiling is counted); splice them in
+    head = encode_json({
+        **meta,
+        "columns": page["columns"],
+        "row_count": page["row_count"],
+        "cursor": page["cursor"],
+        "truncated": page["truncated"],
+    })
+    return Response(content=head[:-1] + b',"rows":' + page["rows_json"] + b"}", media_type="application/json")
+
 
+@router.get("/nlq/cache")
+async def nlq_cache(dataset_id: Optional[str] = None):
+    """
+    GET /v1/api/nlq/cache
+    NL-to-SQL cache hit rates (exact / semantic hits, misses, cached questions) per dataset
+    """
+    return {"datasets": await run_io(nlq_cache_report, dataset_id)}
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import Dict, Any
 from backend.ml.profiling import generate_profile 
+from backend.utils.executors import PoolSaturated, run_cpu
 from backend.database.utils import get_dataset_metadata, read_dataframe_from_db 
 
 router = APIRouter(tags=["profile"])
@@ -13,13 +14,22 @@ router = APIRouter(tags=["profile"])
 
 
 @router.get("/profile")     
-async def profile_dataset(dataset_id: str):
+async def profile_dataset(
+    dataset_id: str,
+    mode: str = Query("fast", description="fast (native profiler) or deep (ydata-profiling, if installed)"),
+):
     
     
     try:
-        return generate_profile(dataset_id)
+        return await run_cpu(generate_profile, dataset_id, mode)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImportError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except PoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     # metadata = get_dataset_metadata(dataset_id)
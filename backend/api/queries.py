@@ -0,0 +1,26 @@
+from fastapi import APIRouter, HTTPException
+
+from backend.database.running_queries import cancel_query, list_running_queries
+
+router = APIRouter(tags=["admin"])
+
+
+@router.get("/admin/queries")
+def running_queries():
+    """
+    GET /v1/api/admin/queries
+    Generated SQL statements running in this process (NLQ requests, chat
+    messages, open result streams and cursors), longest-running first
+    """
+    return {"queries": list_running_queries()}
+
+
+@router.delete("/admin/queries/{query_id}")
+def kill_query(query_id: str):
+    """
+    DELETE /v1/api/admin/queries/{query_id}
+    Interrupts a running statement; its request fails with "Query cancelled"
+    """
+    if not cancel_query(query_id, "killed by admin"):
+        raise HTTPException(status_code=404, detail="Query not found or already finished")
+    return {"cancelled": query_id}
@@ -4,6 +4,7 @@ from typing import List
 from backend.ml.report_builder import export_report
 from pandas.errors import ParserError
 from backend.utils.data_utils import CSVValidationError
+from backend.utils.executors import run_cpu
 
 router = APIRouter(tags=["report"])
 
@@ -27,7 +28,8 @@ class ReportResponse(BaseModel):
 @router.post("/report/export", response_model=ReportResponse)
 async def report_export(req: ReportRequest) -> ReportResponse:
     try:
-        out_path = export_report(
+        out_path = await run_cpu(
+            export_report,
             dataset_id=req.dataset_id,
             sections=[s.dict() for s in req.sections],
             include_charts=req.include_charts,
@@ -7,6 +7,7 @@ from backend.utils.file_utils import save_dataset, get_extension
 from backend.utils.security import sanitize_text
 from backend.config import MAX_FILE_SIZE_MB, ALLOWED_EXTENSIONS, ALLOWED_MIME_TYPES
 from backend.database.file_manager import FileIngestionManager
+from backend.utils.executors import PoolSaturated, run_cpu
 
 router = APIRouter(tags=["upload"])
 
@@ -47,7 +48,7 @@ async def upload_dataset(file: UploadFile = File(...)) -> UploadResponse:
 
     try:
         # --- Delegate to FileIngestionManager ---
-        result = FileIngestionManager.ingest(stored_path, filename)
+        result = await run_cpu(FileIngestionManager.ingest, stored_path, filename)
 
         return UploadResponse(
             dataset_id=result["dataset_id"],
@@ -57,6 +58,8 @@ async def upload_dataset(file: UploadFile = File(...)) -> UploadResponse:
             columns=result["columns"],
             schema_context=result["schema_context"],
         )
+    except PoolSaturated:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to process file: {e}")
     finally:
@@ -3,14 +3,20 @@ WebSocket Chat Endpoint for SAGA.
 
 Handles persistent WebSocket connections for real-time AI chat streaming.
 Currently serves dummy events; Step 7 will wire this to the LangGraph swarm.
+
+Each chat message runs in its own query cancellation scope: a disconnect, or
+a {"action": "cancel"} message, interrupts the SQL it is running.
 """
 
 import asyncio
-from typing import List, Any
+from typing import List, Any, Optional
 from fastapi import WebSocket, WebSocketDisconnect, FastAPI
 from loguru import logger
 
-from backend.database.utils import get_dataset_metadata, get_table_schema
+from backend.database.utils import get_dataset_metadata
+from backend.database.running_queries import query_scope
+from backend.database.schema_store import get_schema_context
+from backend.utils.executors import PoolSaturated, run_io
 
 
 class ConnectionManager:
@@ -73,16 +79,20 @@ async def handle_chat_message(websocket: WebSocket, data: dict):
     logger.info(f"[WS] Query received — dataset: {dataset_id}, message: '{message}'")
 
     # --- 2. Load dataset metadata ---
-    metadata = get_dataset_metadata(dataset_id)
+    try:
+        metadata = await run_io(get_dataset_metadata, dataset_id)
+    except PoolSaturated as e:
+        await manager.send_event(websocket, "error", "System", e.detail)
+        return
     if not metadata:
         await manager.send_event(websocket, "error", "System", f"Dataset '{dataset_id}' not found.")
         return
 
     table_name = metadata["table_name"]
 
-    # --- 3. Load schema context (same format FileIngestionManager generates) ---
+    # --- 3. Load schema context (stored by FileIngestionManager at ingestion time) ---
     try:
-        schema_context = get_table_schema(table_name)
+        schema_context = await run_io(get_schema_context, table_name)
     except Exception as e:
         await manager.send_event(websocket, "error", "System", f"Failed to load schema: {str(e)}")
         return
@@ -149,6 +159,32 @@ async def handle_chat_message(websocket: WebSocket, data: dict):
         await manager.send_event(websocket, "error", "System", f"Graph execution failed: {e}")
 
 
+async def _read_messages(websocket: WebSocket, inbox: "asyncio.Queue[Optional[dict]]", running: dict):
+    """
+    Reads client messages while a query may be running. {"action": "cancel"}
+    cancels the running query; other messages are queued for the handler.
+    A disconnect cancels the running query and queues None.
+    """
+    try:
+        while True:
+            data = await websocket.receive_json()
+            if isinstance(data, dict) and data.get("action") == "cancel":
+                scope = running.get("scope")
+                if scope is None or scope.cancelled:
+                    await manager.send_event(websocket, "error", "System", "No query is running.")
+                else:
+                    scope.cancel("cancelled by client")
+                continue
+            await inbox.put(data)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"[WS] Unexpected error: {e}")
+    if running.get("scope") is not None:
+        running["scope"].cancel("client disconnected")
+    await inbox.put(None)
+
+
 def create_websocket_route(app: FastAPI):
     """
     Registers the WebSocket endpoint on the FastAPI app.
@@ -158,12 +194,22 @@ def create_websocket_route(app: FastAPI):
     @app.websocket("/v1/api/ws/chat")
     async def websocket_chat(websocket: WebSocket):
         await manager.connect(websocket)
+        inbox: "asyncio.Queue[Optional[dict]]" = asyncio.Queue()
+        running: dict = {}  # "scope" of the message being handled, for the reader to cancel
+        reader = asyncio.create_task(_read_messages(websocket, inbox, running))
         try:
             while True:
-                data = await websocket.receive_json()
-                await handle_chat_message(websocket, data)
-        except WebSocketDisconnect:
-            manager.disconnect(websocket)
+                data = await inbox.get()
+                if data is None:
+                    break
+                with query_scope(f"ws:{data.get('dataset_id')}") as scope:
+                    running["scope"] = scope
+                    try:
+                        await handle_chat_message(websocket, data)
+                    finally:
+                        running["scope"] = None
         except Exception as e:
             logger.error(f"[WS] Unexpected error: {e}")
+        finally:
+            reader.cancel()
             manager.disconnect(websocket)
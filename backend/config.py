@@ -11,6 +11,13 @@ DATA_DIR: str = os.path.join(ROOT_DIR, "data")
 REPORTS_DIR: str = os.path.join(ROOT_DIR, "reports")
 DATABASE_DIR = os.path.join(DATA_DIR, "db")
 DATABASE_FILE: str = os.path.join(DATABASE_DIR, "analytics.db")
+COLUMNAR_DIR: str = os.path.join(DATA_DIR, "columnar")  # Parquet sidecars of dataset tables
+
+# SQLite connection pool
+DB_BUSY_TIMEOUT_MS: int = 30_000  # How long a connection waits on a locked database
+DB_CACHE_SIZE_KB: int = 64_000  # Page cache per pooled connection
+DB_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024  # Memory-mapped I/O window per connection
+DB_MAX_VALUE_BYTES: int = 64 * 1024 * 1024  # Largest string/blob a read connection may produce (SQLITE_LIMIT_LENGTH)
 
 #models
 from dotenv import load_dotenv
@@ -27,11 +34,38 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
 # Agent config
 SCHEMA_SAMPLE_ROWS: int = 3  # Number of sample rows to include in schema context for LLM
+SCHEMA_CACHE_SIZE: int = 256  # Schema contexts kept in the in-process LRU
 
 # LLM Model selection
 GEMINI_FAST_MODEL: str = "gemini-2.0-flash"              # For routing, classification
 GEMINI_POWER_MODEL: str = "gemini-2.0-flash"  # For code gen, deep analysis
 
+# NL-to-SQL and query result caches
+NLQ_CACHE_MAX_ENTRIES: int = 10_000  # Cached questions kept; the least recently used are evicted
+NLQ_CACHE_TTL_SECONDS: int = 7 * 24 * 3600  # Cached SQL older than this is generated again
+NLQ_SEMANTIC_THRESHOLD: float = 0.85  # Cosine similarity a past question needs to reuse its SQL
+NLQ_CACHE_INDEX_SIZE: int = 64  # Per-schema question indexes kept in the in-process LRU
+QUERY_CACHE_MAX_BYTES: int = 128 * 1024 * 1024  # Pickled query results kept in the in-process LRU
+QUERY_CACHE_MAX_RESULT_BYTES: int = 8 * 1024 * 1024  # Larger results are not cached
+
+# NLQ result delivery
+NLQ_RESULT_MAX_ROWS: int = 1_000_000  # Hard ceiling on rows returned by one query, in any mode
+NLQ_RESULT_MAX_BYTES: int = 256 * 1024 * 1024  # Hard ceiling on encoded JSON bytes of one streamed/paged result
+NLQ_JSON_MAX_ROWS: int = 10_000  # Rows returned by a plain (non-streamed) /nlq/run response
+NLQ_STREAM_BATCH_ROWS: int = 1_000  # Rows fetched and written per NDJSON chunk
+NLQ_PAGE_SIZE: int = 1_000  # Default page size of paginated results
+NLQ_MAX_PAGE_SIZE: int = 50_000
+NLQ_CURSOR_TTL_SECONDS: int = 120  # Idle server-side cursors are closed after this
+NLQ_MAX_OPEN_CURSORS: int = 32  # The least recently used cursor is closed beyond this
+
+# Generated SQL guards
+SQL_LIMIT_MAX: int = NLQ_RESULT_MAX_ROWS  # LIMIT injected into generated NLQ SQL without one; larger LIMITs are clamped to it
+SQL_AGENT_MAX_ROWS: int = 1_000  # Rows the SQL agent fetches into agent state (its SQL keeps the SQL_LIMIT_MAX ceiling)
+SQL_PRINTF_MAX_WIDTH: int = 1_000  # Largest printf()/format() width or precision in generated SQL
+SQL_MAX_JOIN_SCAN_ROWS: int = 100_000_000  # Refuse plans whose nested full scans visit more row combinations
+SQL_STATEMENT_TIMEOUT_SECONDS: float = 30.0  # Generated statements are interrupted after this (per execute/fetch)
+QUERY_DISCONNECT_POLL_SECONDS: float = 0.5  # How often a waiting /nlq/run checks whether its client went away
+
 # Upload constraints
 MAX_FILE_SIZE_MB: int = 200
 ALLOWED_EXTENSIONS: List[str] = [".csv", ".xlsx"]
@@ -44,6 +78,32 @@ ALLOWED_MIME_TYPES: List[str] = [
     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",  # .xlsx
 ]
 
+# Ingestion
+STREAMING_INGEST_THRESHOLD_MB: int = 25  # CSVs larger than this are ingested chunk by chunk
+INGEST_CHUNK_ROWS: int = 50_000  # Rows per chunk in streaming ingestion
+CSV_FALLBACK_BLOCK_BYTES: int = 8 * 1024 * 1024  # Block size when only parts of a CSV need the python parser
+BULK_LOAD_BATCH_ROWS: int = 20_000  # Rows converted and handed to executemany at a time
+TYPE_INFERENCE_SAMPLE_ROWS: int = 1000  # Values sampled per column to classify its type
+COLUMNAR_COMPRESSION: str = "zstd"  # Parquet codec for dataset sidecars
+
+# Cleaning
+CLEANING_MAX_WORKERS: int = 4  # Threads cleaning independent columns in parallel
+CHUNKED_CLEANING_THRESHOLD_ROWS: int = 1_000_000  # Larger tables are cleaned out of core, chunk by chunk
+CLEANING_CHUNK_ROWS: int = 100_000  # Rows per chunk in out-of-core cleaning
+
+# Insights
+APPROX_INSIGHTS_CHUNK_ROWS: int = 100_000  # Rows read at a time by approximate (sketch-based) insights
+RESULT_CACHE_SIZE: int = 128  # Insights/profile results kept in the in-process LRU (all are persisted)
+
+# Background jobs
+JOB_WORKERS: int = 2  # Worker processes running profiling/cleaning/insights/report jobs
+
+# Request executors (blocking work called from async handlers)
+CPU_POOL_WORKERS: int = os.cpu_count() or 4  # Threads for pandas/NumPy work
+CPU_POOL_QUEUE: int = 32  # Calls allowed to wait for a cpu thread before requests get a 503
+IO_POOL_WORKERS: int = 16  # Threads for SQLite, file and LLM calls
+IO_POOL_QUEUE: int = 128  # Calls allowed to wait for an io thread before requests get a 503
+
 # CORS
 ALLOWED_ORIGINS: List[str] = ["http://localhost:8501", "http://127.0.0.1:8501"]
 
@@ -53,5 +113,6 @@ WS_MAX_MESSAGE_SIZE: int = 1024 * 64  # 64KB max per message
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(REPORTS_DIR, exist_ok=True)
 os.makedirs(DATABASE_DIR, exist_ok=True)
+os.makedirs(COLUMNAR_DIR, exist_ok=True)
 
 
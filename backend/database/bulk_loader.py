@@ -0,0 +1,133 @@
+"""
+Bulk SQLite loader for ingested and cleaned datasets.
+
+Replaces `DataFrame.to_sql(method="multi")`, whose chunk size collapses to a
+handful of rows on wide tables (SQLite's bound-variable limit is shared by
+every column of every row in a multi-row INSERT). Here each row is one
+execution of a single prepared INSERT via `executemany`, the whole load runs in
+one transaction, and load-time PRAGMAs are applied for the duration of the load
+and restored afterwards.
+"""
+
+import time
+import sqlite3
+from typing import Any, Dict, Iterable, List
+
+import pandas as pd
+from loguru import logger
+
+from backend.config import BULK_LOAD_BATCH_ROWS
+from backend.database.pool import write_connection
+
+# Applied to the pooled writer for the duration of a load and restored once the
+# load commits, so other writes keep the pool's normal durability settings.
+LOAD_PRAGMAS: Dict[str, Any] = {
+    "synchronous": "OFF",     # No fsync per commit while loading
+    "cache_size": -256000,    # ~256 MB page cache (negative = KiB)
+    "temp_store": "MEMORY",
+}
+RESTORED_PRAGMAS = ("synchronous", "cache_size", "temp_store")
+
+
+def _dataframe_to_records(df: pd.DataFrame) -> List[tuple]:
+    """
+    Converts a DataFrame into a list of row tuples of plain Python values
+    that sqlite3 can bind directly (NaN/NaT -> None, datetimes -> ISO text,
+    timedeltas -> integer nanoseconds, as `to_sql` stores them).
+    """
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        kind = series.dtype.kind
+        if kind == "M":
+            values = series.astype(str).where(series.notna(), None)
+        elif kind == "m":
+            values = pd.Series(series.to_numpy().astype("int64"), index=series.index).astype(object).where(series.notna(), None)
+        else:
+            values = series.astype(object).where(series.notna(), None)
+        columns.append(values.tolist())
+    return list(zip(*columns))
+
+
+def _table_exists(cursor: sqlite3.Cursor, table_name: str) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def _apply_load_pragmas(conn: sqlite3.Connection) -> Dict[str, Any]:
+    """Switches the connection to load settings and returns the values to restore."""
+    previous = {name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in RESTORED_PRAGMAS}
+    for name, value in LOAD_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    return previous
+
+
+def _restore_pragmas(conn: sqlite3.Connection, previous: Dict[str, Any]) -> None:
+    for name, value in previous.items():
+        conn.execute(f"PRAGMA {name}={value}")
+
+
+def bulk_load(chunks: Iterable[pd.DataFrame], table_name: str, if_exists: str = "replace") -> Dict[str, Any]:
+    """
+    Writes DataFrame chunks into an SQLite table in a single transaction.
+
+    The table is created from the first chunk's dtypes with the same column
+    affinities as `DataFrame.to_sql`. Either every chunk lands or the database
+    is left untouched.
+
+    Args:
+        chunks: Iterable of DataFrames sharing the same columns.
+        table_name: The name of the target table.
+        if_exists: Action to take if the table already exists ('replace', 'append', 'fail').
+
+    Returns:
+        Dict with: table_name, rows, seconds, rows_per_sec
+    """
+    if if_exists not in ("replace", "append", "fail"):
+        raise ValueError(f"'{if_exists}' is not valid for if_exists")
+
+    start = time.perf_counter()
+    total_rows = 0
+    with write_connection() as conn:
+        previous = _apply_load_pragmas(conn)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            insert_sql = None
+            for chunk in chunks:
+                if insert_sql is None:
+                    exists = _table_exists(cursor, table_name)
+                    if exists and if_exists == "fail":
+                        raise ValueError(f"Table '{table_name}' already exists.")
+                    if exists and if_exists == "replace":
+                        cursor.execute(f'DROP TABLE "{table_name}"')
+                    if not exists or if_exists == "replace":
+                        cursor.execute(pd.io.sql.get_schema(chunk, table_name))
+                    column_list = ", ".join(f'"{c}"' for c in chunk.columns)
+                    placeholders = ", ".join("?" for _ in chunk.columns)
+                    insert_sql = f'INSERT INTO "{table_name}" ({column_list}) VALUES ({placeholders})'
+                cursor.executemany(insert_sql, _dataframe_to_records(chunk))
+                total_rows += len(chunk)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            _restore_pragmas(conn, previous)
+
+    seconds = time.perf_counter() - start
+    rows_per_sec = int(total_rows / seconds) if seconds > 0 else total_rows
+    logger.info(f"[BulkLoader] {table_name}: {total_rows} rows in {seconds:.2f}s ({rows_per_sec} rows/s)")
+
+    return {
+        "table_name": table_name,
+        "rows": total_rows,
+        "seconds": round(seconds, 3),
+        "rows_per_sec": rows_per_sec,
+    }
+
+
+def iter_batches(df: pd.DataFrame, batch_rows: int = BULK_LOAD_BATCH_ROWS) -> Iterable[pd.DataFrame]:
+    """Slices a DataFrame into row batches so record conversion stays bounded in memory."""
+    for start in range(0, max(len(df), 1), batch_rows):
+        yield df.iloc[start:start + batch_rows]
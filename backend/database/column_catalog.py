@@ -0,0 +1,80 @@
+"""
+Column catalog: per-column statistics computed once when a dataset table is
+written (ingestion, streaming ingestion, cleaning) and stored with the schema
+context in `dataset_schema.columns_json`.
+
+`/columns` answers from the catalog instead of reading the table, so its cost
+does not depend on the number of rows.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.utils.sketches import DistinctSketch
+
+# Logical types -> the coarse column kinds used by the charting UI
+CHART_TYPES = {
+    "int": "numeric",
+    "float": "numeric",
+    "bool": "numeric",     # Stored as 0/1 in SQLite
+    "date": "datetime",
+    "category": "categorical",
+    "text": "categorical",
+}
+RANGE_TYPES = {"int", "float", "bool", "date"}  # Logical types whose min/max are reported
+
+
+def chart_type(logical_type: Optional[str]) -> str:
+    return CHART_TYPES.get(logical_type or "text", "categorical")
+
+
+def _json_scalar(value: Any) -> Any:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+class ColumnStats:
+    """Mergeable statistics of one column, updated chunk by chunk."""
+
+    def __init__(self, logical_type: str):
+        self.logical_type = logical_type
+        self.null_count = 0
+        self.min: Any = None
+        self.max: Any = None
+        self.range_known = logical_type in RANGE_TYPES
+        self.sketch = DistinctSketch()
+
+    def update(self, series: pd.Series) -> None:
+        self.null_count += int(series.isna().sum())
+        self.sketch.update(series)
+        if not self.range_known:
+            return
+        values = series.dropna()
+        if values.empty:
+            return
+        try:
+            lo, hi = values.min(), values.max()
+            self.min = lo if self.min is None else min(self.min, lo)
+            self.max = hi if self.max is None else max(self.max, hi)
+        except TypeError:
+            # Mixed raw values kept by a later chunk; the range is unknown
+            self.min = self.max = None
+            self.range_known = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "logical_type": self.logical_type,
+            "null_count": self.null_count,
+            "distinct_estimate": self.sketch.estimate(),
+            "min": _json_scalar(self.min),
+            "max": _json_scalar(self.max),
+        }
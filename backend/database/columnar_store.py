@@ -0,0 +1,206 @@
+"""
+Columnar sidecar store: every dataset table is also written as a
+zstd-compressed Parquet file under COLUMNAR_DIR.
+
+Analytics reads (insights, profiling, cleaning, charts, reports) load only the
+columns they need from the memory-mapped file instead of pulling the whole
+table through `pd.read_sql_query` row by row; SQLite stays the SQL engine for
+NLQ and the source of truth.
+
+The sidecar stores values exactly as SQLite stores them (dates as ISO text,
+booleans as 0/1, categories as plain values), so a DataFrame read from either
+side has the same values and dtypes and downstream results do not depend on
+which one served the read. A sidecar is optional: when it is missing or could
+not be written, reads fall back to SQLite.
+"""
+
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+from loguru import logger
+
+from backend.config import COLUMNAR_DIR, COLUMNAR_COMPRESSION
+from backend.database.query_builder import Filters, normalize_filters
+
+# Filter operators the Parquet reader can evaluate; anything else is served by SQLite
+SUPPORTED_FILTER_OPS = {"=", "!=", "<", "<=", ">", ">=", "in", "not in", "is null", "is not null"}
+
+
+def sidecar_path(table_name: str) -> str:
+    return os.path.join(COLUMNAR_DIR, f"{table_name}.parquet")
+
+
+def has_sidecar(table_name: str) -> bool:
+    return os.path.exists(sidecar_path(table_name))
+
+
+def _sqlite_compatible_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Converts columns to the representation SQLite stores (see bulk_loader._dataframe_to_records)."""
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        kind = series.dtype.kind
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            converted[col] = series.astype(object).where(series.notna(), None)
+        elif kind == "M":
+            converted[col] = series.astype(str).where(series.notna(), None)
+        elif kind == "m":
+            converted[col] = pd.Series(series.to_numpy().astype("int64"), index=series.index).astype(object).where(series.notna(), None)
+        elif pd.api.types.is_bool_dtype(series.dtype):
+            converted[col] = series.astype("Int64" if series.hasnans else "int64")
+        else:
+            converted[col] = series
+    return pd.DataFrame(converted, index=df.index)
+
+
+def _to_arrow(df: pd.DataFrame) -> pa.Table:
+    table = pa.Table.from_pandas(_sqlite_compatible_frame(df), preserve_index=False)
+    # Drop pandas metadata so reads use Arrow's default mapping (ints with nulls -> float64),
+    # matching what read_sql_query returns for the same SQLite column
+    return table.replace_schema_metadata(None)
+
+
+class SidecarWriter:
+    """
+    Writes DataFrame chunks to a temporary Parquet file and publishes it
+    atomically on `commit()`. Any failure abandons the sidecar without
+    affecting the SQLite load.
+    """
+
+    def __init__(self, table_name: str):
+        self.table_name = table_name
+        self.path = sidecar_path(table_name)
+        self.tmp_path = self.path + ".tmp"
+        self._writer: Optional[pq.ParquetWriter] = None
+        self.failed = False
+
+    def write(self, chunk: pd.DataFrame) -> None:
+        if self.failed:
+            return
+        try:
+            table = _to_arrow(chunk)
+            if self._writer is None:
+                os.makedirs(COLUMNAR_DIR, exist_ok=True)
+                self._writer = pq.ParquetWriter(self.tmp_path, table.schema, compression=COLUMNAR_COMPRESSION)
+            elif table.schema != self._writer.schema:
+                table = table.cast(self._writer.schema)
+            self._writer.write_table(table)
+        except (pa.ArrowException, ValueError, TypeError) as e:
+            logger.warning(f"[ColumnarStore] Skipping sidecar for '{self.table_name}': {e}")
+            self.abort()
+            self.failed = True
+
+    def commit(self) -> bool:
+        if self.failed or self._writer is None:
+            self.abort()
+            return False
+        self._writer.close()
+        self._writer = None
+        os.replace(self.tmp_path, self.path)
+        logger.info(f"[ColumnarStore] Wrote {self.path} ({os.path.getsize(self.path)} bytes)")
+        return True
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def tee_chunks(chunks: Iterable[pd.DataFrame], writer: SidecarWriter) -> Iterator[pd.DataFrame]:
+    """Yields chunks unchanged while also writing each one to the sidecar."""
+    for chunk in chunks:
+        writer.write(chunk)
+        yield chunk
+
+
+def delete_sidecar(table_name: str) -> None:
+    for path in (sidecar_path(table_name), sidecar_path(table_name) + ".tmp"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def sidecar_columns(table_name: str) -> List[str]:
+    return list(pq.read_schema(sidecar_path(table_name), memory_map=True).names)
+
+
+def can_serve(filters: Optional[Filters], sample_frac: Optional[float]) -> bool:
+    """True when a read can be answered from the sidecar."""
+    if sample_frac is not None and sample_frac < 1:
+        return False
+    return all(op in SUPPORTED_FILTER_OPS for _, op, _ in normalize_filters(filters))
+
+
+def _filter_expression(filters: Optional[Filters]) -> Optional[pc.Expression]:
+    expression = None
+    for col, op, value in normalize_filters(filters):
+        field = pc.field(col)
+        if op == "is null" or (op == "=" and value is None):
+            term = field.is_null()
+        elif op == "is not null" or (op == "!=" and value is None):
+            term = field.is_valid()
+        elif op == "in":
+            term = field.isin(list(value))
+        elif op == "not in":
+            # SQL's NOT IN never matches NULL
+            term = ~field.isin(list(value)) & field.is_valid()
+        else:
+            term = {
+                "=": field == value,
+                "!=": field != value,
+                "<": field < value,
+                "<=": field <= value,
+                ">": field > value,
+                ">=": field >= value,
+            }[op]
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def read_sidecar(
+    table_name: str,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Filters] = None,
+    limit: Optional[int] = None,
+    dtypes: Optional[Dict[str, Any]] = None,
+) -> pd.DataFrame:
+    """
+    Reads the requested columns/rows of a table from its memory-mapped sidecar.
+    Columns must already be validated by the caller.
+    """
+    columns = list(dict.fromkeys(columns)) if columns is not None else None
+    expression = _filter_expression(filters)
+
+    if expression is None and limit is not None:
+        parquet_file = pq.ParquetFile(sidecar_path(table_name), memory_map=True)
+        batches = []
+        remaining = limit
+        for batch in parquet_file.iter_batches(batch_size=max(limit, 1), columns=columns):
+            if remaining <= 0:
+                break
+            batches.append(batch.slice(0, remaining))
+            remaining -= len(batches[-1])
+        schema = parquet_file.schema_arrow if columns is None else pa.schema([parquet_file.schema_arrow.field(c) for c in columns])
+        table = pa.Table.from_batches(batches, schema=schema)
+    else:
+        table = pq.read_table(sidecar_path(table_name), columns=columns, filters=expression, memory_map=True)
+        if limit is not None:
+            table = table.slice(0, limit)
+
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    if dtypes:
+        df = df.astype(dtypes)
+    return df
+
+
+def iter_sidecar_chunks(table_name: str, columns: Optional[Sequence[str]], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Yields the requested columns of a table's sidecar `chunk_rows` rows at a time."""
+    columns = list(dict.fromkeys(columns)) if columns is not None else None
+    parquet_file = pq.ParquetFile(sidecar_path(table_name), memory_map=True)
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=columns):
+        yield batch.to_pandas(split_blocks=True, self_destruct=True)
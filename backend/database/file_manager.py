@@ -5,14 +5,19 @@ Handles high-speed CSV/XLSX ingestion, SQLite caching, and schema context
 generation for LangGraph agents.
 """
 
+import os
 import pandas as pd
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from loguru import logger
+from pandas.errors import ParserError
 
-from backend.database.utils import load_dataframe_to_db, insert_dataset_metadata
-from backend.utils.data_utils import read_dataframe_auto, try_parse_numeric, try_parse_date
-from backend.config import SCHEMA_SAMPLE_ROWS
+from backend.database.utils import load_dataframe_to_db, load_dataframe_chunks_to_db, insert_dataset_metadata
+from backend.database.schema_store import save_schema
+from backend.database.column_catalog import ColumnStats
+from backend.utils.data_utils import read_dataframe_auto, iter_csv_chunks
+from backend.utils.type_inference import infer_and_cast, cast_column, logical_type_of
+from backend.config import SCHEMA_SAMPLE_ROWS, STREAMING_INGEST_THRESHOLD_MB, INGEST_CHUNK_ROWS
 
 
 class FileIngestionManager:
@@ -22,7 +27,7 @@ class FileIngestionManager:
     """
 
     @staticmethod
-    def ingest(file_path: str, original_filename: str) -> Dict[str, Any]:
+    def ingest(file_path: str, original_filename: str, streaming: Optional[bool] = None) -> Dict[str, Any]:
         """
         Main entry point. Orchestrates the full ingestion pipeline:
         1. Parse file -> 2. Sanitize -> 3. Type inference -> 4. SQLite cache -> 5. Schema context.
@@ -30,10 +35,17 @@ class FileIngestionManager:
         Args:
             file_path: Absolute path to the saved file on disk.
             original_filename: The original name of the uploaded file.
+            streaming: Force (True) or disable (False) chunked ingestion.
+                       Defaults to streaming CSVs above STREAMING_INGEST_THRESHOLD_MB.
 
         Returns:
             Dict with: dataset_id, table_name, filename, rows, columns, schema_context
         """
+        if streaming is None:
+            streaming = FileIngestionManager._should_stream(file_path)
+        if streaming:
+            return FileIngestionManager.ingest_streaming(file_path, original_filename)
+
         logger.info(f"[FileIngestionManager] Starting ingestion: {original_filename}")
 
         # 1. Parse the file using the existing robust reader
@@ -51,11 +63,12 @@ class FileIngestionManager:
         table_name = f"dataset_{dataset_id.replace('-', '_')}"
 
         logger.info(f"[FileIngestionManager] Caching into SQLite table: {table_name}")
-        load_dataframe_to_db(df, table_name)
+        load_stats = load_dataframe_to_db(df, table_name)
+        logger.info(f"[FileIngestionManager] Wrote {load_stats['rows']} rows at {load_stats['rows_per_sec']} rows/s")
         insert_dataset_metadata(dataset_id=dataset_id, filename=original_filename, table_name=table_name)
 
-        # 5. Build the lightweight schema context string for LLM prompts
-        schema_context = FileIngestionManager._build_schema_context(df, table_name)
+        # 5. Build the lightweight schema context string for LLM prompts and persist it for agents
+        schema_context = FileIngestionManager.cache_schema(df, dataset_id, table_name)
 
         logger.info(f"[FileIngestionManager] Ingestion complete for {original_filename} -> {dataset_id}")
 
@@ -68,6 +81,132 @@ class FileIngestionManager:
             "schema_context": schema_context,
         }
 
+    @staticmethod
+    def ingest_streaming(file_path: str, original_filename: str, chunk_rows: int = INGEST_CHUNK_ROWS) -> Dict[str, Any]:
+        """
+        Chunked variant of `ingest` for large CSVs. Peak memory is bounded by
+        `chunk_rows` instead of the file size.
+
+        The first chunk fixes a column type plan (via the same inference as the
+        in-memory path); every later chunk is cast to that plan and appended to
+        the SQLite table inside a single transaction. Row counts and schema
+        samples are accumulated on the fly so the returned payload has the same
+        shape as `ingest`.
+        """
+        if not file_path.lower().endswith(".csv"):
+            raise ValueError(f"Streaming ingestion only supports CSV files: {file_path}")
+
+        logger.info(f"[FileIngestionManager] Starting streaming ingestion: {original_filename} (chunks of {chunk_rows} rows)")
+
+        dataset_id = str(uuid.uuid4())
+        table_name = f"dataset_{dataset_id.replace('-', '_')}"
+
+        # Filled in by the chunk generator as the load progresses
+        state: Dict[str, Any] = {}
+
+        def prepared_chunks(engine: str):
+            state.update({"type_plan": None, "samples": {}, "stats": {}, "rows": 0, "chunks": 0, "engine": engine})
+            for chunk in iter_csv_chunks(file_path, chunk_rows, engine=engine):
+                chunk = FileIngestionManager._sanitize_columns(chunk)
+                if state["type_plan"] is None:
+                    chunk = FileIngestionManager._infer_and_cast_types(chunk)
+                    state["dtypes"] = {col: chunk[col].dtype for col in chunk.columns}
+                    state["type_plan"] = {col: logical_type_of(chunk[col]) for col in chunk.columns}
+                    state["samples"] = {col: [] for col in chunk.columns}
+                    state["stats"] = {col: ColumnStats(logical) for col, logical in state["type_plan"].items()}
+                else:
+                    chunk = FileIngestionManager._apply_type_plan(chunk, state["type_plan"])
+
+                FileIngestionManager._collect_samples(chunk, state["samples"])
+                for col, stats in state["stats"].items():
+                    if col in chunk.columns:
+                        stats.update(chunk[col])
+                state["rows"] += len(chunk)
+                state["chunks"] += 1
+                yield chunk
+
+        logger.info(f"[FileIngestionManager] Streaming into SQLite table: {table_name}")
+        try:
+            load_stats = load_dataframe_chunks_to_db(prepared_chunks("c"), table_name)
+        except ParserError as e:
+            # The load is a single transaction, so a failed C pass leaves nothing behind
+            logger.warning(f"[FileIngestionManager] C parser failed mid-stream ({e}); retrying with the python engine")
+            load_stats = load_dataframe_chunks_to_db(prepared_chunks("python"), table_name)
+        insert_dataset_metadata(dataset_id=dataset_id, filename=original_filename, table_name=table_name)
+
+        columns = [
+            (col, FileIngestionManager._pandas_dtype_to_sql(dtype), state["samples"][col])
+            for col, dtype in state["dtypes"].items()
+        ]
+        schema_context = FileIngestionManager._format_schema_context(table_name, columns, state["rows"])
+        save_schema(
+            dataset_id,
+            table_name,
+            schema_context,
+            state["rows"],
+            [
+                FileIngestionManager._column_summary(col, sql_type, samples, state["stats"][col])
+                for col, sql_type, samples in columns
+            ],
+        )
+
+        logger.info(
+            f"[FileIngestionManager] Streaming ingestion complete for {original_filename} -> {dataset_id} "
+            f"({state['rows']} rows in {state['chunks']} chunks, '{state['engine']}' parser, {load_stats['rows_per_sec']} rows/s)"
+        )
+
+        return {
+            "dataset_id": dataset_id,
+            "table_name": table_name,
+            "filename": original_filename,
+            "rows": state["rows"],
+            "columns": len(columns),
+            "schema_context": schema_context,
+        }
+
+    @staticmethod
+    def _should_stream(file_path: str) -> bool:
+        """Large CSVs are streamed; Excel files are always loaded in memory."""
+        if not file_path.lower().endswith(".csv"):
+            return False
+        return os.path.getsize(file_path) > STREAMING_INGEST_THRESHOLD_MB * 1024 * 1024
+
+    @staticmethod
+    def _apply_type_plan(chunk: pd.DataFrame, type_plan: Dict[str, str]) -> pd.DataFrame:
+        """
+        Casts a chunk to the logical types inferred from the first chunk.
+        Values that do not fit the plan are kept as-is rather than coerced to
+        NULL, so no data is lost (SQLite stores them by value).
+        """
+        for col, logical_type in type_plan.items():
+            if col not in chunk.columns:
+                continue
+            series = chunk[col]
+            if logical_type in ("text", "category"):
+                if series.dtype != "object":
+                    chunk[col] = series.astype(object)
+                continue
+            if series.dtype != "object":
+                continue  # Already typed by the parser
+            cast = cast_column(series, logical_type)
+            if cast is None:
+                logger.warning(f"[FileIngestionManager] Column '{col}' does not match its inferred type in a later chunk; keeping raw values")
+            else:
+                chunk[col] = cast
+        return chunk
+
+    @staticmethod
+    def _collect_samples(chunk: pd.DataFrame, samples: Dict[str, List[Any]]) -> None:
+        """Tops up per-column sample lists (unique, non-null) until SCHEMA_SAMPLE_ROWS are found."""
+        for col, values in samples.items():
+            if len(values) >= SCHEMA_SAMPLE_ROWS or col not in chunk.columns:
+                continue
+            for value in chunk[col].dropna().unique():
+                if value not in values:
+                    values.append(value)
+                if len(values) >= SCHEMA_SAMPLE_ROWS:
+                    break
+
     @staticmethod
     def _sanitize_columns(df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -83,18 +222,65 @@ class FileIngestionManager:
     @staticmethod
     def _infer_and_cast_types(df: pd.DataFrame) -> pd.DataFrame:
         """
-        Attempts to cast 'object' columns to numeric or datetime where possible.
+        Casts 'object' columns to int/float/bool/datetime/category where a
+        sample of the column shows that is safe (see backend.utils.type_inference).
         This improves SQLite storage efficiency and SQL query accuracy.
         """
-        for col in df.columns:
-            if df[col].dtype == "object":
-                # Try numeric first (most common mistype)
-                df[col] = try_parse_numeric(df[col])
-                # If still object, try date
-                if df[col].dtype == "object":
-                    df[col] = try_parse_date(df[col])
+        df, logical_types = infer_and_cast(df)
+        logger.debug(f"[FileIngestionManager] Inferred column types: {logical_types}")
         return df
 
+    @staticmethod
+    def cache_schema(
+        df: pd.DataFrame,
+        dataset_id: str,
+        table_name: str,
+        row_count: Optional[int] = None,
+        logical_types: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """
+        Builds the schema context and column catalog for a DataFrame that was
+        written to `table_name` and persists them in the schema store.
+
+        Args:
+            df: The frame as written to SQLite (or a sample of it).
+            dataset_id: The dataset the table belongs to.
+            table_name: The SQLite table name.
+            row_count: Total rows in the table, when `df` is only a sample.
+            logical_types: Known logical types per column (e.g. carried over from
+                           the source of a cleaned table whose dates were read back
+                           as text); inferred from the dtypes otherwise.
+
+        Returns:
+            The schema context string.
+        """
+        row_count = len(df) if row_count is None else row_count
+        logical_types = logical_types or {}
+        columns = FileIngestionManager._describe_columns(df)
+        schema_context = FileIngestionManager._format_schema_context(table_name, columns, row_count)
+
+        summaries = []
+        for col, sql_type, samples in columns:
+            stats = ColumnStats(logical_types.get(col) or logical_type_of(df[col]))
+            stats.update(df[col])
+            summaries.append(FileIngestionManager._column_summary(col, sql_type, samples, stats))
+
+        save_schema(dataset_id, table_name, schema_context, row_count, summaries)
+        return schema_context
+
+    @staticmethod
+    def _column_summary(name: str, sql_type: str, samples: Any, stats: ColumnStats) -> Dict[str, Any]:
+        """
+        JSON-friendly per-column catalog record stored next to the schema context:
+        name, sql_type, samples, logical_type, null_count, distinct_estimate, min, max.
+        """
+        return {
+            "name": name,
+            "sql_type": sql_type,
+            "samples": [str(s) for s in samples],
+            **stats.to_dict(),
+        }
+
     @staticmethod
     def _build_schema_context(df: pd.DataFrame, table_name: str) -> str:
         """
@@ -108,14 +294,28 @@ class FileIngestionManager:
             )
             Rows: 15000 | Columns: 4
         """
-        lines = [f"TABLE {table_name} ("]
+        columns = FileIngestionManager._describe_columns(df)
+        return FileIngestionManager._format_schema_context(table_name, columns, len(df))
 
+    @staticmethod
+    def _describe_columns(df: pd.DataFrame) -> List[Tuple[str, str, Any]]:
+        """(name, sql_type, samples) for every column of a DataFrame."""
+        columns = []
         for col in df.columns:
             # Map pandas dtype to SQL-like type names
             sql_type = FileIngestionManager._pandas_dtype_to_sql(df[col].dtype)
 
             # Get sample values (non-null, unique, up to SCHEMA_SAMPLE_ROWS)
             samples = df[col].dropna().unique()[:SCHEMA_SAMPLE_ROWS]
+            columns.append((col, sql_type, samples))
+        return columns
+
+    @staticmethod
+    def _format_schema_context(table_name: str, columns: List[Tuple[str, str, Any]], num_rows: int) -> str:
+        """Renders (name, sql_type, samples) triples into the schema context format."""
+        lines = [f"TABLE {table_name} ("]
+
+        for col, sql_type, samples in columns:
             if sql_type == "TEXT":
                 sample_str = ", ".join(f"'{s}'" for s in samples)
             else:
@@ -124,7 +324,7 @@ class FileIngestionManager:
             lines.append(f"  {col} {sql_type},  -- samples: {sample_str}")
 
         lines.append(")")
-        lines.append(f"Rows: {len(df)} | Columns: {len(df.columns)}")
+        lines.append(f"Rows: {num_rows} | Columns: {len(columns)}")
 
         return "\n".join(lines)
 
@@ -1,11 +1,11 @@
-import sqlite3
-from backend.config import DATABASE_FILE
+from backend.database.pool import write_connection
 
 def init_database():
     """Initializes the SQLite database and creates the necessary tables."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    
+    with write_connection() as conn:
+        _create_tables(conn.cursor())
+
+def _create_tables(cursor):
     # Create a table to store dataset metadata
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS datasets (
@@ -19,8 +19,92 @@ def init_database():
         )
     """)
     
-    conn.commit()
-    conn.close()
+    # Schema context, column summaries and samples captured at ingestion/cleaning time
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS dataset_schema (
+            table_name TEXT PRIMARY KEY,
+            dataset_id TEXT NOT NULL,
+            schema_context TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            column_count INTEGER NOT NULL,
+            columns_json TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_dataset_schema_dataset ON dataset_schema (dataset_id)")
+
+    # Cached insights/profile results, keyed on (kind, table, engine version, parameters)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS result_cache (
+            cache_key TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            engine_version TEXT NOT NULL,
+            params_json TEXT NOT NULL,
+            result_json TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_table ON result_cache (table_name)")
+
+    # Per-table version, bumped on every write so cached query results keyed on it go stale
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    """)
+
+    # NL-to-SQL cache: validated SQL per normalized question and table schema, with the question's embedding
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS nlq_cache (
+            id INTEGER PRIMARY KEY,
+            dataset_id TEXT NOT NULL,
+            table_name TEXT NOT NULL,
+            schema_hash TEXT NOT NULL,
+            question TEXT NOT NULL,
+            sql TEXT NOT NULL,
+            embedding BLOB NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL,
+            UNIQUE (table_name, schema_hash, question)
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_nlq_cache_last_used ON nlq_cache (last_used_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_nlq_cache_dataset ON nlq_cache (dataset_id)")
+
+    # NL-to-SQL cache hits and misses per dataset
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS nlq_cache_stats (
+            dataset_id TEXT PRIMARY KEY,
+            exact_hits INTEGER NOT NULL DEFAULT 0,
+            semantic_hits INTEGER NOT NULL DEFAULT 0,
+            misses INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        )
+    """)
+
+    # Background jobs; at most one queued/running job per dedup key
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            dataset_id TEXT,
+            params_json TEXT NOT NULL,
+            dedup_key TEXT NOT NULL,
+            status TEXT NOT NULL,
+            progress REAL NOT NULL DEFAULT 0,
+            message TEXT,
+            result_json TEXT,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    """)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active ON jobs (dedup_key) WHERE status IN ('queued', 'running')")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_dataset ON jobs (dataset_id)")
 
 if __name__ == "__main__":
     init_database()
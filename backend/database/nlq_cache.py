@@ -0,0 +1,318 @@
+"""
+NL-to-SQL cache: validated SQL generated for a question, persisted in the
+`nlq_cache` table so repeated questions skip the LLM call.
+
+Two lookup levels, both scoped to one table's schema (the hash of its schema
+context, so a changed schema never reuses SQL written for the old one):
+
+1. exact: the normalized question (case, whitespace and trailing punctuation
+   folded).
+2. semantic: nearest neighbour over local embeddings of past questions
+   (feature-hashed words and character trigrams, cosine similarity). A
+   neighbour only counts when it clears NLQ_SEMANTIC_THRESHOLD, asks for the
+   same numbers, and has the same content words once plurals and known
+   synonyms are folded, apart from filler words ("show", "all", ...) that do
+   not appear in the schema context. "average price by region" may reuse
+   "what is the mean price per region", but not "... by city", and never a
+   question that differs in a comparison, ordering, extreme, aggregate or
+   negation word (highest/lowest, ascending/descending, above/below, not).
+
+Entries expire after NLQ_CACHE_TTL_SECONDS and the least recently used are
+evicted beyond NLQ_CACHE_MAX_ENTRIES. Per-schema embedding matrices are kept
+in an in-process LRU. Hits and misses are counted per dataset in
+`nlq_cache_stats` for `nlq_cache_report`.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from backend.config import NLQ_CACHE_INDEX_SIZE, NLQ_CACHE_MAX_ENTRIES, NLQ_CACHE_TTL_SECONDS, NLQ_SEMANTIC_THRESHOLD
+from backend.database.pool import read_connection, write_connection
+from backend.utils.cache import LRUCache
+
+EMBEDDING_DIM = 1024  # Hashed feature dimensions of a question embedding
+TRIGRAM_WEIGHT = 0.5  # Weight of character trigrams relative to whole words
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from give how i in is it list me of on or per please show "
+    "tell that the their there these this to was what when where which who with would you".split()
+)
+# Words that may differ between a question and a reused one without changing the SQL
+_FILLER_WORDS = frozenset(
+    "all data dataset display each every find get know like need query record records result results "
+    "row rows see table us want".split()
+)
+# Spellings folded to one word before questions are compared. Opposites (highest/lowest,
+# asc/desc, above/below, not, ...) are never folded together.
+_SYNONYMS = {
+    "avg": "average", "mean": "average",
+    "sum": "total",
+    "number": "count", "many": "count",
+    "max": "highest", "maximum": "highest", "largest": "highest", "biggest": "highest", "greatest": "highest",
+    "min": "lowest", "minimum": "lowest", "smallest": "lowest", "least": "lowest",
+    "asc": "ascending", "desc": "descending",
+    "sorted": "order", "sort": "order", "ordered": "order",
+}
+_TOKEN_RE = re.compile(r"[a-z0-9_.]+")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+_indexes = LRUCache(maxsize=NLQ_CACHE_INDEX_SIZE, name="nlq")
+
+
+def normalize_question(question: str) -> str:
+    """Lower-cased question with collapsed whitespace and no trailing punctuation."""
+    return " ".join(question.lower().split()).rstrip(" ?!.;")
+
+
+def schema_hash(schema_context: str) -> str:
+    return hashlib.sha256(schema_context.encode("utf-8")).hexdigest()[:32]
+
+
+def _words(normalized: str) -> List[str]:
+    return [w.strip(".") for w in _TOKEN_RE.findall(normalized) if w.strip(".")]
+
+
+def _content_words(normalized: str) -> FrozenSet[str]:
+    return frozenset(w for w in _words(normalized) if w not in _STOPWORDS)
+
+
+def _canonical(word: str) -> str:
+    """A content word with a plural -s dropped and synonyms folded together."""
+    if word not in _SYNONYMS and len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return _SYNONYMS.get(word, word)
+
+
+def _meaning_differs(words: FrozenSet[str], other: FrozenSet[str], vocabulary: FrozenSet[str]) -> bool:
+    """Whether two questions' content words differ in anything but filler words outside the schema."""
+    difference = {_canonical(w) for w in words} ^ {_canonical(w) for w in other}
+    return any(w not in _FILLER_WORDS or w in vocabulary for w in difference)
+
+
+def _schema_vocabulary(schema_context: str) -> FrozenSet[str]:
+    """Words of the schema context (table/column names, sample values), with snake_case names also split."""
+    words = set(_words(schema_context.lower()))
+    return frozenset(words | {part for word in words for part in word.split("_") if part})
+
+
+def _bucket(feature: str) -> Tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % EMBEDDING_DIM, 1.0 if (value >> 63) else -1.0
+
+
+def embed_question(normalized: str) -> np.ndarray:
+    """Unit-length float32 embedding of a normalized question (feature hashing, no model)."""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    for word in _content_words(normalized):
+        index, sign = _bucket(f"w:{word}")
+        vector[index] += sign
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            index, sign = _bucket(f"c:{padded[i:i + 3]}")
+            vector[index] += sign * TRIGRAM_WEIGHT
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class _SchemaIndex:
+    """Cached questions of one (table, schema) pair: exact lookup plus an embedding matrix."""
+
+    def __init__(self, rows: List[Tuple[int, str, str, bytes, float]], vocabulary: FrozenSet[str]):
+        self.vocabulary = vocabulary
+        self.lock = threading.Lock()
+        self.ids: List[int] = []
+        self.questions: List[str] = []
+        self.sqls: List[str] = []
+        self.created: List[float] = []
+        self.exact: Dict[str, int] = {}
+        vectors = []
+        for entry_id, question, sql, embedding, created_at in rows:
+            self._append(entry_id, question, sql, created_at)
+            vectors.append(np.frombuffer(embedding, dtype=np.float32))
+        self.matrix = np.vstack(vectors) if vectors else np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+
+    def _append(self, entry_id: int, question: str, sql: str, created_at: float) -> None:
+        self.exact[question] = len(self.ids)
+        self.ids.append(entry_id)
+        self.questions.append(question)
+        self.sqls.append(sql)
+        self.created.append(created_at)
+
+    def add(self, entry_id: int, question: str, sql: str, embedding: np.ndarray, created_at: float) -> None:
+        with self.lock:
+            if question in self.exact:
+                i = self.exact[question]
+                self.ids[i], self.sqls[i], self.created[i] = entry_id, sql, created_at
+                self.matrix[i] = embedding
+                return
+            self._append(entry_id, question, sql, created_at)
+            self.matrix = np.vstack([self.matrix, embedding[None, :]])
+
+    def find(self, question: str, embedding: np.ndarray, oldest: float) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            i = self.exact.get(question)
+            if i is not None and self.created[i] >= oldest:
+                return {"id": self.ids[i], "sql": self.sqls[i], "match": "exact", "similarity": 1.0, "question": question}
+            if not len(self.ids):
+                return None
+            similarities = self.matrix @ embedding
+            numbers = _NUMBER_RE.findall(question)
+            words = _content_words(question)
+            for i in np.argsort(-similarities)[:8]:
+                similarity = float(similarities[i])
+                if similarity < NLQ_SEMANTIC_THRESHOLD:
+                    break
+                if self.created[i] < oldest or _NUMBER_RE.findall(self.questions[i]) != numbers:
+                    continue
+                if _meaning_differs(words, _content_words(self.questions[i]), self.vocabulary):
+                    continue
+                return {
+                    "id": self.ids[i],
+                    "sql": self.sqls[i],
+                    "match": "semantic",
+                    "similarity": round(similarity, 4),
+                    "question": self.questions[i],
+                }
+            return None
+
+
+def _get_index(table_name: str, schema_context: str, digest: str) -> _SchemaIndex:
+    key = (table_name, digest)
+    index = _indexes.get(key)
+    if index is None:
+        with read_connection() as conn:
+            rows = conn.execute(
+                "SELECT id, question, sql, embedding, created_at FROM nlq_cache WHERE table_name = ? AND schema_hash = ? ORDER BY id",
+                (table_name, digest),
+            ).fetchall()
+        index = _SchemaIndex([tuple(r) for r in rows], _schema_vocabulary(schema_context))
+        _indexes.put(key, index)
+    return index
+
+
+def _record(dataset_id: str, outcome: str, entry_id: Optional[int] = None) -> None:
+    """Counts a lookup outcome for the dataset and refreshes the hit entry's LRU position."""
+    column = {"exact": "exact_hits", "semantic": "semantic_hits", "miss": "misses"}[outcome]
+    now = time.time()
+    try:
+        with write_connection() as conn:
+            conn.execute(
+                f"""
+                INSERT INTO nlq_cache_stats (dataset_id, {column}, updated_at) VALUES (?, 1, ?)
+                ON CONFLICT (dataset_id) DO UPDATE SET {column} = {column} + 1, updated_at = excluded.updated_at
+                """,
+                (dataset_id, now),
+            )
+            if entry_id is not None:
+                conn.execute("UPDATE nlq_cache SET hits = hits + 1, last_used_at = ? WHERE id = ?", (now, entry_id))
+    except Exception as e:
+        logger.warning(f"[NLQCache] Could not record {outcome} for dataset '{dataset_id}': {e}")
+
+
+def lookup_sql(dataset_id: str, table_name: str, schema_context: str, question: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the cached SQL for a question about a table, or None on a miss.
+
+    Returns:
+        {"sql", "match": "exact" | "semantic", "similarity", "question"}, where
+        `question` is the cached question that matched.
+    """
+    normalized = normalize_question(question)
+    index = _get_index(table_name, schema_context, schema_hash(schema_context))
+    hit = index.find(normalized, embed_question(normalized), time.time() - NLQ_CACHE_TTL_SECONDS)
+    if hit is None:
+        _record(dataset_id, "miss")
+        return None
+    _record(dataset_id, hit["match"], hit.pop("id"))
+    logger.info(f"[NLQCache] {hit['match']} hit for '{normalized}' on {table_name} (similarity {hit['similarity']})")
+    return hit
+
+
+def store_sql(dataset_id: str, table_name: str, schema_context: str, question: str, sql: str) -> None:
+    """
+    Caches validated SQL that ran successfully for a question; evicts expired
+    and least recently used entries. Failures are logged, not raised.
+    """
+    normalized = normalize_question(question)
+    if not normalized:
+        return
+    digest = schema_hash(schema_context)
+    embedding = embed_question(normalized)
+    now = time.time()
+    try:
+        with write_connection() as conn:
+            entry_id = conn.execute(
+                """
+                INSERT INTO nlq_cache (dataset_id, table_name, schema_hash, question, sql, embedding, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (table_name, schema_hash, question) DO UPDATE SET
+                    sql = excluded.sql, embedding = excluded.embedding,
+                    created_at = excluded.created_at, last_used_at = excluded.last_used_at
+                RETURNING id
+                """,
+                (dataset_id, table_name, digest, normalized, sql, embedding.tobytes(), now, now),
+            ).fetchone()[0]
+            evicted = conn.execute("DELETE FROM nlq_cache WHERE created_at < ?", (now - NLQ_CACHE_TTL_SECONDS,)).rowcount
+            evicted += conn.execute(
+                "DELETE FROM nlq_cache WHERE id IN (SELECT id FROM nlq_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (NLQ_CACHE_MAX_ENTRIES,),
+            ).rowcount
+    except Exception as e:
+        logger.warning(f"[NLQCache] Could not cache SQL for '{normalized}' on {table_name}: {e}")
+        return
+
+    if evicted:
+        # Rebuilt from SQLite on next use, without the evicted entries
+        _indexes.clear()
+        logger.info(f"[NLQCache] Evicted {evicted} cached questions")
+    else:
+        _get_index(table_name, schema_context, digest).add(entry_id, normalized, sql, embedding, now)
+
+
+def invalidate_nlq_cache(table_name: str) -> None:
+    """Drops every cached question about a table (persisted and in-process)."""
+    with write_connection() as conn:
+        conn.execute("DELETE FROM nlq_cache WHERE table_name = ?", (table_name,))
+    _indexes.invalidate_where(lambda key, _: key[0] == table_name)
+
+
+def nlq_cache_report(dataset_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Hit rates per dataset: exact and semantic hits, misses and cached questions.
+    Limited to one dataset when `dataset_id` is given.
+    """
+    where, params = ("WHERE s.dataset_id = ?", (dataset_id,)) if dataset_id else ("", ())
+    with read_connection() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT s.dataset_id, s.exact_hits, s.semantic_hits, s.misses,
+                   (SELECT COUNT(*) FROM nlq_cache c WHERE c.dataset_id = s.dataset_id) AS entries
+            FROM nlq_cache_stats s {where}
+            ORDER BY s.exact_hits + s.semantic_hits + s.misses DESC
+            """,
+            params,
+        ).fetchall()
+    report = []
+    for row in rows:
+        hits = row["exact_hits"] + row["semantic_hits"]
+        total = hits + row["misses"]
+        report.append({
+            "dataset_id": row["dataset_id"],
+            "exact_hits": row["exact_hits"],
+            "semantic_hits": row["semantic_hits"],
+            "misses": row["misses"],
+            "hit_rate": round(hits / total, 3) if total else None,
+            "entries": row["entries"],
+        })
+    return report
+
+
+def nlq_cache_stats() -> Dict[str, Any]:
+    return _indexes.stats()
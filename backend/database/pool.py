@@ -0,0 +1,212 @@
+"""
+Pooled SQLite connection layer.
+
+Every database access in the backend goes through this module instead of
+opening its own `sqlite3.connect`:
+
+- `read_connection()`: a per-thread, query-only connection that stays open for
+  the life of the thread. Readers never block each other (WAL mode).
+- `write_connection()`: a single shared writer guarded by a lock, so writes
+  from concurrent requests are serialized in-process instead of racing for
+  SQLite's file lock. Commits on success, rolls back on error.
+- `open_read_connection()`: a query-only connection the caller owns and
+  closes, for result streams and cursors that span requests.
+- `statement_deadline()`: interrupts statements on a connection that run
+  past a time budget (SQLite progress handler), raising TimeoutError.
+
+Connections are tuned once when opened (WAL, synchronous=NORMAL, larger page
+cache, memory-mapped I/O); read connections also cap string/blob values at
+DB_MAX_VALUE_BYTES. Pool metrics (checkouts, writer wait time, open
+connections) are exposed through `pool_metrics()`.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from loguru import logger
+
+from backend.config import DATABASE_FILE, DB_BUSY_TIMEOUT_MS, DB_CACHE_SIZE_KB, DB_MAX_VALUE_BYTES, DB_MMAP_SIZE_BYTES
+
+DEADLINE_CHECK_OPS = 10_000  # VM instructions between deadline checks (~sub-millisecond)
+
+CONNECTION_PRAGMAS: Dict[str, Any] = {
+    "synchronous": "NORMAL",             # Durable at checkpoints; safe with WAL
+    "cache_size": -DB_CACHE_SIZE_KB,     # Negative = KiB
+    "temp_store": "MEMORY",
+    "mmap_size": DB_MMAP_SIZE_BYTES,
+    "busy_timeout": DB_BUSY_TIMEOUT_MS,
+}
+
+
+class ConnectionPool:
+    """Per-thread read connections plus one serialized writer for a single SQLite file."""
+
+    def __init__(self, database: str):
+        self.database = database
+        self._local = threading.local()
+        self._writer: sqlite3.Connection | None = None
+        self._writer_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._readers: list[sqlite3.Connection] = []
+        self._pid = os.getpid()
+        self._wal_enabled = False
+        self._metrics = {
+            "read_checkouts": 0,
+            "write_checkouts": 0,
+            "write_wait_ms_total": 0.0,
+            "write_wait_ms_max": 0.0,
+            "connections_opened": 0,
+        }
+
+    def _connect(self, query_only: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.database, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        if not self._wal_enabled:
+            # journal_mode is persistent in the database file; setting it once is enough
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._wal_enabled = True
+        for name, value in CONNECTION_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        if query_only:
+            conn.execute("PRAGMA query_only=ON")
+            # Bounds what one function call can allocate (printf padding, replace,
+            # group_concat, ...), which the statement deadline cannot interrupt
+            conn.setlimit(sqlite3.SQLITE_LIMIT_LENGTH, DB_MAX_VALUE_BYTES)
+        with self._metrics_lock:
+            self._metrics["connections_opened"] += 1
+        return conn
+
+    def _check_fork(self) -> None:
+        """Connections must not cross a fork (e.g. into a process-pool worker); start fresh."""
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._writer = None
+            self._writer_lock = threading.Lock()
+            self._readers = []
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """Checks out this thread's query-only connection."""
+        self._check_fork()
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect(query_only=True)
+            self._local.conn = conn
+            with self._metrics_lock:
+                self._readers.append(conn)
+        with self._metrics_lock:
+            self._metrics["read_checkouts"] += 1
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Checks out the shared writer; only one thread holds it at a time."""
+        self._check_fork()
+        start = time.perf_counter()
+        with self._writer_lock:
+            waited_ms = (time.perf_counter() - start) * 1000
+            with self._metrics_lock:
+                self._metrics["write_checkouts"] += 1
+                self._metrics["write_wait_ms_total"] += waited_ms
+                self._metrics["write_wait_ms_max"] = max(self._metrics["write_wait_ms_max"], waited_ms)
+            if self._writer is None:
+                self._writer = self._connect(query_only=False)
+            conn = self._writer
+            try:
+                yield conn
+                if conn.in_transaction:
+                    conn.commit()
+            except Exception:
+                if conn.in_transaction:
+                    conn.rollback()
+                raise
+
+    def open_reader(self) -> sqlite3.Connection:
+        """
+        A query-only connection owned by the caller, for reads that outlive one
+        request or hop between threads (result streams, server-side cursors).
+        The caller closes it.
+        """
+        self._check_fork()
+        return self._connect(query_only=True)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+            metrics["read_connections"] = len(self._readers)
+        metrics["writer_open"] = self._writer is not None
+        metrics["write_wait_ms_total"] = round(metrics["write_wait_ms_total"], 3)
+        metrics["write_wait_ms_max"] = round(metrics["write_wait_ms_max"], 3)
+        writes = metrics["write_checkouts"]
+        metrics["write_wait_ms_avg"] = round(metrics["write_wait_ms_total"] / writes, 3) if writes else 0.0
+        return metrics
+
+    def close_all(self) -> None:
+        """Closes every pooled connection (used on shutdown)."""
+        with self._metrics_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                pass
+        self._local = threading.local()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+        logger.info(f"[DBPool] Closed {len(readers)} read connection(s) and the writer")
+
+
+_pool = ConnectionPool(DATABASE_FILE)
+
+
+def read_connection():
+    """Context manager yielding a pooled, query-only connection for the current thread."""
+    return _pool.read()
+
+
+def write_connection():
+    """Context manager yielding the serialized writer connection; commits on exit."""
+    return _pool.write()
+
+
+def open_read_connection() -> sqlite3.Connection:
+    """A caller-owned, query-only connection (see `ConnectionPool.open_reader`)."""
+    return _pool.open_reader()
+
+
+@contextmanager
+def statement_deadline(conn: sqlite3.Connection, seconds: float) -> Iterator[None]:
+    """
+    Interrupts whatever `conn` executes inside the block once `seconds` have
+    passed, and raises TimeoutError in place of SQLite's "interrupted" error.
+    Covers `execute` and the `fetch*` calls that step the statement.
+    """
+    deadline = time.monotonic() + seconds
+    conn.set_progress_handler(lambda: time.monotonic() > deadline, DEADLINE_CHECK_OPS)
+    try:
+        yield
+    except sqlite3.OperationalError as e:
+        if "interrupted" in str(e) and time.monotonic() > deadline:
+            raise TimeoutError(f"Query exceeded the {seconds:g}s statement timeout") from e
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+
+
+def pool_metrics() -> Dict[str, Any]:
+    return _pool.metrics()
+
+
+def close_pool() -> None:
+    _pool.close_all()
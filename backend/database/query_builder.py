@@ -0,0 +1,118 @@
+"""
+Parameterized SELECT builder for reading dataset tables.
+
+Lets callers push column projection, filters, row limits and sampling down
+into SQLite instead of materializing `SELECT *` and slicing in pandas.
+Identifiers are validated against the table's columns and quoted; values are
+always bound as parameters.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# (column, operator, value); value is ignored for the IS [NOT] NULL operators
+Filter = Tuple[str, str, Any]
+Filters = Union[Dict[str, Any], Sequence[Filter]]
+
+COMPARISON_OPS = {"=", "!=", "<", "<=", ">", ">=", "like"}
+LIST_OPS = {"in", "not in"}
+NULL_OPS = {"is null", "is not null"}
+
+SAMPLE_RESOLUTION = 1_000_000  # Granularity of sample_frac
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def normalize_filters(filters: Optional[Filters]) -> List[Filter]:
+    """
+    Accepts either {column: value} equality filters (a list/tuple/set value
+    means IN) or a sequence of (column, op, value) tuples.
+    """
+    if not filters:
+        return []
+    if isinstance(filters, dict):
+        return [
+            (col, "in", list(value)) if isinstance(value, (list, tuple, set)) else (col, "=", value)
+            for col, value in filters.items()
+        ]
+    return [(col, op.lower().strip(), value) for col, op, value in filters]
+
+
+def build_select(
+    table_name: str,
+    table_columns: Iterable[str],
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Filters] = None,
+    limit: Optional[int] = None,
+    sample_frac: Optional[float] = None,
+) -> Tuple[str, List[Any]]:
+    """
+    Builds a SELECT statement and its bound parameters.
+
+    Args:
+        table_name: The table to read.
+        table_columns: The table's actual columns, used to validate identifiers.
+        columns: Columns to project (all when None). Duplicates are dropped.
+        filters: Row filters, see `normalize_filters`.
+        limit: Maximum number of rows to return.
+        sample_frac: Fraction (0, 1] of rows to keep, sampled by SQLite.
+
+    Returns:
+        (sql, params)
+
+    Raises:
+        ValueError: On unknown columns, unsupported operators or out-of-range arguments.
+    """
+    known = set(table_columns)
+
+    if columns is not None:
+        columns = list(dict.fromkeys(columns))
+        unknown = [c for c in columns if c not in known]
+        if unknown:
+            raise ValueError(f"Unknown column(s) for table '{table_name}': {', '.join(map(str, unknown))}")
+        select_list = ", ".join(quote_identifier(c) for c in columns) if columns else "*"
+    else:
+        select_list = "*"
+
+    clauses: List[str] = []
+    params: List[Any] = []
+    for col, op, value in normalize_filters(filters):
+        if col not in known:
+            raise ValueError(f"Unknown filter column for table '{table_name}': {col}")
+        ident = quote_identifier(col)
+        if op in NULL_OPS:
+            clauses.append(f"{ident} {op.upper()}")
+        elif op in LIST_OPS:
+            values = list(value)
+            if not values:
+                clauses.append("0" if op == "in" else "1")
+                continue
+            clauses.append(f"{ident} {op.upper()} ({', '.join('?' for _ in values)})")
+            params.extend(values)
+        elif op in COMPARISON_OPS:
+            if value is None:
+                clauses.append(f"{ident} IS NULL" if op == "=" else f"{ident} IS NOT NULL")
+                continue
+            clauses.append(f"{ident} {op.upper()} ?")
+            params.append(value)
+        else:
+            raise ValueError(f"Unsupported filter operator: {op}")
+
+    if sample_frac is not None:
+        if not 0 < sample_frac <= 1:
+            raise ValueError("sample_frac must be in (0, 1]")
+        if sample_frac < 1:
+            # random() is a signed 64-bit int; fold it into [0, SAMPLE_RESOLUTION) without abs() overflow
+            clauses.append(f"((random() % {SAMPLE_RESOLUTION}) + {SAMPLE_RESOLUTION}) % {SAMPLE_RESOLUTION} < ?")
+            params.append(int(sample_frac * SAMPLE_RESOLUTION))
+
+    sql = f"SELECT {select_list} FROM {quote_identifier(table_name)}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    if limit is not None:
+        if limit < 0:
+            raise ValueError("limit must be non-negative")
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    return sql, params
@@ -0,0 +1,224 @@
+"""
+Query result cache for generated SQL (NLQ and the SQL agent).
+
+Results are keyed on the normalized SQL text plus the version of every table
+the statement reads. The tables come from SQLite itself: the statement is
+compiled under `EXPLAIN` with an authorizer that records each table read,
+so views, subqueries and joins are covered without parsing SQL here.
+
+Table versions live in the `table_versions` table and are bumped by every
+write path (`invalidate_query_results`: load, append, delete, and cleaning of
+the source), so a write from a job worker process invalidates this
+process's entries too. Results are stored as pickled column lists in an
+in-process LRU bounded by QUERY_CACHE_MAX_BYTES; results larger than
+QUERY_CACHE_MAX_RESULT_BYTES are not cached, and neither are results of
+statements that call random() or read the current time (CURRENT_TIMESTAMP,
+date('now'), ...), which would otherwise stay stale until the next write.
+"""
+
+import hashlib
+import pickle
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+from backend.config import QUERY_CACHE_MAX_BYTES, QUERY_CACHE_MAX_RESULT_BYTES, SQL_STATEMENT_TIMEOUT_SECONDS
+from backend.database.pool import read_connection, statement_deadline, write_connection
+from backend.database.running_queries import track_query
+from backend.utils.cache import LRUCache, SizedLRUCache
+
+TABLES_CACHE_SIZE = 1024  # Normalized statements whose table list (and cacheability) is remembered
+
+_results = SizedLRUCache(max_bytes=QUERY_CACHE_MAX_BYTES, name="query_results")
+_tables = LRUCache(maxsize=TABLES_CACHE_SIZE, name="query_tables")
+# Functions whose result changes between runs: results calling them are never cached
+VOLATILE_FUNCTIONS = frozenset({
+    "random", "randomblob", "current_date", "current_time", "current_timestamp",
+    "changes", "total_changes", "last_insert_rowid",
+})
+# Date/time functions and the positions of their time-value arguments; a
+# missing time value defaults to 'now', so such calls are volatile too
+DATETIME_FUNCTIONS = {
+    "date": (0,), "time": (0,), "datetime": (0,), "julianday": (0,), "unixepoch": (0,),
+    "strftime": (1,), "timediff": (0, 1),
+}
+
+_DATETIME_CALL_RE = re.compile(r"(?<![\w.])(" + "|".join(DATETIME_FUNCTIONS) + r")\s*\(")
+_WHITESPACE_RE = re.compile(r"\s+")
+_QUOTED_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])""")
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    SQL with whitespace collapsed, trailing semicolons dropped and everything
+    outside string literals and quoted identifiers lower-cased.
+    """
+    parts = _QUOTED_RE.split(sql.strip().rstrip(";").strip())
+    return "".join(part if i % 2 else _WHITESPACE_RE.sub(" ", part.lower()) for i, part in enumerate(parts)).strip()
+
+
+def _call_arguments(sql: str, start: int) -> List[str]:
+    """Top-level arguments of the call whose opening parenthesis precedes `start`."""
+    arguments: List[str] = []
+    depth, quote, begin = 0, None, start
+    for i in range(start, len(sql)):
+        ch = sql[i]
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"`":
+            quote = ch
+        elif ch == "[":
+            quote = "]"
+        elif ch == "(":
+            depth += 1
+        elif ch == ")" and depth:
+            depth -= 1
+        elif ch in ",)" and not depth:
+            arguments.append(sql[begin:i].strip())
+            if ch == ")":
+                break
+            begin = i + 1
+    return [] if arguments == [""] else arguments
+
+
+def _is_volatile(functions: Set[str], normalized: str) -> bool:
+    """Whether the called functions make the result differ between runs of the same statement."""
+    if functions & VOLATILE_FUNCTIONS:
+        return True
+    called = functions & DATETIME_FUNCTIONS.keys()
+    if not called:
+        return False
+    # The authorizer does not show arguments, so each call site's time values
+    # are read from the text: missing or 'now' means the current time
+    sites = list(_DATETIME_CALL_RE.finditer(normalized))
+    if not called <= {m.group(1) for m in sites}:
+        return True  # Called in a form not recognized here (e.g. a quoted name)
+    for match in sites:
+        arguments = _call_arguments(normalized, match.end())
+        for position in DATETIME_FUNCTIONS[match.group(1)]:
+            if position >= len(arguments) or arguments[position].lower() == "'now'":
+                return True
+    return False
+
+
+def _statement_info(sql: str) -> Tuple[Tuple[str, ...], bool]:
+    """
+    (tables read, cacheable) for a statement, as reported by SQLite's
+    authorizer while compiling it. Not cacheable when it calls random() or
+    reads the current time.
+    """
+    normalized = normalize_sql(sql)
+    info = _tables.get(normalized)
+    if info is not None:
+        return info
+
+    seen = set()
+    functions = set()
+
+    def authorizer(action, arg1, arg2, db_name, trigger):
+        if action == sqlite3.SQLITE_READ and arg1:
+            seen.add(arg1)
+        elif action == sqlite3.SQLITE_FUNCTION and arg2:
+            functions.add(arg2.lower())
+        return sqlite3.SQLITE_OK
+
+    with read_connection() as conn:
+        conn.set_authorizer(authorizer)
+        try:
+            conn.execute(f"EXPLAIN {normalized}").fetchall()
+        finally:
+            conn.set_authorizer(None)
+    info = (tuple(sorted(seen)), not _is_volatile(functions, normalized))
+    _tables.put(normalized, info)
+    return info
+
+
+def referenced_tables(sql: str) -> Tuple[str, ...]:
+    """Tables the statement reads, as reported by SQLite's authorizer while compiling it."""
+    return _statement_info(sql)[0]
+
+
+def _table_versions(conn, tables: Tuple[str, ...]) -> Tuple[Tuple[str, int], ...]:
+    if not tables:
+        return ()
+    rows = conn.execute(
+        f"SELECT table_name, version FROM table_versions WHERE table_name IN ({', '.join('?' * len(tables))})",
+        tables,
+    ).fetchall()
+    versions = {row["table_name"]: row["version"] for row in rows}
+    return tuple((t, versions.get(t, 0)) for t in tables)
+
+
+def _cache_key(normalized: str, versions: Tuple[Tuple[str, int], ...]) -> str:
+    payload = repr((normalized, versions))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def run_cached_query(sql: str, max_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Executes a read-only statement, or serves its result from the cache.
+
+    Args:
+        max_rows: Rows returned at most; a longer result is cut off, flagged
+                  as truncated and not cached.
+
+    Returns:
+        {"columns", "rows" (list of tuples), "cached" (bool), "truncated" (bool)}
+
+    Raises:
+        TimeoutError: If executing takes longer than SQL_STATEMENT_TIMEOUT_SECONDS.
+        QueryCancelled: If the statement is cancelled while it runs (see running_queries).
+    """
+    normalized = normalize_sql(sql)
+    tables, cacheable = _statement_info(sql)
+    with read_connection() as conn:
+        # The versions are read before the rows, so a write that lands in
+        # between leaves an entry under the old version, never a stale one
+        # under the new version
+        versions = _table_versions(conn, tables)
+        key = _cache_key(normalized, versions)
+        entry = _results.get(key) if cacheable else None
+        if entry is not None:
+            columns, column_values = pickle.loads(entry[0][1])
+            rows = list(zip(*column_values))
+            truncated = max_rows is not None and len(rows) > max_rows
+            return {"columns": columns, "rows": rows[:max_rows] if truncated else rows, "cached": True, "truncated": truncated}
+
+        with track_query(conn, sql), statement_deadline(conn, SQL_STATEMENT_TIMEOUT_SECONDS):
+            cur = conn.execute(sql)
+            try:
+                rows = [tuple(row) for row in (cur.fetchall() if max_rows is None else cur.fetchmany(max_rows + 1))]
+                columns = [d[0] for d in cur.description] if cur.description else []
+            finally:
+                cur.close()  # Ends a statement cut off by max_rows or the deadline
+
+    if max_rows is not None and len(rows) > max_rows:
+        return {"columns": columns, "rows": rows[:max_rows], "cached": False, "truncated": True}
+    if not cacheable:
+        return {"columns": columns, "rows": rows, "cached": False, "truncated": False}
+
+    # Column-wise lists pickle smaller than row tuples
+    payload = pickle.dumps((columns, [list(c) for c in zip(*rows)] or [[] for _ in columns]), protocol=pickle.HIGHEST_PROTOCOL)
+    if len(payload) <= QUERY_CACHE_MAX_RESULT_BYTES:
+        _results.put(key, ((tables, payload), len(payload)))
+    return {"columns": columns, "rows": rows, "cached": False, "truncated": False}
+
+
+def invalidate_query_results(table_name: str) -> None:
+    """Bumps a table's version (so every process stops serving results read from it) and drops local entries."""
+    with write_connection() as conn:
+        conn.execute(
+            "INSERT INTO table_versions (table_name, version) VALUES (?, 1) "
+            "ON CONFLICT (table_name) DO UPDATE SET version = version + 1",
+            (table_name,),
+        )
+    dropped = _results.invalidate_where(lambda _, entry: table_name in entry[0][0])
+    if dropped:
+        logger.info(f"[QueryCache] Evicted {dropped} cached query results for '{table_name}'")
+
+
+def query_cache_stats() -> Dict[str, Any]:
+    return _results.stats()
@@ -0,0 +1,114 @@
+"""
+Result cache for analytics endpoints (insights, profiles): computed results
+are persisted in the `result_cache` table with an in-process LRU in front.
+
+Dataset tables are immutable once written (cleaning writes a new table), so
+a result is keyed on the table it was computed from, the version of the engine
+that computed it and the request parameters. Bumping an engine's version
+string orphans its old entries; writing to or deleting a table evicts them.
+"""
+
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from loguru import logger
+
+from backend.config import RESULT_CACHE_SIZE
+from backend.database.pool import read_connection, write_connection
+from backend.utils.cache import LRUCache
+from backend.utils.data_utils import json_default
+
+_result_cache = LRUCache(maxsize=RESULT_CACHE_SIZE, name="results")
+_counter_lock = threading.Lock()
+_counters = {"persisted_hits": 0, "misses": 0}
+
+
+def cache_key(kind: str, table_name: str, engine_version: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key for a (kind, table, engine version, parameters) combination."""
+    payload = json.dumps([kind, table_name, engine_version, params or {}], sort_keys=True, default=json_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_result(kind: str, table_name: str, engine_version: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    """Returns a cached result (LRU first, then SQLite), or None."""
+    key = cache_key(kind, table_name, engine_version, params)
+    entry = _result_cache.get(key)  # (table_name, result)
+    if entry is not None:
+        return entry[1]
+
+    with read_connection() as conn:
+        row = conn.execute("SELECT result_json FROM result_cache WHERE cache_key = ?", (key,)).fetchone()
+
+    with _counter_lock:
+        _counters["persisted_hits" if row else "misses"] += 1
+    if not row:
+        return None
+
+    result = json.loads(row["result_json"])
+    _result_cache.put(key, (table_name, result))
+    return result
+
+
+def put_result(kind: str, table_name: str, engine_version: str, params: Optional[Dict[str, Any]], result: Dict[str, Any]) -> None:
+    """Stores a result in the LRU and persists it; persistence failures are logged, not raised."""
+    key = cache_key(kind, table_name, engine_version, params)
+    _result_cache.put(key, (table_name, result))
+    try:
+        with write_connection() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO result_cache (cache_key, table_name, kind, engine_version, params_json, result_json)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    key,
+                    table_name,
+                    kind,
+                    engine_version,
+                    json.dumps(params or {}, sort_keys=True, default=json_default),
+                    json.dumps(result, default=json_default),
+                ),
+            )
+    except Exception as e:
+        logger.warning(f"[ResultCache] Could not persist {kind} result for '{table_name}': {e}")
+
+
+def cached_result(
+    kind: str,
+    table_name: str,
+    engine_version: str,
+    params: Optional[Dict[str, Any]],
+    compute: Callable[[], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Returns the cached result for the key, computing and storing it on a miss."""
+    result = get_result(kind, table_name, engine_version, params)
+    if result is None:
+        result = compute()
+        put_result(kind, table_name, engine_version, params, result)
+    return result
+
+
+def invalidate_results(table_name: str) -> None:
+    """Evicts every cached result computed from a table (persisted and in-process)."""
+    with write_connection() as conn:
+        conn.execute("DELETE FROM result_cache WHERE table_name = ?", (table_name,))
+    dropped = _result_cache.invalidate_where(lambda _, entry: entry[0] == table_name)
+    if dropped:
+        logger.info(f"[ResultCache] Evicted {dropped} cached results for '{table_name}'")
+
+
+def result_cache_stats() -> Dict[str, Any]:
+    with _counter_lock:
+        counters = dict(_counters)
+    memory = _result_cache.stats()
+    hits = memory["hits"] + counters["persisted_hits"]
+    total = hits + counters["misses"]
+    return {
+        "memory": memory,
+        "persisted_hits": counters["persisted_hits"],
+        "hits": hits,
+        "misses": counters["misses"],
+        "hit_rate": round(hits / total, 3) if total else None,
+    }
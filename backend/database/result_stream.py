@@ -0,0 +1,245 @@
+"""
+Bounded-memory delivery of query results: NDJSON streams and server-side
+cursors for paginated reads.
+
+Both hold their own query-only connection (`open_read_connection`) and pull
+rows with `fetchmany`, so only one batch or page is in memory at a time and
+the first rows go out as soon as SQLite produces them. Every result is capped
+at NLQ_RESULT_MAX_ROWS rows and NLQ_RESULT_MAX_BYTES bytes of encoded JSON;
+past either ceiling the result ends with `truncated: true`. Executing the
+statement and each fetch are bounded by SQL_STATEMENT_TIMEOUT_SECONDS, and
+an open cursor is listed among the running queries until it is closed, so
+it can be killed (see running_queries).
+
+Cursors live in an in-process registry under a random token. They are closed
+when exhausted, when idle for NLQ_CURSOR_TTL_SECONDS, or when the registry is
+full and a new cursor needs the slot (least recently used first). Each one
+holds a read transaction open, which keeps SQLite from checkpointing past it,
+hence the short TTL.
+"""
+
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+from backend.config import (
+    NLQ_CURSOR_TTL_SECONDS,
+    NLQ_MAX_OPEN_CURSORS,
+    NLQ_RESULT_MAX_BYTES,
+    NLQ_RESULT_MAX_ROWS,
+    SQL_STATEMENT_TIMEOUT_SECONDS,
+)
+from backend.database.pool import open_read_connection, statement_deadline
+from backend.database.running_queries import QueryCancelled, interruptible, register_query, unregister_query
+from backend.utils.data_utils import json_default
+
+
+def encode_json(value: Any) -> bytes:
+    return json.dumps(value, default=json_default, separators=(",", ":")).encode("utf-8")
+
+
+class ResultCursor:
+    """A statement being read page by page on its own connection, within the row/byte ceilings."""
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.lock = threading.RLock()  # Held while fetching; closing from another thread waits for it
+        self.cancelled: Optional[str] = None
+        self.done = False
+        self.conn = open_read_connection()
+        try:
+            # Registered for the cursor's whole life, so a kill also reaches it between pages
+            self.query_id = register_query(self.conn, sql, on_cancel=self._cancelled)
+        except Exception:
+            self.conn.close()
+            raise
+        try:
+            with interruptible(self.query_id), statement_deadline(self.conn, SQL_STATEMENT_TIMEOUT_SECONDS):
+                self.cursor = self.conn.execute(sql)
+        except Exception:
+            self.close()
+            raise
+        self.columns = [d[0] for d in self.cursor.description] if self.cursor.description else []
+        self.rows_sent = 0
+        self.bytes_sent = 0
+        self._peeked: Optional[Any] = None
+        self.truncated = False
+        self.last_used = time.monotonic()
+
+    def _next_rows(self, count: int) -> List[Any]:
+        rows: List[Any] = []
+        if self._peeked is not None and count > 0:
+            rows.append(self._peeked)
+            self._peeked = None
+            count -= 1
+        if count > 0:
+            with interruptible(self.query_id), statement_deadline(self.conn, SQL_STATEMENT_TIMEOUT_SECONDS):
+                rows += self.cursor.fetchmany(count)
+        return rows
+
+    def fetch(self, max_rows: int) -> Tuple[List[Tuple[Any, ...]], List[bytes]]:
+        """
+        The next rows (at most `max_rows`) and their JSON encodings. Marks the
+        cursor done when the result is exhausted or a ceiling is reached.
+
+        Raises:
+            QueryCancelled: If the cursor was cancelled (the cursor is closed).
+        """
+        rows: List[Tuple[Any, ...]] = []
+        encoded: List[bytes] = []
+        with self.lock:
+            if self.cancelled:
+                self.close()
+                raise QueryCancelled(self.cancelled)
+            if self.done:
+                return rows, encoded
+            self.last_used = time.monotonic()
+            wanted = max(0, min(max_rows, NLQ_RESULT_MAX_ROWS - self.rows_sent))
+            # One row of look-ahead tells whether anything follows this page
+            try:
+                batch = self._next_rows(wanted + 1)
+            except Exception:
+                self.close()
+                raise
+            if len(batch) > wanted:
+                self._peeked = batch.pop()
+            for row in batch:
+                row = tuple(row)
+                line = encode_json(row)
+                if self.bytes_sent + len(line) > NLQ_RESULT_MAX_BYTES:
+                    self.truncated = True
+                    break
+                rows.append(row)
+                encoded.append(line)
+                self.bytes_sent += len(line)
+            self.rows_sent += len(rows)
+            if self._peeked is not None and self.rows_sent >= NLQ_RESULT_MAX_ROWS:
+                self.truncated = True
+            if self.truncated or self._peeked is None:
+                self.close()
+            return rows, encoded
+
+    def _cancelled(self, reason: str) -> None:
+        # Called from the cancelling thread: close now if idle, otherwise the
+        # interrupted fetch closes it
+        self.cancelled = reason
+        if self.lock.acquire(blocking=False):
+            try:
+                self.close()
+            finally:
+                self.lock.release()
+
+    def close(self) -> None:
+        with self.lock:
+            if not self.done:
+                self.done = True
+                unregister_query(self.query_id)
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                pass
+
+
+def iter_ndjson(meta: Dict[str, Any], cursor: ResultCursor, batch_rows: int) -> Iterator[bytes]:
+    """
+    NDJSON stream of an open cursor's result: the meta object plus "columns",
+    one JSON array per row, then {"row_count", "truncated"} - or {"error"} if
+    reading fails once the stream has started. Closes the cursor when done or
+    when the client goes away.
+    """
+    try:
+        yield encode_json({**meta, "columns": cursor.columns}) + b"\n"
+        while not cursor.done:
+            _, encoded = cursor.fetch(batch_rows)
+            if encoded:
+                yield b"\n".join(encoded) + b"\n"
+        yield encode_json({"row_count": cursor.rows_sent, "truncated": cursor.truncated}) + b"\n"
+    except Exception as e:
+        logger.warning(f"[ResultStream] Stream failed after {cursor.rows_sent} rows: {e}")
+        yield encode_json({"error": str(e), "row_count": cursor.rows_sent}) + b"\n"
+    finally:
+        cursor.close()
+
+
+# --- Server-side cursors ---
+
+_cursors: "OrderedDict[str, ResultCursor]" = OrderedDict()
+_cursors_lock = threading.Lock()
+_cursor_counters = {"opened": 0, "expired": 0, "evicted": 0}
+
+
+def _expire_cursors() -> None:
+    """Closes idle cursors; the caller holds `_cursors_lock`."""
+    now = time.monotonic()
+    for token in [t for t, c in _cursors.items() if now - c.last_used > NLQ_CURSOR_TTL_SECONDS]:
+        _cursors.pop(token).close()
+        _cursor_counters["expired"] += 1
+
+
+def register_cursor(cursor: ResultCursor) -> str:
+    """Registers an open cursor for paginated reads; returns its token."""
+    token = secrets.token_urlsafe(16)
+    with _cursors_lock:
+        _expire_cursors()
+        while len(_cursors) >= NLQ_MAX_OPEN_CURSORS:
+            _, oldest = _cursors.popitem(last=False)
+            oldest.close()
+            _cursor_counters["evicted"] += 1
+        _cursors[token] = cursor
+        _cursor_counters["opened"] += 1
+    return token
+
+
+def fetch_page(token: str, page_size: int, cursor: Optional[ResultCursor] = None) -> Dict[str, Any]:
+    """
+    The next page of a registered cursor as pre-encoded JSON parts.
+
+    Returns:
+        {"columns", "rows_json" (bytes of a JSON array), "row_count",
+         "cursor" (token of the next page, or None), "truncated"}
+
+    Raises:
+        KeyError: If the token is unknown, exhausted or expired.
+        TimeoutError: If reading the page exceeds the statement timeout (the cursor is closed).
+    """
+    if cursor is None:
+        with _cursors_lock:
+            _expire_cursors()
+            cursor = _cursors.get(token)
+            if cursor is None:
+                raise KeyError(token)
+            _cursors.move_to_end(token)
+    try:
+        with cursor.lock:
+            rows, encoded = cursor.fetch(page_size)
+    finally:
+        if cursor.done:
+            with _cursors_lock:
+                _cursors.pop(token, None)
+    return {
+        "columns": cursor.columns,
+        "rows_json": b"[" + b",".join(encoded) + b"]",
+        "row_count": len(rows),
+        "cursor": None if cursor.done else token,
+        "truncated": cursor.truncated,
+    }
+
+
+def close_cursor(token: str) -> bool:
+    with _cursors_lock:
+        cursor = _cursors.pop(token, None)
+    if cursor is None:
+        return False
+    cursor.close()
+    return True
+
+
+def cursor_metrics() -> Dict[str, Any]:
+    with _cursors_lock:
+        return {"open": len(_cursors), "max_open": NLQ_MAX_OPEN_CURSORS, **_cursor_counters}
@@ -0,0 +1,195 @@
+"""
+Registry of running generated-SQL statements (NLQ and the SQL agent), and
+their cancellation.
+
+Statements run inside `track_query` (or are registered for their lifetime
+by a streamed/paged cursor), which records the SQL, where it came from and
+when it started. `cancel_query` interrupts the statement's connection
+(`sqlite3.Connection.interrupt`, safe from any thread); the thread running
+it gets QueryCancelled instead of SQLite's "interrupted" error. Time limits
+are enforced separately by `statement_deadline` in backend.database.pool.
+
+A `QueryScope` carries one request's cancellation across threads: the async
+handler opens it (a context variable, which `run_io` copies into its worker
+threads) and cancels it when the HTTP client or WebSocket goes away. Every
+statement registered inside the scope is then interrupted, and statements
+started after that are refused.
+
+The registry is per process: with several API workers, a kill only reaches
+statements of the worker that serves it.
+"""
+
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from loguru import logger
+
+
+class QueryCancelled(Exception):
+    """The statement was cancelled (client gone, or killed by an admin) before it finished."""
+
+
+class QueryScope:
+    """Cancellation shared by every statement one request or chat message runs."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self.cancelled: Optional[str] = None  # Reason, once cancelled
+        self.query_ids: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def cancel(self, reason: str) -> int:
+        """Interrupts the scope's running statements and refuses new ones; returns how many were interrupted."""
+        with self._lock:
+            if self.cancelled is None:
+                self.cancelled = reason
+            query_ids = list(self.query_ids)
+        return sum(cancel_query(query_id, reason) for query_id in query_ids)
+
+
+_current_scope: ContextVar[Optional[QueryScope]] = ContextVar("query_scope", default=None)
+
+
+@contextmanager
+def query_scope(label: str) -> Iterator[QueryScope]:
+    """Makes a new scope current for the block (and for run_io calls made from it)."""
+    scope = QueryScope(label)
+    token = _current_scope.set(scope)
+    try:
+        yield scope
+    finally:
+        _current_scope.reset(token)
+
+
+def current_scope() -> Optional[QueryScope]:
+    return _current_scope.get()
+
+
+_running: Dict[str, Dict[str, Any]] = {}
+_running_lock = threading.Lock()
+_counters = {"started": 0, "cancelled": 0, "timed_out": 0}
+
+
+def register_query(conn: sqlite3.Connection, sql: str, on_cancel: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Registers a statement about to run on `conn`; returns its query id.
+    `on_cancel(reason)` runs after the interrupt (e.g. to close an idle
+    cursor) and must not block.
+
+    Raises:
+        QueryCancelled: If the current scope has already been cancelled.
+    """
+    scope = current_scope()
+    query_id = secrets.token_hex(8)
+    entry = {
+        "query_id": query_id,
+        "sql": sql,
+        "scope": scope.label if scope else None,
+        "started_at": time.time(),
+        "cancelled": None,
+        "conn": conn,
+        "on_cancel": on_cancel,
+        "scope_ref": scope,
+        "active": True,  # Cleared on unregister, under "lock", so a late interrupt cannot hit the connection's next statement
+        "lock": threading.Lock(),
+    }
+    if scope is not None:
+        with scope._lock:
+            if scope.cancelled:
+                raise QueryCancelled(scope.cancelled)
+            scope.query_ids.add(query_id)
+    with _running_lock:
+        _running[query_id] = entry
+        _counters["started"] += 1
+    return query_id
+
+
+def unregister_query(query_id: str) -> None:
+    with _running_lock:
+        entry = _running.pop(query_id, None)
+    if entry is None:
+        return
+    # Waits for an interrupt in progress; the connection is reused only after this returns
+    with entry["lock"]:
+        entry["active"] = False
+    if entry["scope_ref"] is not None:
+        with entry["scope_ref"]._lock:
+            entry["scope_ref"].query_ids.discard(query_id)
+
+
+def cancel_query(query_id: str, reason: str = "killed") -> bool:
+    """Interrupts a running statement; False if no statement has that id."""
+    with _running_lock:
+        entry = _running.get(query_id)
+        if entry is None or entry["cancelled"]:
+            return entry is not None
+        entry["cancelled"] = reason
+        _counters["cancelled"] += 1
+    with entry["lock"]:
+        if not entry["active"]:
+            return True  # Finished meanwhile; its connection may already run another statement
+        entry["conn"].interrupt()
+    if entry["on_cancel"] is not None:
+        entry["on_cancel"](reason)
+    logger.info(f"[Queries] Cancelled {query_id} ({reason}) after {time.time() - entry['started_at']:.1f}s")
+    return True
+
+
+@contextmanager
+def interruptible(query_id: str) -> Iterator[None]:
+    """Turns SQLite's "interrupted" error into QueryCancelled when the statement was cancelled; counts timeouts."""
+    try:
+        yield
+    except TimeoutError:
+        with _running_lock:
+            _counters["timed_out"] += 1
+        raise
+    except sqlite3.OperationalError as e:
+        with _running_lock:
+            entry = _running.get(query_id)
+            reason = entry["cancelled"] if entry else None
+        if reason and "interrupted" in str(e):
+            raise QueryCancelled(reason) from e
+        raise
+
+
+@contextmanager
+def track_query(conn: sqlite3.Connection, sql: str) -> Iterator[str]:
+    """Registers the statement run on `conn` inside the block; yields its query id."""
+    query_id = register_query(conn, sql)
+    try:
+        with interruptible(query_id):
+            yield query_id
+    finally:
+        unregister_query(query_id)
+
+
+def list_running_queries() -> List[Dict[str, Any]]:
+    """Running statements, longest-running first."""
+    now = time.time()
+    with _running_lock:
+        entries = list(_running.values())
+    return sorted(
+        (
+            {
+                "query_id": e["query_id"],
+                "sql": e["sql"],
+                "scope": e["scope"],
+                "started_at": e["started_at"],
+                "elapsed_s": round(now - e["started_at"], 3),
+                "cancelled": e["cancelled"],
+            }
+            for e in entries
+        ),
+        key=lambda e: e["started_at"],
+    )
+
+
+def running_query_metrics() -> Dict[str, Any]:
+    with _running_lock:
+        return {"running": len(_running), **_counters}
@@ -0,0 +1,137 @@
+"""
+Schema context store: persists the LLM schema context, per-column stats and
+sample values generated at ingestion/cleaning time in the `dataset_schema`
+table, with an in-process LRU in front of it.
+
+Agents read the schema from here on every turn instead of re-running
+`PRAGMA table_info` against the data table (which also loses the samples).
+Dataset tables are immutable once written, so entries only go stale when a
+dataset is deleted or cleaned; both paths invalidate explicitly.
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from loguru import logger
+
+from backend.config import SCHEMA_CACHE_SIZE
+from backend.database.pool import read_connection, write_connection
+from backend.utils.cache import LRUCache
+
+SCHEMA_BACKFILL_ROWS = 1000  # Rows sampled when rebuilding the schema of a pre-existing table
+
+_schema_cache = LRUCache(maxsize=SCHEMA_CACHE_SIZE, name="schema")
+
+
+def save_schema(
+    dataset_id: str,
+    table_name: str,
+    schema_context: str,
+    row_count: int,
+    columns: List[Dict[str, Any]],
+) -> None:
+    """
+    Persists the schema context and column summaries for a dataset table.
+
+    Args:
+        dataset_id: The dataset the table belongs to.
+        table_name: The SQLite table the schema describes.
+        schema_context: The LLM-ready schema string.
+        row_count: Number of rows in the table.
+        columns: One dict per column: name, sql_type, samples, null_count.
+    """
+    with write_connection() as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO dataset_schema
+                (dataset_id, table_name, schema_context, row_count, column_count, columns_json)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (dataset_id, table_name, schema_context, row_count, len(columns), json.dumps(columns, default=str)),
+        )
+
+    _schema_cache.put(table_name, _entry(dataset_id, table_name, schema_context, row_count, columns))
+
+
+def get_schema(table_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the stored schema entry for a table (LRU first, then SQLite),
+    or None if the table has no stored schema.
+
+    Entry keys: dataset_id, table_name, schema_context, row_count, columns.
+    """
+    entry = _schema_cache.get(table_name)
+    if entry is not None:
+        return entry
+
+    with read_connection() as conn:
+        row = conn.execute(
+            "SELECT dataset_id, table_name, schema_context, row_count, columns_json FROM dataset_schema WHERE table_name = ?",
+            (table_name,),
+        ).fetchone()
+
+    if not row:
+        return None
+
+    entry = _entry(row["dataset_id"], row["table_name"], row["schema_context"], row["row_count"], json.loads(row["columns_json"] or "[]"))
+    _schema_cache.put(table_name, entry)
+    return entry
+
+
+def get_schema_context(table_name: str) -> str:
+    """
+    Returns the LLM schema context for a table.
+
+    Tables ingested before the schema store existed have no entry; their
+    context is rebuilt once from a small sample of the table and persisted.
+    """
+    entry = get_schema(table_name)
+    if entry is None:
+        entry = _backfill_schema(table_name)
+    return entry["schema_context"]
+
+
+def invalidate_schema(table_name: Optional[str] = None, dataset_id: Optional[str] = None) -> None:
+    """Drops cached entries for a table and/or every table of a dataset (in-process only)."""
+    if table_name:
+        _schema_cache.invalidate(table_name)
+    if dataset_id:
+        _schema_cache.invalidate_where(lambda _, entry: entry["dataset_id"] == dataset_id)
+
+
+def delete_schema(dataset_id: str) -> None:
+    """Removes the persisted and cached schema entries of a dataset."""
+    with write_connection() as conn:
+        conn.execute("DELETE FROM dataset_schema WHERE dataset_id = ?", (dataset_id,))
+    invalidate_schema(dataset_id=dataset_id)
+
+
+def schema_cache_stats() -> Dict[str, Any]:
+    return _schema_cache.stats()
+
+
+def _entry(dataset_id: str, table_name: str, schema_context: str, row_count: int, columns: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "dataset_id": dataset_id,
+        "table_name": table_name,
+        "schema_context": schema_context,
+        "row_count": row_count,
+        "columns": columns,
+    }
+
+
+def _backfill_schema(table_name: str) -> Dict[str, Any]:
+    # Imported lazily: file_manager imports this module
+    from backend.database.file_manager import FileIngestionManager
+
+    logger.info(f"[SchemaStore] No stored schema for '{table_name}', rebuilding from a sample")
+    with read_connection() as conn:
+        sample = pd.read_sql_query(f'SELECT * FROM "{table_name}" LIMIT {SCHEMA_BACKFILL_ROWS}', conn)
+        row_count = conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+        owner = conn.execute("SELECT id FROM datasets WHERE table_name = ?", (table_name,)).fetchone()
+
+    # SQLite hands dates back as text; re-infer so the context shows DATETIME again
+    sample = FileIngestionManager._infer_and_cast_types(sample)
+    FileIngestionManager.cache_schema(sample, owner["id"] if owner else "", table_name, row_count=row_count)
+    return get_schema(table_name)
@@ -1,16 +1,22 @@
-import sqlite3
+import time
 import pandas as pd
-from typing import List, Dict, Any, Optional
-
-from backend.config import DATABASE_FILE
-
-def get_db_connection():
-    """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DATABASE_FILE)
-    conn.row_factory = sqlite3.Row
-    return conn
-
-def load_dataframe_to_db(df: pd.DataFrame, table_name: str, if_exists: str = "replace"):
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Sequence
+from loguru import logger
+
+from backend.config import APPROX_INSIGHTS_CHUNK_ROWS
+from backend.database import columnar_store
+from backend.database.bulk_loader import bulk_load, iter_batches
+from backend.database.pool import read_connection, write_connection
+from backend.database.query_builder import Filters, build_select, quote_identifier
+from backend.database.nlq_cache import invalidate_nlq_cache
+from backend.database.query_cache import invalidate_query_results
+from backend.database.result_cache import invalidate_results
+from backend.database.schema_store import delete_schema, get_schema
+from backend.database.column_catalog import chart_type
+
+BYTES_ESTIMATE_SAMPLE = 1000  # Values sampled per text column when estimating frame size for logs
+
+def load_dataframe_to_db(df: pd.DataFrame, table_name: str, if_exists: str = "replace") -> Dict[str, Any]:
     """
     Loads a pandas DataFrame into a specified SQLite table.
 
@@ -18,49 +24,189 @@ def load_dataframe_to_db(df: pd.DataFrame, table_name: str, if_exists: str = "re
         df: The DataFrame to load.
         table_name: The name of the table to create or replace.
         if_exists: Action to take if the table already exists ('replace', 'append', 'fail').
+
+    Returns:
+        Load statistics from the bulk loader (rows, seconds, rows_per_sec).
+    """
+    if if_exists == "append":
+        # Parquet files cannot be appended to; the table is served from SQLite from now on
+        stats = bulk_load(iter_batches(df), table_name, if_exists=if_exists)
+        columnar_store.delete_sidecar(table_name)
+        invalidate_results(table_name)
+        invalidate_query_results(table_name)
+        return stats
+    return _load_with_sidecar(iter_batches(df), table_name, if_exists)
+
+def load_dataframe_chunks_to_db(chunks: Iterable[pd.DataFrame], table_name: str) -> Dict[str, Any]:
+    """
+    Streams DataFrame chunks into a new SQLite table inside a single transaction.
+
+    The table is (re)created from the first chunk's dtypes, using the same
+    column affinities as `DataFrame.to_sql`. Either every chunk lands or the
+    table is left untouched.
+
+    Args:
+        chunks: Iterable of DataFrames sharing the same columns.
+        table_name: The name of the table to create or replace.
+
+    Returns:
+        Load statistics from the bulk loader (rows, seconds, rows_per_sec).
     """
-    conn = get_db_connection()
+    return _load_with_sidecar(chunks, table_name, "replace")
+
+def _load_with_sidecar(chunks: Iterable[pd.DataFrame], table_name: str, if_exists: str) -> Dict[str, Any]:
+    """Bulk-loads chunks into SQLite while writing the table's Parquet sidecar in the same pass."""
+    writer = columnar_store.SidecarWriter(table_name)
     try:
-        # SQLite defaults to a max of 999 variables per query in many environments.
-        # To use method="multi" safely, we dynamically calculate chunksize:
-        num_cols = len(df.columns)
-        safe_chunksize = max(1, 900 // num_cols)
-        
-        df.to_sql(table_name, conn, if_exists=if_exists, index=False, method="multi", chunksize=safe_chunksize)
-    finally:
-        conn.close()
+        stats = bulk_load(columnar_store.tee_chunks(chunks, writer), table_name, if_exists=if_exists)
+    except Exception:
+        writer.abort()
+        raise
+    if not writer.commit():
+        # Never leave a sidecar that no longer matches the table
+        columnar_store.delete_sidecar(table_name)
+    invalidate_results(table_name)
+    invalidate_query_results(table_name)
+    return stats
 
 def insert_dataset_metadata(dataset_id: str, filename: str, table_name: str, is_cleaned: bool = False, source_dataset_id: Optional[str] = None):
     """
     Inserts metadata about a new dataset into the 'datasets' table.
     """
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
+    with write_connection() as conn:
+        conn.execute(
             "INSERT INTO datasets (id, filename, table_name, is_cleaned, source_dataset_id) VALUES (?, ?, ?, ?, ?)",
             (dataset_id, filename, table_name, is_cleaned, source_dataset_id)
         )
-        conn.commit()
-    finally:
-        conn.close()
 
-def read_dataframe_from_db(table_name: str) -> pd.DataFrame:
+def read_dataframe_from_db(
+    table_name: str,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[Filters] = None,
+    limit: Optional[int] = None,
+    sample_frac: Optional[float] = None,
+    dtypes: Optional[Dict[str, Any]] = None,
+) -> pd.DataFrame:
     """
     Reads a table from the SQLite database into a pandas DataFrame.
 
+    Projection, filters, limit and sampling are pushed down, so only the
+    requested rows and columns are materialized. Reads are served from the
+    table's Parquet sidecar when it has one, otherwise from SQLite.
+
     Args:
         table_name: The name of the table to read.
+        columns: Columns to read (all when None).
+        filters: {column: value} equality filters or (column, op, value) tuples.
+        limit: Maximum number of rows to read.
+        sample_frac: Fraction (0, 1] of rows to sample.
+        dtypes: Optional {column: dtype} applied while reading.
 
     Returns:
-        A pandas DataFrame with the table's content.
+        A pandas DataFrame with the selected content.
+
+    Raises:
+        ValueError: If a column or filter does not match the table.
     """
-    conn = get_db_connection()
-    try:
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-        return df
-    finally:
-        conn.close()
+    start = time.perf_counter()
+    source = "sqlite"
+    if columnar_store.has_sidecar(table_name) and columnar_store.can_serve(filters, sample_frac):
+        table_columns = columnar_store.sidecar_columns(table_name)
+        build_select(table_name, table_columns, columns, filters, limit)  # Validates the request
+        try:
+            df = columnar_store.read_sidecar(table_name, columns, filters, limit, dtypes)
+            source = "parquet"
+        except Exception as e:
+            logger.warning(f"[DBRead] Sidecar read failed for '{table_name}', using SQLite: {e}")
+
+    if source == "sqlite":
+        table_columns = [c["name"] for c in get_table_columns(table_name)]
+        if not table_columns:
+            raise ValueError(f"Table '{table_name}' does not exist.")
+        sql, params = build_select(table_name, table_columns, columns, filters, limit, sample_frac)
+
+        with read_connection() as conn:
+            df = pd.read_sql_query(sql, conn, params=params, dtype=dtypes)
+
+    logger.info(
+        f"[DBRead] {table_name} ({source}): {len(df)} rows x {df.shape[1]}/{len(table_columns)} cols, "
+        f"~{_estimate_frame_bytes(df)} bytes in {time.perf_counter() - start:.3f}s"
+    )
+    return df
+
+def iter_dataframe_chunks(
+    table_name: str,
+    columns: Optional[Sequence[str]] = None,
+    chunk_rows: int = APPROX_INSIGHTS_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads a table `chunk_rows` rows at a time, so callers that aggregate
+    chunk by chunk keep memory bounded by the chunk size rather than the table.
+
+    Chunks come from the table's Parquet sidecar when it has one, otherwise
+    from SQLite. With SQLite each chunk is typed on its own, so a column whose
+    values are all NULL within a chunk may arrive as object dtype.
+
+    Raises:
+        ValueError: If a column does not match the table.
+    """
+    start = time.perf_counter()
+    rows = 0
+    chunks = 0
+    source = "sqlite"
+    if columnar_store.has_sidecar(table_name):
+        build_select(table_name, columnar_store.sidecar_columns(table_name), columns)  # Validates the request
+        source = "parquet"
+        reader = columnar_store.iter_sidecar_chunks(table_name, columns, chunk_rows)
+    else:
+        table_columns = [c["name"] for c in get_table_columns(table_name)]
+        if not table_columns:
+            raise ValueError(f"Table '{table_name}' does not exist.")
+        sql, params = build_select(table_name, table_columns, columns)
+        reader = None
+
+    if reader is not None:
+        for chunk in reader:
+            rows += len(chunk)
+            chunks += 1
+            yield chunk
+    else:
+        with read_connection() as conn:
+            for chunk in pd.read_sql_query(sql, conn, params=params, chunksize=chunk_rows):
+                rows += len(chunk)
+                chunks += 1
+                yield chunk
+
+    logger.info(f"[DBRead] {table_name} ({source}, chunked): {rows} rows in {chunks} chunks of {chunk_rows} in {time.perf_counter() - start:.3f}s")
+
+def get_table_columns(table_name: str) -> List[Dict[str, str]]:
+    """
+    Returns the declared columns of a table as [{"name", "type"}] without reading any rows.
+    """
+    with read_connection() as conn:
+        rows = conn.execute(f"PRAGMA table_info({quote_identifier(table_name)})").fetchall()
+    return [{"name": row["name"], "type": row["type"]} for row in rows]
+
+def is_numeric_affinity(declared_type: str) -> bool:
+    """SQLite INTEGER/REAL affinity, the types `to_sql` declares for numeric and boolean columns."""
+    declared_type = (declared_type or "").upper()
+    return "INT" in declared_type or any(t in declared_type for t in ("REAL", "FLOA", "DOUB"))
+
+def count_table_rows(table_name: str) -> int:
+    with read_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {quote_identifier(table_name)}").fetchone()[0]
+
+def _estimate_frame_bytes(df: pd.DataFrame) -> int:
+    """Approximate in-memory size: exact for fixed-width columns, sampled for text."""
+    total = 0
+    for col in df.columns:
+        series = df[col]
+        if series.dtype == "object" and len(series):
+            sample = series.iloc[:BYTES_ESTIMATE_SAMPLE]
+            total += int(sample.memory_usage(deep=True, index=False) / len(sample) * len(series))
+        else:
+            total += int(series.memory_usage(index=False))
+    return total
 
 def list_datasets_from_db() -> List[Dict[str, Any]]:
     """
@@ -69,14 +215,9 @@ def list_datasets_from_db() -> List[Dict[str, Any]]:
     Returns:
         A list of dictionaries, where each dictionary represents a dataset.
     """
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, filename, upload_date FROM datasets ORDER BY upload_date DESC")
-        datasets = [dict(row) for row in cursor.fetchall()]
-        return datasets
-    finally:
-        conn.close()
+    with read_connection() as conn:
+        cursor = conn.execute("SELECT id, filename, upload_date FROM datasets ORDER BY upload_date DESC")
+        return [dict(row) for row in cursor.fetchall()]
 
 def get_dataset_metadata(dataset_id: str) -> Optional[Dict[str, Any]]:
     """
@@ -88,14 +229,9 @@ def get_dataset_metadata(dataset_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         A dictionary containing the dataset's metadata, or None if not found.
     """
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, filename, upload_date, table_name FROM datasets WHERE id = ?", (dataset_id,))
-        metadata = cursor.fetchone()
+    with read_connection() as conn:
+        metadata = conn.execute("SELECT id, filename, upload_date, table_name FROM datasets WHERE id = ?", (dataset_id,)).fetchone()
         return dict(metadata) if metadata else None
-    finally:
-        conn.close()
 
 def get_table_name_for_dataset(dataset_id: str) -> Optional[str]:
     """
@@ -108,10 +244,8 @@ def find_cleaned_dataset_id(source_dataset_id: str) -> Optional[str]:
     """
     Returns the cleaned dataset_id (UUID) if available.
     """
-    conn = get_db_connection()
-    try:
-        cursor = conn.cursor()
-        cursor.execute(
+    with read_connection() as conn:
+        row = conn.execute(
             """
             SELECT id FROM datasets
             WHERE source_dataset_id = ? AND is_cleaned = TRUE
@@ -119,25 +253,32 @@ def find_cleaned_dataset_id(source_dataset_id: str) -> Optional[str]:
             LIMIT 1
             """,
             (source_dataset_id,)
-        )
-        row = cursor.fetchone()
+        ).fetchone()
         return row["id"] if row else None
-    finally:
-        conn.close()
-        
+
 def resolve_best_table_name(dataset_id: str) -> str:
     """
     Resolves the correct table_name for a dataset.
     Prefers cleaned version if available.
     """
-    cleaned_id = find_cleaned_dataset_id(dataset_id)
-    final_id = cleaned_id if cleaned_id else dataset_id
-
-    metadata = get_dataset_metadata(final_id)
-    if not metadata:
-        raise FileNotFoundError(f"Dataset with ID {final_id} not found in database.")
+    with read_connection() as conn:
+        row = conn.execute(
+            """
+            SELECT table_name FROM datasets
+            WHERE id = COALESCE(
+                (SELECT id FROM datasets
+                 WHERE source_dataset_id = ? AND is_cleaned = TRUE
+                 ORDER BY upload_date DESC
+                 LIMIT 1),
+                ?
+            )
+            """,
+            (dataset_id, dataset_id)
+        ).fetchone()
+    if not row:
+        raise FileNotFoundError(f"Dataset with ID {dataset_id} not found in database.")
 
-    return metadata["table_name"]
+    return row["table_name"]
 
 
         
@@ -146,8 +287,7 @@ def delete_dataset(dataset_id: str) -> bool:
     Deletes dataset metadata and drops the associated table.
     Returns True if deleted, False if not found.
     """
-    conn = get_db_connection()
-    try:
+    with write_connection() as conn:
         cursor = conn.cursor()
 
         # Fetch dataset metadata
@@ -161,8 +301,9 @@ def delete_dataset(dataset_id: str) -> bool:
 
         table_name = row["table_name"]
 
-        # Drop dataset table
+        # Drop dataset table and its columnar sidecar
         cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
+        columnar_store.delete_sidecar(table_name)
 
         # Delete metadata
         cursor.execute(
@@ -170,29 +311,49 @@ def delete_dataset(dataset_id: str) -> bool:
             (dataset_id,)
         )
 
-        conn.commit()
-        return True
-    finally:
-        conn.close()
+    delete_schema(dataset_id)
+    invalidate_results(table_name)
+    invalidate_nlq_cache(table_name)
+    invalidate_query_results(table_name)
+    return True
         
         
 def get_columns_for_dataset(dataset_id: str):
+    """
+    Returns the column catalog of a dataset: name, chart type (numeric /
+    categorical / datetime), logical and SQL type, null count, distinct
+    estimate and min/max. Served from the schema store, so no rows are read.
+    """
     table = get_table_name_for_dataset(dataset_id)
     if not table:
         raise FileNotFoundError("Dataset not found")
 
-    df = read_dataframe_from_db(table)
-
+    entry = get_schema(table)
+    if entry and all("logical_type" in c for c in entry["columns"]):
+        return [
+            {
+                "name": c["name"],
+                "type": chart_type(c["logical_type"]),
+                "logical_type": c["logical_type"],
+                "sql_type": c["sql_type"],
+                "null_count": c["null_count"],
+                "distinct_estimate": c["distinct_estimate"],
+                "min": c["min"],
+                "max": c["max"],
+            }
+            for c in entry["columns"]
+        ]
+
+    # Tables cataloged before column stats existed: classify from declared affinities
     columns = []
-    for col in df.columns:
-        dtype = df[col].dtype
-        if dtype.kind in {"i", "f"}:
+    for col in get_table_columns(table):
+        if col["type"].upper() in {"INTEGER", "REAL"}:
             col_type = "numeric"
         else:
             col_type = "categorical"
 
         columns.append({
-            "name": col,
+            "name": col["name"],
             "type": col_type
         })
 
@@ -200,13 +361,8 @@ def get_columns_for_dataset(dataset_id: str):
 
 def get_table_schema(table_name):
 
-    conn = sqlite3.connect(DATABASE_FILE)
-    cur = conn.cursor()
-
-    cur.execute(f"PRAGMA table_info({table_name})")
-    cols = cur.fetchall()
-
-    conn.close()
+    with read_connection() as conn:
+        cols = conn.execute(f"PRAGMA table_info({table_name})").fetchall()
 
     schema = f"TABLE {table_name} (\n"
     for col in cols:
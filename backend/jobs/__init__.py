@@ -0,0 +1 @@
+"""Background jobs: heavy profiling, cleaning, insights and report work run in worker processes."""
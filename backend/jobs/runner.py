@@ -0,0 +1,91 @@
+"""
+Process pool that executes queued jobs.
+
+Heavy pandas work runs in JOB_WORKERS worker processes instead of on the API
+event loop or its threadpool. Workers are spawned (not forked) so they never
+inherit the API process's SQLite connections or threads, and they write job
+progress and results to the job store themselves.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from backend.config import JOB_WORKERS
+from backend.jobs import store
+from backend.jobs.tasks import TASKS, run_job
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor(replace_broken: bool = False) -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None or replace_broken:
+            _executor = ProcessPoolExecutor(max_workers=JOB_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def submit_job(kind: str, dataset_id: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], bool]:
+    """
+    Queues a job, or returns the identical job already queued or running.
+
+    Returns:
+        (job, created)
+
+    Raises:
+        ValueError: On an unknown job kind.
+    """
+    if kind not in TASKS:
+        raise ValueError(f"Unknown job kind '{kind}'; choose from {', '.join(TASKS)}")
+    params = params or {}
+
+    job, created = store.create_job(kind, dataset_id, params)
+    if not created:
+        logger.info(f"[Jobs] {kind} for {dataset_id} is already {job['status']} as job {job['job_id']}")
+        return job, False
+
+    job_id = job["job_id"]
+    try:
+        try:
+            future = _get_executor().submit(run_job, job_id, kind, dataset_id, params)
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; start a fresh one
+            future = _get_executor(replace_broken=True).submit(run_job, job_id, kind, dataset_id, params)
+    except Exception as e:
+        store.mark_failed(job_id, f"Could not start job: {e}")
+        raise
+    future.add_done_callback(lambda f: _on_done(job_id, f))
+    logger.info(f"[Jobs] Queued {kind} job {job_id} for {dataset_id}")
+    return job, True
+
+
+def _on_done(job_id: str, future: Future) -> None:
+    # run_job records its own outcome; this only catches workers that died (e.g. killed by the OOM killer)
+    if future.cancelled():
+        store.mark_failed(job_id, "Cancelled at shutdown")
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error(f"[Jobs] Worker for job {job_id} crashed: {error}")
+        store.mark_failed(job_id, f"Worker crashed: {error}")
+
+
+def recover_jobs() -> None:
+    """Fails jobs orphaned by a previous server process (assumes one API process per database)."""
+    interrupted = store.fail_interrupted_jobs()
+    if interrupted:
+        logger.warning(f"[Jobs] Marked {interrupted} interrupted jobs as failed")
+
+
+def shutdown_workers() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
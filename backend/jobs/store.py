@@ -0,0 +1,134 @@
+"""
+Job store: the `jobs` table holds every submitted job with its status,
+progress, result and error, so results survive restarts and any process
+(the API or a worker) can read and update a job.
+
+Statuses: queued -> running -> succeeded | failed. A partial unique index
+allows only one queued/running job per dedup key, which is how concurrent
+duplicate submissions collapse onto the same job.
+"""
+
+import hashlib
+import json
+import sqlite3
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from backend.database.pool import read_connection, write_connection
+from backend.utils.data_utils import json_default
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+def dedup_key(kind: str, dataset_id: Optional[str], params: Dict[str, Any]) -> str:
+    payload = json.dumps([kind, dataset_id, params], sort_keys=True, default=json_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def create_job(kind: str, dataset_id: Optional[str], params: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """
+    Inserts a queued job unless an identical one is already queued or running.
+
+    Returns:
+        (job, created): `created` is False when an active duplicate was returned instead.
+    """
+    key = dedup_key(kind, dataset_id, params)
+    job_id = str(uuid.uuid4())
+    try:
+        with write_connection() as conn:
+            existing = conn.execute(
+                "SELECT id FROM jobs WHERE dedup_key = ? AND status IN (?, ?)", (key, *ACTIVE_STATUSES)
+            ).fetchone()
+            if existing:
+                return get_job(existing["id"]), False
+            conn.execute(
+                "INSERT INTO jobs (id, kind, dataset_id, params_json, dedup_key, status) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, dataset_id, json.dumps(params, default=json_default), key, QUEUED),
+            )
+    except sqlite3.IntegrityError:
+        # Another process inserted the same job between our check and insert
+        with read_connection() as conn:
+            existing = conn.execute(
+                "SELECT id FROM jobs WHERE dedup_key = ? AND status IN (?, ?)", (key, *ACTIVE_STATUSES)
+            ).fetchone()
+        if existing:
+            return get_job(existing["id"]), False
+        raise
+    return get_job(job_id), True
+
+
+def get_job(job_id: str, include_result: bool = False) -> Optional[Dict[str, Any]]:
+    """Returns a job's state (and its result when asked), or None."""
+    with read_connection() as conn:
+        row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if not row:
+        return None
+
+    job = {
+        "job_id": row["id"],
+        "kind": row["kind"],
+        "dataset_id": row["dataset_id"],
+        "params": json.loads(row["params_json"]),
+        "status": row["status"],
+        "progress": row["progress"],
+        "message": row["message"],
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "started_at": row["started_at"],
+        "finished_at": row["finished_at"],
+    }
+    if include_result:
+        job["result"] = json.loads(row["result_json"]) if row["result_json"] else None
+    return job
+
+
+def mark_running(job_id: str) -> bool:
+    """Moves a queued job to running. Returns False if it is no longer queued (e.g. failed at a restart)."""
+    with write_connection() as conn:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, started_at = CURRENT_TIMESTAMP, message = 'Started' WHERE id = ? AND status = ?",
+            (RUNNING, job_id, QUEUED),
+        )
+        return cursor.rowcount == 1
+
+
+def set_progress(job_id: str, progress: float, message: Optional[str] = None) -> None:
+    with write_connection() as conn:
+        conn.execute(
+            "UPDATE jobs SET progress = ?, message = COALESCE(?, message) WHERE id = ? AND status = ?",
+            (max(0.0, min(1.0, progress)), message, job_id, RUNNING),
+        )
+
+
+def mark_succeeded(job_id: str, result: Any) -> None:
+    with write_connection() as conn:
+        conn.execute(
+            """
+            UPDATE jobs SET status = ?, progress = 1, message = 'Done', result_json = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = ?
+            """,
+            (SUCCEEDED, json.dumps(result, default=json_default), job_id, RUNNING),
+        )
+
+
+def mark_failed(job_id: str, error: str) -> None:
+    """Fails a job unless it already finished."""
+    with write_connection() as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ? AND status IN (?, ?)",
+            (FAILED, error, job_id, *ACTIVE_STATUSES),
+        )
+
+
+def fail_interrupted_jobs() -> int:
+    """Fails jobs left queued/running by a previous process; their workers are gone. Returns the count."""
+    with write_connection() as conn:
+        cursor = conn.execute(
+            "UPDATE jobs SET status = ?, error = 'Interrupted by a server restart', finished_at = CURRENT_TIMESTAMP WHERE status IN (?, ?)",
+            (FAILED, *ACTIVE_STATUSES),
+        )
+        return cursor.rowcount
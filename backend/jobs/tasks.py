@@ -0,0 +1,68 @@
+"""
+Job kinds and the function each one runs inside a worker process.
+
+Every task takes (dataset_id, params, progress) and returns a JSON-serializable
+result; `progress(fraction, message)` records coarse progress in the job store.
+"""
+
+from typing import Any, Callable, Dict
+
+from loguru import logger
+
+from backend.jobs import store
+
+ProgressCallback = Callable[[float, str], None]
+
+
+def _profile(dataset_id: str, params: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    from backend.ml.profiling import generate_profile
+
+    progress(0.1, "Profiling")
+    return generate_profile(dataset_id, params.get("mode", "fast"))
+
+
+def _insights(dataset_id: str, params: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    from backend.ml.insights_engine import generate_insights
+
+    progress(0.1, "Computing insights")
+    return generate_insights(dataset_id, **params)
+
+
+def _clean(dataset_id: str, params: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    from backend.ml.cleaning_pipeline import clean_dataset
+
+    return clean_dataset(dataset_id, progress=progress, engine=params.get("engine"))
+
+
+def _report(dataset_id: str, params: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    from backend.ml.report_builder import export_report
+
+    progress(0.1, "Building report")
+    out_path = export_report(
+        dataset_id=dataset_id,
+        sections=params.get("sections", []),
+        include_charts=params.get("include_charts", True),
+        output_format=params.get("format", "pdf"),
+    )
+    return {"output_path": out_path}
+
+
+TASKS: Dict[str, Callable[[str, Dict[str, Any], ProgressCallback], Dict[str, Any]]] = {
+    "profile": _profile,
+    "insights": _insights,
+    "clean": _clean,
+    "report": _report,
+}
+
+
+def run_job(job_id: str, kind: str, dataset_id: str, params: Dict[str, Any]) -> None:
+    """Worker-process entry point: runs one job and records its outcome in the job store."""
+    if not store.mark_running(job_id):
+        logger.warning(f"[Jobs] Skipping {kind} job {job_id}: no longer queued")
+        return
+    try:
+        result = TASKS[kind](dataset_id, params, lambda fraction, message=None: store.set_progress(job_id, fraction, message))
+        store.mark_succeeded(job_id, result)
+    except Exception as e:
+        logger.exception(f"[Jobs] {kind} job {job_id} failed")
+        store.mark_failed(job_id, f"{type(e).__name__}: {e}")
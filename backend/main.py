@@ -43,7 +43,7 @@ def create_app() -> FastAPI:
         return JSONResponse(status_code=500, content={"status": "error", "message": "Internal Server Error"})
 
     # Routers are imported lazily to avoid circular imports
-    from backend.api import upload, profile, clean, insights, nlq, report, datasets, columns, charts_options
+    from backend.api import upload, profile, clean, insights, nlq, report, datasets, columns, charts_options, metrics, jobs, queries
 
 
     # Versioned API
@@ -57,11 +57,29 @@ def create_app() -> FastAPI:
     app.include_router(datasets.router, prefix=api_prefix)
     app.include_router(columns.router, prefix=api_prefix)
     app.include_router(charts_options.router, prefix=api_prefix)
+    app.include_router(metrics.router, prefix=api_prefix)
+    app.include_router(jobs.router, prefix=api_prefix)
+    app.include_router(queries.router, prefix=api_prefix)
 
     # WebSocket endpoint for real-time AI chat
     from backend.api.websocket_chat import create_websocket_route
     create_websocket_route(app)
 
+    @app.on_event("startup")
+    def recover_background_jobs():
+        # A startup hook, not create_app: spawned job workers re-import this module
+        from backend.jobs.runner import recover_jobs
+        recover_jobs()
+
+    @app.on_event("shutdown")
+    def close_db_pool():
+        from backend.database.pool import close_pool
+        from backend.jobs.runner import shutdown_workers
+        from backend.utils.executors import shutdown_executors
+        shutdown_workers()
+        shutdown_executors()
+        close_pool()
+
     @app.get("/health")
     async def health():
         return {"status": "ok", "version": APP_VERSION}
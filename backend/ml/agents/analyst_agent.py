@@ -17,6 +17,7 @@ from backend.ml.agents.state import GraphState
 from backend.ml.agents.llm_gateway import LLMGateway
 from backend.database.utils import read_dataframe_from_db
 
+ANALYST_SAMPLE_ROWS = 50  # Rows loaded in direct mode; only the head goes into the prompt
 
 ANALYST_PROMPT = """You are a data analyst. Given a dataset and a user's question, write Python code that:
 1. Creates a Plotly Express figure answering the question.
@@ -148,9 +149,9 @@ def analyst_agent_node(state: GraphState) -> dict:
     else:
         # Direct mode: load from SQLite
         try:
-            df = read_dataframe_from_db(state["table_name"])
-            data_csv = df.head(50).to_csv(index=False)
-            logger.info(f"[Analyst] Loaded {len(df)} rows from '{state['table_name']}', using top 50")
+            df = read_dataframe_from_db(state["table_name"], limit=ANALYST_SAMPLE_ROWS)
+            data_csv = df.to_csv(index=False)
+            logger.info(f"[Analyst] Loaded top {len(df)} rows from '{state['table_name']}'")
         except Exception as e:
             logger.error(f"[Analyst] Failed to load data: {e}")
             return {
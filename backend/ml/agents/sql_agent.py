@@ -6,10 +6,13 @@ with Gemini Pro via LLMGateway. Includes a self-correction loop that retries
 up to 3 times when SQL execution fails.
 """
 
-import sqlite3
 from loguru import logger
 
-from backend.config import DATABASE_FILE
+from backend.config import SQL_AGENT_MAX_ROWS
+
+from backend.database.nlq_cache import lookup_sql, store_sql
+from backend.database.query_cache import run_cached_query
+from backend.database.running_queries import QueryCancelled, current_scope
 from backend.ml.agents.state import GraphState
 from backend.ml.agents.llm_gateway import LLMGateway
 from backend.ml.sql_sanitize import validate_sql
@@ -45,28 +48,24 @@ Fix the query to avoid this error. Double-check table and column names against t
 
 def _execute_sql(sql: str) -> dict:
     """
-    Executes a sanitized SQL query against the SQLite cache DB.
-    Returns columns and rows, or raises on failure.
+    Executes a sanitized SQL query against the SQLite cache DB (or serves it
+    from the query result cache). Returns columns and at most
+    SQL_AGENT_MAX_ROWS rows, or raises on failure.
     """
-    conn = sqlite3.connect(DATABASE_FILE)
-    try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        rows = cur.fetchall()
-        columns = [desc[0] for desc in cur.description] if cur.description else []
-        return {
-            "columns": columns,
-            "rows": [list(row) for row in rows],  # Convert tuples to lists for JSON
-        }
-    finally:
-        conn.close()
+    result = run_cached_query(sql)
+    if result["truncated"]:
+        logger.warning(f"[SQLAgent] Result cut off at {SQL_AGENT_MAX_ROWS} rows")
+    return {
+        "columns": result["columns"],
+        "rows": [list(row) for row in result["rows"]],  # Convert rows to lists for JSON
+    }
 
 
 def sql_agent_node(state: GraphState) -> dict:
     """
     LangGraph node: Generates SQL from NL, executes it, self-corrects on failure.
 
-    Reads:  messages, schema_context, table_name, sql_retry_count, sql_error
+    Reads:  messages, dataset_id, schema_context, table_name, sql_retry_count, sql_error
     Writes: generated_sql, sql_result_columns, sql_result_rows,
             sql_error, sql_retry_count, current_agent, error
     """
@@ -77,6 +76,26 @@ def sql_agent_node(state: GraphState) -> dict:
 
     logger.info(f"[SQLAgent] Attempt {retry_count + 1}/{MAX_RETRIES} — Question: '{last_message}'")
 
+    # The client went away (or the query was killed): no point generating more SQL
+    scope = current_scope()
+    if scope is not None and scope.cancelled:
+        return _cancelled_result(None, retry_count, scope.cancelled)
+
+    # --- Phase 0: Reuse SQL cached for the same (or a paraphrased) question ---
+    # Only on the first attempt: a retry means the previous SQL failed
+    cached = None
+    if retry_count == 0 and not previous_error:
+        try:
+            cached = lookup_sql(state["dataset_id"], state["table_name"], schema_context, last_message)
+            if cached:
+                # Entries may predate the current guards
+                cached["sql"] = validate_sql(cached["sql"], allowed_tables={state["table_name"]})
+        except Exception as e:
+            logger.warning(f"[SQLAgent] NL-to-SQL cache lookup failed: {e}")
+            cached = None
+    if cached:
+        return _execute_phase(state, cached["sql"], retry_count, cached=True)
+
     # --- Phase 1: Generate SQL via Gemini Pro ---
     try:
         llm = LLMGateway.get_power_llm()
@@ -101,7 +120,7 @@ def sql_agent_node(state: GraphState) -> dict:
 
     # --- Phase 2: Sanitize SQL ---
     try:
-        clean_sql = validate_sql(raw_sql)
+        clean_sql = validate_sql(raw_sql, allowed_tables={state["table_name"]})
         logger.info(f"[SQLAgent] Sanitized SQL: {clean_sql}")
     except ValueError as e:
         logger.warning(f"[SQLAgent] Sanitization rejected: {e}")
@@ -114,10 +133,16 @@ def sql_agent_node(state: GraphState) -> dict:
             "error": f"SQL failed after {MAX_RETRIES} retries" if new_count >= MAX_RETRIES else None,
         }
 
-    # --- Phase 3: Execute against SQLite ---
+    return _execute_phase(state, clean_sql, retry_count, cached=False)
+
+
+def _execute_phase(state: GraphState, clean_sql: str, retry_count: int, cached: bool) -> dict:
+    """Phase 3: executes sanitized SQL; SQL that ran is cached for the question unless it came from the cache."""
     try:
         result = _execute_sql(clean_sql)
         logger.info(f"[SQLAgent] Query returned {len(result['rows'])} rows, {len(result['columns'])} columns")
+        if not cached:
+            store_sql(state["dataset_id"], state["table_name"], state["schema_context"], state["messages"][-1].content, clean_sql)
 
         return {
             "generated_sql": clean_sql,
@@ -129,6 +154,10 @@ def sql_agent_node(state: GraphState) -> dict:
             "error": None,
         }
 
+    except QueryCancelled as e:
+        logger.info(f"[SQLAgent] Query cancelled: {e}")
+        return _cancelled_result(clean_sql, retry_count, str(e))
+
     except Exception as e:
         logger.warning(f"[SQLAgent] Execution failed: {e}")
         new_count = retry_count + 1
@@ -141,6 +170,17 @@ def sql_agent_node(state: GraphState) -> dict:
         }
 
 
+def _cancelled_result(sql: str | None, retry_count: int, reason: str) -> dict:
+    """A cancelled query is not retried: the retry budget is marked spent."""
+    return {
+        "generated_sql": sql,
+        "sql_error": f"Query cancelled: {reason}",
+        "sql_retry_count": max(retry_count, MAX_RETRIES),
+        "current_agent": "sql_agent",
+        "error": f"Query cancelled: {reason}",
+    }
+
+
 def should_retry_sql(state: GraphState) -> str:
     """
     Conditional edge function for the LangGraph.
@@ -0,0 +1,156 @@
+"""
+Approximate insights for tables too large to load at once.
+
+The table is read chunk by chunk (`iter_dataframe_chunks`) and every statistic
+is folded into a bounded-size, mergeable accumulator from backend.utils.sketches:
+
+- mean / std / min / max: Welford moments (exact up to float rounding)
+- median and quartiles: KLL quantile sketch, reported with a value interval
+  derived from its rank-error bound
+- top / bottom 5: exact bounded top-k
+- correlations: pairwise-complete co-moments (exact up to float rounding)
+- distinct counts: KMV sketch, reported with its relative error
+- category insights: per-group count/sum/M2 (exact), see GroupedAccumulator
+
+Memory is bounded by the chunk size plus the sketches, not by the row count.
+"""
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.config import APPROX_INSIGHTS_CHUNK_ROWS
+from backend.database.utils import get_table_columns, is_numeric_affinity, iter_dataframe_chunks
+from backend.ml.grouped_agg import GroupedAccumulator
+from backend.utils.sketches import (
+    DISTINCT_SKETCH_K,
+    QUANTILE_SKETCH_K,
+    CoMoments,
+    DistinctSketch,
+    Moments,
+    QuantileSketch,
+    TopK,
+    distinct_relative_error,
+)
+
+APPROX_CONFIDENCE = 0.99  # Confidence of the reported error bounds
+SUMMARY_QUANTILES = {"25%": 0.25, "median": 0.5, "75%": 0.75}
+EXACT_STATISTICS = ["mean", "std", "min", "max", "extremes", "correlations", "category_insights"]
+
+
+def approximate_insights(
+    table_name: str,
+    aggregations: Sequence[str],
+    max_categories: int,
+    chunk_rows: int = APPROX_INSIGHTS_CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """
+    Streams a table once and returns insights with error bounds.
+
+    Returns:
+        Dict with num_rows, num_columns, numeric_summary (each column carrying
+        "error_bounds" for its quantiles), correlations, extremes,
+        category_groups ({cat: grouped_aggregates-shaped result}) and an
+        "approximation" section describing the sketches and distinct counts.
+    """
+    declared = get_table_columns(table_name)
+    if not declared:
+        raise FileNotFoundError(f"Table '{table_name}' not found in database.")
+    columns = [c["name"] for c in declared]
+    numeric_cols = [c["name"] for c in declared if is_numeric_affinity(c["type"])]
+    categorical_cols = [c for c in columns if c not in numeric_cols]
+
+    moments = {col: Moments() for col in numeric_cols}
+    quantiles = {col: QuantileSketch() for col in numeric_cols}
+    top_k = {col: TopK() for col in numeric_cols}
+    all_int = {col: True for col in numeric_cols}
+    co_moments = CoMoments(len(numeric_cols)) if len(numeric_cols) >= 2 else None
+    distinct = {col: DistinctSketch() for col in columns}
+    groups = {cat: GroupedAccumulator(numeric_cols, max_categories) for cat in categorical_cols}
+
+    rows = 0
+    chunks = 0
+    for chunk in iter_dataframe_chunks(table_name, chunk_rows=chunk_rows):
+        rows += len(chunk)
+        chunks += 1
+        numeric_values: Dict[str, np.ndarray] = {}
+        for col in numeric_cols:
+            series = chunk[col]
+            if series.dtype == object or not isinstance(series.dtype, np.dtype):
+                series = pd.to_numeric(series, errors="coerce")  # All-NULL chunk, extension dtype
+            values = series.to_numpy()
+            all_int[col] = all_int[col] and values.dtype.kind in "iu"
+            floats = values.astype(np.float64)
+            numeric_values[col] = floats
+            moments[col].update(floats)
+            quantiles[col].update(floats)
+            top_k[col].update(values if values.dtype.kind in "iu" else floats)
+
+        if co_moments is not None:
+            co_moments.update(np.column_stack([numeric_values[col] for col in numeric_cols]))
+        for col in columns:
+            distinct[col].update(chunk[col])
+        for cat, accumulator in groups.items():
+            accumulator.update(chunk[cat], numeric_values)
+
+    numeric_summary: Dict[str, Any] = {}
+    extremes: Dict[str, Any] = {}
+    for col in numeric_cols:
+        m = moments[col]
+        if m.n == 0:
+            continue
+        sketch = quantiles[col]
+        summary = {
+            "mean": float(m.mean),
+            "median": sketch.quantile(SUMMARY_QUANTILES["median"]),
+            "std": m.std,
+            "min": float(m.min),
+            "max": float(m.max),
+            "25%": sketch.quantile(SUMMARY_QUANTILES["25%"]),
+            "75%": sketch.quantile(SUMMARY_QUANTILES["75%"]),
+        }
+        bounds: Dict[str, Any] = {"rank_error": sketch.rank_error(APPROX_CONFIDENCE)}
+        for name, q in SUMMARY_QUANTILES.items():
+            low, high = sketch.bounds(q, APPROX_CONFIDENCE)
+            bounds[name] = {"low": low, "high": high}
+        summary["error_bounds"] = bounds
+        numeric_summary[col] = summary
+
+        largest, smallest = top_k[col].largest(), top_k[col].smallest()
+        if all_int[col]:
+            extremes[col] = {"top_5": largest.astype(np.int64).tolist(), "bottom_5": smallest.astype(np.int64).tolist()}
+        else:
+            extremes[col] = {"top_5": np.round(largest, 3).tolist(), "bottom_5": np.round(smallest, 3).tolist()}
+
+    correlations: Dict[str, Dict[str, float]] = {}
+    if co_moments is not None:
+        corr = pd.DataFrame(co_moments.correlation(), index=numeric_cols, columns=numeric_cols)
+        correlations = corr.round(3).fillna(0).to_dict()
+
+    category_groups: Dict[str, Any] = {}
+    for cat, accumulator in groups.items():
+        grouped = accumulator.result(aggregations)
+        if grouped is not None:
+            category_groups[cat] = grouped
+
+    return {
+        "num_rows": rows,
+        "num_columns": len(columns),
+        "numeric_summary": numeric_summary,
+        "correlations": correlations,
+        "extremes": extremes,
+        "category_groups": category_groups,
+        "approximation": {
+            "confidence": APPROX_CONFIDENCE,
+            "chunk_rows": chunk_rows,
+            "chunks": chunks,
+            "quantile_sketch": {"type": "kll", "k": QUANTILE_SKETCH_K},
+            "distinct_sketch": {"type": "kmv", "k": DISTINCT_SKETCH_K},
+            "exact_statistics": EXACT_STATISTICS,
+            "distinct": {
+                col: {"estimate": sketch.estimate(), "relative_error": distinct_relative_error(sketch)}
+                for col, sketch in distinct.items()
+            },
+        },
+    }
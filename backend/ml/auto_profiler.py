@@ -22,15 +22,129 @@
 # backend/ml/auto_profiler.py
 
 # backend/ml/auto_profiler.py
+"""
+ML profile of a DataFrame: column kinds, missing ratios, high-cardinality
+columns and strongly correlated numeric pairs.
+
+The default "fast" mode computes exactly those fields natively with
+vectorized pandas/NumPy, following ydata-profiling's typing rules, so the
+output matches what the ydata path extracts from a full ProfileReport. The
+optional "deep" mode still builds the ProfileReport and needs
+ydata-profiling installed.
+"""
 import json
-from typing import Dict, Any
-from ydata_profiling import ProfileReport
+from typing import Dict, Any, List
 
-def generate_ml_profile(df) -> Dict[str, Any]:
+import numpy as np
+import pandas as pd
+
+from backend.utils.type_inference import classify_sample, stratified_sample
+
+PROFILE_MODES = ("fast", "deep")
+HIGH_CARDINALITY_THRESHOLD = 50  # Columns with more distinct values are reported as high-cardinality
+STRONG_CORRELATION = 0.8  # |Pearson r| above which a pair is reported
+LOW_CATEGORICAL_THRESHOLD = 5  # Numeric columns with at most this many distinct values are categorical (as in ydata)
+CORRELATION_SAMPLE_ROWS = 200_000  # Rows sampled for the correlation matrix on larger tables
+
+
+def generate_ml_profile(df: pd.DataFrame, mode: str = "fast") -> Dict[str, Any]:
     """
     Generate a structured ML-friendly profile from a dataframe.
-    Version-safe and API-safe.
+
+    Args:
+        df: The data to profile.
+        mode: "fast" (native) or "deep" (ydata-profiling ProfileReport).
+
+    Raises:
+        ValueError: On an unknown mode.
+        ImportError: In deep mode when ydata-profiling is not installed.
     """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unsupported profile mode '{mode}'; choose from {', '.join(PROFILE_MODES)}")
+    if mode == "deep":
+        return _ydata_profile(df)
+    return _native_profile(df)
+
+
+def _column_kind(series: pd.Series, n_distinct: int) -> str:
+    """ydata-style variable type: "numeric", "categorical" or "other" (dates, free text, empty)."""
+    if n_distinct == 0:
+        return "other"
+    if pd.api.types.is_bool_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype):
+        return "categorical"
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return "categorical" if n_distinct <= LOW_CATEGORICAL_THRESHOLD else "numeric"
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return "other"
+
+    logical_type, _ = classify_sample(stratified_sample(series))
+    if logical_type in ("int", "float"):
+        return "categorical" if n_distinct <= LOW_CATEGORICAL_THRESHOLD else "numeric"
+    if logical_type in ("bool", "category"):
+        return "categorical"
+    return "other"
+
+
+def _strong_correlations(numeric_df: pd.DataFrame) -> List[Dict[str, Any]]:
+    if numeric_df.shape[1] < 2:
+        return []
+    if len(numeric_df) > CORRELATION_SAMPLE_ROWS:
+        numeric_df = numeric_df.sample(n=CORRELATION_SAMPLE_ROWS, random_state=0)
+    corr = numeric_df.astype(np.float64).corr()
+
+    correlations = []
+    for c1 in corr.columns:
+        for c2, value in corr[c1].items():
+            if c1 != c2 and abs(value) > STRONG_CORRELATION:
+                correlations.append({"col1": c1, "col2": c2, "correlation": round(float(value), 3)})
+    return correlations
+
+
+def _native_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    n_rows = len(df)
+    missing = df.isna().sum()
+
+    numeric_cols = []
+    categorical_cols = []
+    missing_summary = {}
+    high_cardinality = []
+
+    for col in df.columns:
+        series = df[col]
+        n_distinct = int(series.nunique(dropna=True))
+        kind = _column_kind(series, n_distinct)
+
+        if kind == "numeric":
+            numeric_cols.append(col)
+        elif kind == "categorical":
+            categorical_cols.append(col)
+
+        if n_rows and missing[col] > 0:
+            missing_summary[col] = round(float(missing[col]) / n_rows, 3)
+
+        if n_distinct > HIGH_CARDINALITY_THRESHOLD:
+            high_cardinality.append(col)
+
+    numeric_df = df[numeric_cols].apply(pd.to_numeric, errors="coerce") if numeric_cols else df[[]]
+
+    return {
+        "summary": {
+            "rows": n_rows,
+            "columns": df.shape[1],
+        },
+        "numeric_columns": numeric_cols,
+        "categorical_columns": categorical_cols,
+        "missing_summary": missing_summary,
+        "high_cardinality_columns": high_cardinality,
+        "strong_correlations": _strong_correlations(numeric_df),
+    }
+
+
+def _ydata_profile(df: pd.DataFrame) -> Dict[str, Any]:
+    try:
+        from ydata_profiling import ProfileReport
+    except ImportError as e:
+        raise ImportError("Deep profiling needs ydata-profiling; install it or use mode=fast") from e
 
     report = ProfileReport(
         df,
@@ -60,7 +174,7 @@ def generate_ml_profile(df) -> Dict[str, Any]:
         if info.get("p_missing", 0) > 0:
             missing_summary[col] = round(info["p_missing"], 3)
 
-        if info.get("n_distinct", 0) > 50:
+        if info.get("n_distinct", 0) > HIGH_CARDINALITY_THRESHOLD:
             high_cardinality.append(col)
 
     correlations = []
@@ -72,7 +186,7 @@ def generate_ml_profile(df) -> Dict[str, Any]:
 
     for c1, vals in pearson.items():
         for c2, corr in vals.items():
-            if c1 != c2 and abs(corr) > 0.8:
+            if c1 != c2 and abs(corr) > STRONG_CORRELATION:
                 correlations.append({
                     "col1": c1,
                     "col2": c2,
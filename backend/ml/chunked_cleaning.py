@@ -0,0 +1,206 @@
+"""
+Out-of-core cleaning for tables too large to load at once.
+
+Two streaming passes over the source table (`iter_dataframe_chunks`):
+
+1. statistics: every column is folded into bounded-size accumulators from
+   backend.utils.sketches - Welford moments for the mean fill value, a KLL
+   sketch for the quartiles behind the IQR bounds, and a Misra-Gries summary
+   for the mode of non-numeric columns.
+2. clean and load: each chunk goes through the same outlier mask and fill
+   steps as the in-memory engine (backend.ml.cleaning) with the global
+   statistics, and is streamed into the new table by the bulk loader.
+
+Memory is bounded by the chunk size plus the sketches, not by the row count.
+Column kinds come from the table's declared types, since a chunk whose values
+are all NULL is read back as object dtype.
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from backend.config import CLEANING_CHUNK_ROWS, CLEANING_MAX_WORKERS
+from backend.database.utils import (
+    count_table_rows,
+    get_table_columns,
+    is_numeric_affinity,
+    iter_dataframe_chunks,
+    load_dataframe_chunks_to_db,
+)
+from backend.ml.approx_insights import APPROX_CONFIDENCE
+from backend.ml.cleaning import IQR_MULTIPLIER, apply_cleaning, map_columns, outlier_mask
+from backend.utils.sketches import FREQUENT_ITEMS_K, QUANTILE_SKETCH_K, FrequentItems, Moments, QuantileSketch
+
+ProgressCallback = Callable[[float, str], None]
+
+
+class ColumnAccumulator:
+    """Pass-one statistics of one column: null count plus the sketches its kind needs."""
+
+    def __init__(self, name: str, numeric: bool):
+        self.name = name
+        self.kind = "numeric" if numeric else "other"
+        self.nulls = 0
+        self.unparseable = False
+        self.moments = Moments() if numeric else None
+        self.quantiles = QuantileSketch() if numeric else None
+        self.frequent = None if numeric else FrequentItems()
+
+    def update(self, series: pd.Series) -> None:
+        self.nulls += int(series.isna().sum())
+        if self.kind == "other":
+            self.frequent.update(series)
+            return
+        values = _numeric_values(series)
+        if values is None:
+            self.unparseable = True
+            return
+        self.moments.update(values)
+        self.quantiles.update(values)
+
+    def finalize(self) -> Dict[str, Any]:
+        """Stats in the shape of `compute_cleaning_stats`."""
+        stats: Dict[str, Any] = {"kind": self.kind, "nulls": self.nulls, "fill": None, "bounds": None}
+        if self.unparseable:
+            # Raw text kept in a numeric column at ingestion; leave the column as it is
+            logger.warning(f"[Cleaning] Column '{self.name}' holds non-numeric values; skipping its fill and outlier bounds")
+            stats["kind"] = "other"
+            return stats
+        if self.kind == "other":
+            if self.nulls:
+                mode = self.frequent.most_frequent()
+                stats["fill"] = "Unknown" if mode is None else mode
+            return stats
+        if self.moments.n == 0:
+            return stats
+        if self.nulls:
+            stats["fill"] = self.moments.mean
+            self.quantiles.add(self.moments.mean, self.nulls)
+        q1, q3 = self.quantiles.quantile(0.25), self.quantiles.quantile(0.75)
+        iqr = q3 - q1
+        stats["bounds"] = (q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr)
+        return stats
+
+
+def _numeric_values(series: pd.Series) -> Optional[np.ndarray]:
+    """float64 values of a numeric column's chunk, or None if it holds non-numeric values."""
+    if series.dtype.kind in "iufb":
+        return series.to_numpy(dtype=np.float64, na_value=np.nan)
+    values = pd.to_numeric(series, errors="coerce")
+    if values.isna().sum() > series.isna().sum():
+        return None
+    return values.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def _conform_chunk(chunk: pd.DataFrame, stats: Dict[str, Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Gives numeric columns the dtype the in-memory engine would see for the whole
+    column: float64 when the column has nulls anywhere, whatever this chunk holds.
+    """
+    for col, s in stats.items():
+        if s["kind"] != "numeric":
+            continue
+        series = chunk[col]
+        if series.dtype == object or (s["nulls"] and series.dtype.kind in "iub"):
+            chunk[col] = pd.to_numeric(series).astype(np.float64) if s["nulls"] else pd.to_numeric(series)
+    return chunk
+
+
+def clean_table_chunked(
+    source_table: str,
+    target_table: str,
+    chunk_rows: int = CLEANING_CHUNK_ROWS,
+    progress: Optional[ProgressCallback] = None,
+) -> Tuple[Dict[str, Any], Optional[pd.DataFrame]]:
+    """
+    Cleans `source_table` into `target_table` chunk by chunk.
+
+    Args:
+        source_table: The table to clean.
+        target_table: The table to create with the cleaned rows.
+        chunk_rows: Rows read, cleaned and written at a time.
+        progress: Optional callback(fraction, message) called during the statistics pass.
+
+    Returns:
+        (report, sample): the report has the same fields as `clean_dataframe`'s
+        plus an "approximation" section, and `sample` is the first cleaned chunk
+        (None if every row was removed) for building the schema context.
+
+    Raises:
+        ValueError: If the source table does not exist.
+    """
+    report_progress = progress or (lambda fraction, message: None)
+    declared = get_table_columns(source_table)
+    if not declared:
+        raise ValueError(f"Table '{source_table}' does not exist.")
+    accumulators = [ColumnAccumulator(c["name"], is_numeric_affinity(c["type"])) for c in declared]
+    total_rows = count_table_rows(source_table)
+
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    rows_before = 0
+    chunks = 0
+    for chunk in iter_dataframe_chunks(source_table, chunk_rows=chunk_rows):
+        map_columns(lambda acc, series: acc.update(series), ((acc, chunk[acc.name]) for acc in accumulators), CLEANING_MAX_WORKERS)
+        rows_before += len(chunk)
+        chunks += 1
+        report_progress(0.05 + 0.35 * rows_before / max(total_rows, 1), f"Computing statistics ({rows_before}/{total_rows} rows)")
+    stats = {acc.name: acc.finalize() for acc in accumulators}
+    timings["statistics"] = round((time.perf_counter() - started) * 1000, 3)
+
+    flagged: Dict[str, int] = {}
+    state: Dict[str, Any] = {"rows": 0, "sample": None}
+
+    def cleaned_chunks() -> Iterator[pd.DataFrame]:
+        # Runs inside the bulk loader's write transaction, so it must not write
+        # to the database itself (no progress updates from here)
+        for chunk in iter_dataframe_chunks(source_table, chunk_rows=chunk_rows):
+            chunk = _conform_chunk(chunk, stats)
+            keep, chunk_flagged = outlier_mask(chunk, stats)
+            for col, count in chunk_flagged.items():
+                flagged[col] = flagged.get(col, 0) + count
+            cleaned = apply_cleaning(chunk, stats, keep)
+            state["rows"] += len(cleaned)
+            if state["sample"] is None and len(cleaned):
+                state["sample"] = cleaned
+            yield cleaned
+
+    report_progress(0.4, "Cleaning and storing chunks")
+    step = time.perf_counter()
+    load_dataframe_chunks_to_db(cleaned_chunks(), target_table)
+    timings["clean_and_load"] = round((time.perf_counter() - step) * 1000, 3)
+    timings["total"] = round((time.perf_counter() - started) * 1000, 3)
+
+    rank_errors = {
+        acc.name: round(acc.quantiles.rank_error(APPROX_CONFIDENCE), 6)
+        for acc in accumulators
+        if acc.quantiles is not None and not acc.quantiles.exact
+    }
+    mode_errors = {acc.name: acc.frequent.max_error for acc in accumulators if acc.frequent is not None and not acc.frequent.exact}
+    report = {
+        "rows_before": rows_before,
+        "rows_after": state["rows"],
+        "missing_values_filled": {
+            col: {"filled_values": s["nulls"]} for col, s in stats.items() if s["nulls"] and s["fill"] is not None
+        },
+        "outliers_removed": flagged,
+        "timings_ms": timings,
+        "approximation": {
+            "confidence": APPROX_CONFIDENCE,
+            "chunk_rows": chunk_rows,
+            "chunks": chunks,
+            "quantile_sketch": {"type": "kll", "k": QUANTILE_SKETCH_K},
+            "frequent_items": {"type": "misra_gries", "k": FREQUENT_ITEMS_K},
+            "quartile_rank_error": rank_errors,
+            "mode_count_error": mode_errors,
+        },
+    }
+    logger.info(
+        f"[Cleaning] {source_table} -> {target_table} out of core: {rows_before} -> {state['rows']} rows "
+        f"in {chunks} chunks, {timings['total']:.0f} ms"
+    )
+    return report, state["sample"]
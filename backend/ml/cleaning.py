@@ -1,68 +1,214 @@
-from typing import Tuple, Dict, Any
+"""
+Cleaning engine: fills missing values and drops IQR outliers.
+
+The work is split into three column-parallel steps over the input frame:
+
+1. statistics: each column's fill value (mean for numeric, mode for other
+   columns, forward/backward fill for datetimes) and, for numeric columns,
+   the 1.5 * IQR bounds of the filled values. The quartiles of the filled
+   column are read off the unfilled values plus the fill value's multiplicity,
+   so no filled copy is made to compute them.
+2. outlier mask: one boolean row mask, the AND of every numeric column's
+   in-bounds test, so every column's bounds are computed on the full frame.
+3. apply: each column is filtered by the mask and then filled, and the output
+   frame is assembled once; columns that need neither are reused as they are.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
 import numpy as np
 import pandas as pd
 
+from backend.config import CLEANING_MAX_WORKERS
+from backend.utils.quantiles import lerp, quantile_ranks, select_ranks
 
-def fill_missing_values(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    log = {"missing_values_filled": {}}
-    df_cleaned = df.copy()
-
-    for col in df_cleaned.columns:
-        if df_cleaned[col].isnull().sum() == 0:
-            continue
-
-        if pd.api.types.is_numeric_dtype(df_cleaned[col]):
-            fill_value = df_cleaned[col].mean()
-            df_cleaned[col] = df_cleaned[col].fillna(fill_value)
-
-        elif pd.api.types.is_datetime64_any_dtype(df_cleaned[col]):
-            df_cleaned[col] = df_cleaned[col].fillna(method="ffill").fillna(method="bfill")
+IQR_MULTIPLIER = 1.5
+DATETIME_FILL = "ffill_bfill"  # Datetime gaps take the neighbouring values, not a constant
 
-        else:
-            try:
-                fill_value = df_cleaned[col].mode().iloc[0]
-                df_cleaned[col] = df_cleaned[col].fillna(fill_value)
-            except IndexError:
-                df_cleaned[col] = df_cleaned[col].fillna("Unknown")
+T = TypeVar("T")
 
-        log["missing_values_filled"][col] = {
-            "filled_values": int(df[col].isnull().sum() - df_cleaned[col].isnull().sum())
-        }
 
-    return df_cleaned, log
+def map_columns(fn: Callable[..., T], items: Iterable[Tuple[Any, ...]], max_workers: int) -> List[T]:
+    items = list(items)
+    if max_workers <= 1 or len(items) <= 1:
+        return [fn(*item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(lambda item: fn(*item), items))
 
 
-def remove_outliers(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
-    log = {"outliers_removed": {}}
-    df_cleaned = df.copy()
-
-    for col in df_cleaned.select_dtypes(include=np.number).columns:
-        Q1 = df_cleaned[col].quantile(0.25)
-        Q3 = df_cleaned[col].quantile(0.75)
-        IQR = Q3 - Q1
-        lower = Q1 - 1.5 * IQR
-        upper = Q3 + 1.5 * IQR
-
-        before = len(df_cleaned)
-        df_cleaned = df_cleaned[(df_cleaned[col] >= lower) & (df_cleaned[col] <= upper)]
-        after = len(df_cleaned)
+def _filled_quartiles(values: np.ndarray, fill: float, fill_count: int) -> Tuple[float, float]:
+    """
+    NumPy-interpolated 25% and 75% quantiles of `values` with `fill_count`
+    copies of `fill` appended, without materializing the filled array.
+    """
+    n = len(values) + fill_count
+    below = int(np.count_nonzero(values < fill)) if fill_count else 0
+    # Rank in the filled column -> rank in `values`, or None for a copy of the fill value
+    def source_rank(rank: int) -> Optional[int]:
+        if rank < below:
+            return rank
+        if rank < below + fill_count:
+            return None
+        return rank - fill_count
+
+    quartile_ranks = [quantile_ranks(n, q) for q in (0.25, 0.75)]
+    needed = {source_rank(r) for lower, upper, _ in quartile_ranks for r in (lower, upper)}
+    part = select_ranks(values, sorted(r for r in needed if r is not None))
+
+    def at(rank: int) -> float:
+        source = source_rank(rank)
+        return fill if source is None else part[source]
+
+    q1, q3 = (lerp(at(lower), at(upper), t) for lower, upper, t in quartile_ranks)
+    return float(q1), float(q3)
+
+
+def _column_stats(series: pd.Series) -> Dict[str, Any]:
+    """Fill rule, null count and (numeric columns only) outlier bounds of one column."""
+    nulls = int(series.isna().sum())
+    stats: Dict[str, Any] = {"nulls": nulls, "fill": None, "bounds": None}
+
+    if pd.api.types.is_numeric_dtype(series):
+        stats["kind"] = "numeric"
+        if nulls:
+            mean = series.mean()
+            stats["fill"] = None if pd.isna(mean) else mean
+        # Same columns the outlier step has always covered (bool is numeric but not a number here)
+        if series.dtype.kind in "iuf":
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            if nulls:
+                values = values[~np.isnan(values)]
+            if len(values):
+                fill_count = nulls if stats["fill"] is not None else 0
+                q1, q3 = _filled_quartiles(values, float(stats["fill"] or 0.0), fill_count)
+                iqr = q3 - q1
+                stats["bounds"] = (q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr)
+
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        stats["kind"] = "datetime"
+        if nulls and nulls < len(series):
+            stats["fill"] = DATETIME_FILL
+
+    else:
+        stats["kind"] = "other"
+        if nulls:
+            mode = series.mode()
+            stats["fill"] = mode.iloc[0] if len(mode) else "Unknown"
+
+    return stats
+
+
+def compute_cleaning_stats(df: pd.DataFrame, max_workers: int = CLEANING_MAX_WORKERS) -> Dict[str, Dict[str, Any]]:
+    """
+    One statistics pass over every column, in parallel.
 
-        if before > after:
-            log["outliers_removed"][col] = before - after
+    Returns:
+        {column: {"kind", "nulls", "fill", "bounds"}}; `fill` is None when the
+        column has nothing to fill with and `bounds` is (lower, upper) for
+        numeric columns with at least one value.
+    """
+    columns = list(df.columns)
+    results = map_columns(_column_stats, ((df[col],) for col in columns), max_workers)
+    return dict(zip(columns, results))
+
+
+def _in_bounds(series: pd.Series, stats: Dict[str, Any]) -> np.ndarray:
+    lower, upper = stats["bounds"]
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    keep = (values >= lower) & (values <= upper)
+    # Missing values are judged by the value they will be filled with
+    if stats["nulls"] and stats["fill"] is not None and lower <= stats["fill"] <= upper:
+        keep |= np.isnan(values)
+    return keep
+
+
+def outlier_mask(
+    df: pd.DataFrame,
+    stats: Dict[str, Dict[str, Any]],
+    max_workers: int = CLEANING_MAX_WORKERS,
+) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    Rows inside every numeric column's bounds.
 
-    return df_cleaned, log
+    Returns:
+        (keep, flagged): the combined row mask and, per column, how many rows it
+        flags as outliers (a row can be flagged by several columns).
+    """
+    bounded = [col for col, s in stats.items() if s["bounds"] is not None]
+    masks = map_columns(_in_bounds, ((df[col], stats[col]) for col in bounded), max_workers)
+
+    keep = np.ones(len(df), dtype=bool)
+    flagged: Dict[str, int] = {}
+    for col, mask in zip(bounded, masks):
+        outside = len(mask) - int(np.count_nonzero(mask))
+        if outside:
+            flagged[col] = outside
+            keep &= mask
+    return keep, flagged
+
+
+def _apply_column(series: pd.Series, stats: Dict[str, Any], keep: Optional[np.ndarray]) -> Any:
+    fill_gaps = stats["kind"] == "datetime" and stats["fill"] is not None
+    if fill_gaps:
+        # Neighbours are taken from the unfiltered column, as before filtering
+        series = series.ffill().bfill()
+    if keep is not None:
+        series = series[keep]
+    if stats["nulls"] and stats["fill"] is not None and not fill_gaps:
+        series = series.fillna(stats["fill"])
+    return series.array
+
+
+def apply_cleaning(
+    df: pd.DataFrame,
+    stats: Dict[str, Dict[str, Any]],
+    keep: np.ndarray,
+    max_workers: int = CLEANING_MAX_WORKERS,
+) -> pd.DataFrame:
+    """Filters every column by `keep`, fills it, and assembles the cleaned frame once."""
+    row_filter = None if keep.all() else keep
+    columns = list(df.columns)
+    arrays = map_columns(_apply_column, ((df[col], stats[col], row_filter) for col in columns), max_workers)
+    index = df.index if row_filter is None else df.index[row_filter]
+    return pd.DataFrame(dict(zip(columns, arrays)), index=index, copy=False)
 
 
 def clean_dataframe(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     """
     PURE ML ENTRY POINT
-    """
-    df_cleaned, missing_log = fill_missing_values(df)
-    df_cleaned, outlier_log = remove_outliers(df_cleaned)
 
+    Returns:
+        (cleaned_df, report): the report has row counts, filled values and
+        outlier rows per column, and `timings_ms` per step.
+    """
+    timings: Dict[str, float] = {}
+    started = step = time.perf_counter()
+
+    def lap(name: str) -> None:
+        nonlocal step
+        now = time.perf_counter()
+        timings[name] = round((now - step) * 1000, 3)
+        step = now
+
+    stats = compute_cleaning_stats(df)
+    lap("statistics")
+    keep, flagged = outlier_mask(df, stats)
+    lap("outlier_mask")
+    df_cleaned = apply_cleaning(df, stats, keep)
+    lap("apply")
+    timings["total"] = round((time.perf_counter() - started) * 1000, 3)
+
+    filled = {
+        col: {"filled_values": s["nulls"]}
+        for col, s in stats.items()
+        if s["nulls"] and s["fill"] is not None
+    }
     return df_cleaned, {
         "rows_before": len(df),
         "rows_after": len(df_cleaned),
-        **missing_log,
-        **outlier_log
+        "missing_values_filled": filled,
+        "outliers_removed": flagged,
+        "timings_ms": timings,
     }
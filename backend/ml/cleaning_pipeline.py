@@ -0,0 +1,123 @@
+# backend/ml/cleaning_pipeline.py
+
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from backend.config import CHUNKED_CLEANING_THRESHOLD_ROWS
+from backend.database.file_manager import FileIngestionManager
+from backend.database.query_cache import invalidate_query_results
+from backend.database.schema_store import SCHEMA_BACKFILL_ROWS, get_schema, invalidate_schema
+from backend.database.utils import (
+    count_table_rows,
+    get_dataset_metadata,
+    insert_dataset_metadata,
+    load_dataframe_to_db,
+    read_dataframe_from_db,
+)
+from backend.ml.chunked_cleaning import clean_table_chunked
+from backend.ml.cleaning import clean_dataframe
+from backend.ml.sql_cleaning import clean_table_sql
+
+ProgressCallback = Callable[[float, str], None]
+
+CLEANING_ENGINES = ("pandas", "chunked", "sql")
+
+
+def clean_dataset(
+    dataset_id: str,
+    progress: Optional[ProgressCallback] = None,
+    engine: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Cleans a dataset and stores the result as a new, cleaned dataset.
+
+    Args:
+        dataset_id: The dataset to clean.
+        progress: Optional callback(fraction, message) called between stages.
+        engine: "pandas" (in memory), "chunked" (out of core, see
+                backend.ml.chunked_cleaning) or "sql" (pushed down into SQLite,
+                see backend.ml.sql_cleaning). Defaults to "chunked" for tables above
+                CHUNKED_CLEANING_THRESHOLD_ROWS and "pandas" otherwise.
+
+    Returns:
+        {"original_dataset_id", "cleaned_dataset_id", "report"}
+
+    Raises:
+        ValueError: On an unknown engine.
+        FileNotFoundError: If the dataset does not exist.
+        RuntimeError: If the dataset cannot be read or the cleaned copy cannot be stored.
+    """
+    report_progress = progress or (lambda fraction, message: None)
+    if engine is not None and engine not in CLEANING_ENGINES:
+        raise ValueError(f"Unknown cleaning engine '{engine}'; choose from {', '.join(CLEANING_ENGINES)}")
+
+    original_metadata = get_dataset_metadata(dataset_id)
+    if not original_metadata:
+        raise FileNotFoundError("Original dataset not found")
+    original_table = original_metadata["table_name"]
+    cleaned_dataset_id = str(uuid.uuid4())
+    cleaned_table_name = f"dataset_{cleaned_dataset_id.replace('-', '_')}"
+
+    if engine is None:
+        engine = "chunked" if count_table_rows(original_table) > CHUNKED_CLEANING_THRESHOLD_ROWS else "pandas"
+    if engine == "chunked":
+        # Reads and writes overlap chunk by chunk, so a read failure can surface mid-load
+        try:
+            report, cleaned_df = clean_table_chunked(original_table, cleaned_table_name, progress=report_progress)
+        except Exception as e:
+            raise RuntimeError(f"Failed to clean dataset out of core: {str(e)}") from e
+        row_count = report["rows_after"]
+    elif engine == "sql":
+        try:
+            report = clean_table_sql(original_table, cleaned_table_name, progress=report_progress)
+        except Exception as e:
+            raise RuntimeError(f"Failed to clean dataset in SQLite: {str(e)}") from e
+        cleaned_df = None
+        row_count = report["rows_after"]
+    else:
+        report_progress(0.05, "Reading dataset")
+        try:
+            df = read_dataframe_from_db(original_table)
+        except Exception as e:
+            raise RuntimeError(f"Failed to read original dataset: {str(e)}") from e
+
+        report_progress(0.3, "Cleaning")
+        cleaned_df, report = clean_dataframe(df)
+        row_count = None
+
+        report_progress(0.7, "Storing cleaned dataset")
+        try:
+            load_dataframe_to_db(cleaned_df, cleaned_table_name)
+        except Exception as e:
+            raise RuntimeError(f"Failed to load cleaned dataset: {str(e)}") from e
+
+    insert_dataset_metadata(
+        dataset_id=cleaned_dataset_id,
+        filename=original_metadata["filename"],
+        table_name=cleaned_table_name,
+        is_cleaned=True,
+        source_dataset_id=dataset_id
+    )
+
+    # The cleaned table now supersedes the source for agents; refresh schema contexts.
+    # Cleaning keeps column types, but dates come back from storage as text, so the
+    # catalog inherits the source's logical types. The other engines catalogue a
+    # sample of the table
+    report_progress(0.9, "Cataloguing columns")
+    source_schema = get_schema(original_table)
+    source_types = {c["name"]: c.get("logical_type") for c in source_schema["columns"]} if source_schema else None
+    if cleaned_df is None:
+        # Rows never passed through pandas (or every row was removed); catalogue a sample as stored
+        cleaned_df = read_dataframe_from_db(cleaned_table_name, limit=SCHEMA_BACKFILL_ROWS)
+    FileIngestionManager.cache_schema(
+        cleaned_df, cleaned_dataset_id, cleaned_table_name, row_count=row_count, logical_types=source_types
+    )
+    invalidate_schema(dataset_id=dataset_id)
+    # Queries resolve to the cleaned table from now on; results read from the source are dropped
+    invalidate_query_results(original_table)
+
+    return {
+        "original_dataset_id": dataset_id,
+        "cleaned_dataset_id": cleaned_dataset_id,
+        "report": {"engine": engine, **report},
+    }
@@ -0,0 +1,257 @@
+"""
+Grouped aggregation engine for category insights.
+
+Instead of one `df.groupby(cat)[num].mean()` per (categorical, numeric) pair,
+each categorical column is factorized once and every numeric column is reduced
+against the same integer codes with `np.bincount`. The SQLite engine does the
+same work as a single `GROUP BY` with all aggregates per categorical column.
+
+Both engines return {numeric_column: {aggregation: {group: value}}}, with
+groups in sorted order, NULL keys excluded and groups without a value for an
+aggregation omitted (as `groupby(...).mean().dropna()` does).
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from backend.database.pool import read_connection
+from backend.database.query_builder import quote_identifier
+
+AGGREGATIONS = ("mean", "count", "sum", "std")
+GROUP_ENGINES = ("numpy", "sqlite")
+ROUND_DECIMALS = 3
+
+
+def validate_aggregations(aggregations: Sequence[str]) -> List[str]:
+    aggregations = list(dict.fromkeys(a.strip().lower() for a in aggregations if a.strip()))
+    unknown = [a for a in aggregations if a not in AGGREGATIONS]
+    if unknown or not aggregations:
+        raise ValueError(f"Unsupported aggregation(s): {', '.join(unknown) or '(none)'}; choose from {', '.join(AGGREGATIONS)}")
+    return aggregations
+
+
+def _as_mapping(groups: np.ndarray, values: np.ndarray, valid: np.ndarray, is_count: bool) -> Dict[Any, Any]:
+    if is_count:
+        return {g: int(v) for g, v, ok in zip(groups, values, valid) if ok}
+    rounded = np.round(values, ROUND_DECIMALS)
+    return {g: float(v) for g, v, ok in zip(groups, rounded, valid) if ok}
+
+
+def factorize_groups(keys: pd.Series, max_groups: Optional[int] = None):
+    """
+    Sorted factorization of a key column.
+
+    Returns:
+        (codes, groups) with code -1 for missing keys, or None when the column
+        has more than `max_groups` distinct values.
+    """
+    codes, groups = pd.factorize(keys, sort=True)
+    if max_groups is not None and len(groups) > max_groups:
+        return None
+    return codes, np.asarray(groups, dtype=object).tolist()
+
+
+def grouped_aggregates(
+    codes: np.ndarray,
+    groups: List[Any],
+    numeric: Dict[str, np.ndarray],
+    aggregations: Sequence[str] = ("mean",),
+) -> Dict[str, Dict[str, Dict[Any, Any]]]:
+    """
+    Aggregates every numeric column against one set of group codes.
+
+    Args:
+        codes: Group code per row (-1 = missing key), from `factorize_groups`.
+        groups: Group labels indexed by code.
+        numeric: {column: 1-D numeric array} aligned with `codes`.
+        aggregations: Any of AGGREGATIONS.
+    """
+    n_groups = len(groups)
+    has_key = codes >= 0
+    result: Dict[str, Dict[str, Dict[Any, Any]]] = {}
+
+    for col, values in numeric.items():
+        values = np.asarray(values, dtype=np.float64)
+        mask = has_key & ~np.isnan(values)
+        col_codes = codes[mask]
+        col_values = values[mask]
+
+        counts = np.bincount(col_codes, minlength=n_groups)
+        sums = np.bincount(col_codes, weights=col_values, minlength=n_groups)
+        present = counts > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = sums / counts
+
+        per_agg: Dict[str, Dict[Any, Any]] = {}
+        for agg in aggregations:
+            if agg == "mean":
+                per_agg[agg] = _as_mapping(groups, means, present, False)
+            elif agg == "count":
+                per_agg[agg] = _as_mapping(groups, counts, present, True)
+            elif agg == "sum":
+                per_agg[agg] = _as_mapping(groups, sums, present, False)
+            elif agg == "std":
+                # Two-pass (deviations from the group mean) for accuracy; ddof=1 like pandas
+                squared = np.bincount(col_codes, weights=(col_values - means[col_codes]) ** 2, minlength=n_groups)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    std = np.sqrt(squared / (counts - 1))
+                per_agg[agg] = _as_mapping(groups, std, counts > 1, False)
+        result[col] = per_agg
+
+    return result
+
+
+def grouped_aggregates_sql(
+    table_name: str,
+    key: str,
+    numeric_columns: Sequence[str],
+    aggregations: Sequence[str] = ("mean",),
+    max_groups: Optional[int] = None,
+) -> Optional[Dict[str, Dict[str, Dict[Any, Any]]]]:
+    """
+    SQLite variant of `grouped_aggregates`: one GROUP BY over `key` computing
+    every aggregate of every numeric column.
+
+    Returns None when the key has more than `max_groups` distinct values.
+    std is derived from the sums of squares, so it is less accurate than the
+    NumPy engine for columns with a large mean relative to their spread.
+    """
+    key_ident = quote_identifier(key)
+    table_ident = quote_identifier(table_name)
+
+    if max_groups is not None:
+        # DISTINCT streams, so the LIMIT stops high-cardinality keys after max_groups + 1 values
+        with read_connection() as conn:
+            distinct = conn.execute(
+                f"SELECT COUNT(*) FROM (SELECT DISTINCT {key_ident} FROM {table_ident} WHERE {key_ident} IS NOT NULL LIMIT {int(max_groups) + 1})"
+            ).fetchone()[0]
+        if distinct > max_groups:
+            return None
+
+    select = [f"{key_ident}"]
+    for col in numeric_columns:
+        ident = quote_identifier(col)
+        select += [f"COUNT({ident})", f"SUM({ident})", f"SUM({ident} * {ident})"]
+    sql = f"SELECT {', '.join(select)} FROM {table_ident} WHERE {key_ident} IS NOT NULL GROUP BY {key_ident} ORDER BY {key_ident}"
+
+    with read_connection() as conn:
+        rows = conn.execute(sql).fetchall()
+
+    groups = [row[0] for row in rows]
+    result: Dict[str, Dict[str, Dict[Any, Any]]] = {}
+    for i, col in enumerate(numeric_columns):
+        base = 1 + 3 * i
+        counts = np.array([row[base] for row in rows], dtype=np.int64)
+        sums = np.array([row[base + 1] if row[base + 1] is not None else np.nan for row in rows], dtype=np.float64)
+        squares = np.array([row[base + 2] if row[base + 2] is not None else np.nan for row in rows], dtype=np.float64)
+        present = counts > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = sums / counts
+            variance = np.maximum((squares - sums * means) / (counts - 1), 0.0)
+
+        per_agg: Dict[str, Dict[Any, Any]] = {}
+        for agg in aggregations:
+            if agg == "mean":
+                per_agg[agg] = _as_mapping(groups, means, present, False)
+            elif agg == "count":
+                per_agg[agg] = _as_mapping(groups, counts, present, True)
+            elif agg == "sum":
+                per_agg[agg] = _as_mapping(groups, sums, present, False)
+            elif agg == "std":
+                per_agg[agg] = _as_mapping(groups, np.sqrt(variance), counts > 1, False)
+        result[col] = per_agg
+    return result
+
+
+def _grow(values: np.ndarray, size: int) -> np.ndarray:
+    """Zero-pads a per-group array to `size` groups."""
+    return np.concatenate([values, np.zeros(size - len(values))])
+
+
+class GroupedAccumulator:
+    """
+    Streaming variant of `grouped_aggregates` for one key column: per-group
+    count, sum and M2 of every numeric column, merged chunk by chunk (Chan et
+    al.), so memory depends on the number of groups and not on the rows.
+
+    Stops tracking (`overflow`) once the key has more than `max_groups`
+    distinct values.
+    """
+
+    def __init__(self, numeric_columns: Sequence[str], max_groups: int):
+        self.max_groups = max_groups
+        self.overflow = False
+        self._index: Dict[Any, int] = {}
+        self._count = {col: np.zeros(0) for col in numeric_columns}
+        self._sum = {col: np.zeros(0) for col in numeric_columns}
+        self._m2 = {col: np.zeros(0) for col in numeric_columns}
+
+    def update(self, keys: pd.Series, numeric: Dict[str, np.ndarray]) -> None:
+        if self.overflow:
+            return
+        codes, groups = pd.factorize(keys)
+        for group in groups:
+            self._index.setdefault(group, len(self._index))
+        n_groups = len(self._index)
+        if n_groups > self.max_groups:
+            self.overflow = True
+            self._count = self._sum = self._m2 = {}
+            return
+
+        mapping = np.array([self._index[g] for g in groups], dtype=np.int64)
+        global_codes = np.where(codes >= 0, mapping[codes] if len(mapping) else -1, -1)
+        for col in self._count:
+            values = np.asarray(numeric[col], dtype=np.float64)
+            mask = (global_codes >= 0) & ~np.isnan(values)
+            col_codes = global_codes[mask]
+            col_values = values[mask]
+
+            counts = np.bincount(col_codes, minlength=n_groups).astype(np.float64)
+            sums = np.bincount(col_codes, weights=col_values, minlength=n_groups)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                means = np.where(counts > 0, sums / counts, 0.0)
+            m2 = np.bincount(col_codes, weights=(col_values - means[col_codes]) ** 2, minlength=n_groups)
+
+            prev_count = _grow(self._count[col], n_groups)
+            prev_sum = _grow(self._sum[col], n_groups)
+            prev_m2 = _grow(self._m2[col], n_groups)
+
+            total = prev_count + counts
+            with np.errstate(divide="ignore", invalid="ignore"):
+                delta = means - np.where(prev_count > 0, prev_sum / prev_count, 0.0)
+                correction = np.where(total > 0, delta * delta * prev_count * counts / total, 0.0)
+            self._count[col] = total
+            self._sum[col] = prev_sum + sums
+            self._m2[col] = prev_m2 + m2 + correction
+
+    def result(self, aggregations: Sequence[str] = ("mean",)) -> Optional[Dict[str, Dict[str, Dict[Any, Any]]]]:
+        """Same shape as `grouped_aggregates`, or None after an overflow."""
+        if self.overflow:
+            return None
+        try:
+            groups = sorted(self._index)
+        except TypeError:
+            groups = list(self._index)  # Mixed key types have no order
+        order = np.array([self._index[g] for g in groups], dtype=np.int64)
+
+        result: Dict[str, Dict[str, Dict[Any, Any]]] = {}
+        for col in self._count:
+            counts = self._count[col][order] if len(order) else np.zeros(0)
+            sums = self._sum[col][order] if len(order) else np.zeros(0)
+            m2 = self._m2[col][order] if len(order) else np.zeros(0)
+            present = counts > 0
+            per_agg: Dict[str, Dict[Any, Any]] = {}
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for agg in aggregations:
+                    if agg == "mean":
+                        per_agg[agg] = _as_mapping(groups, sums / counts, present, False)
+                    elif agg == "count":
+                        per_agg[agg] = _as_mapping(groups, counts, present, True)
+                    elif agg == "sum":
+                        per_agg[agg] = _as_mapping(groups, sums, present, False)
+                    elif agg == "std":
+                        per_agg[agg] = _as_mapping(groups, np.sqrt(m2 / (counts - 1)), counts > 1, False)
+            result[col] = per_agg
+        return result
@@ -1,7 +1,15 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Sequence
 import pandas as pd
 import numpy as np
+from backend.database.result_cache import cached_result
 from backend.database.utils import resolve_best_table_name, read_dataframe_from_db
+from backend.ml.stats_kernel import numeric_insights
+from backend.ml.approx_insights import approximate_insights
+from backend.ml.grouped_agg import GROUP_ENGINES, factorize_groups, grouped_aggregates, grouped_aggregates_sql, validate_aggregations
+
+MAX_CATEGORY_LEVELS = 25  # Text columns with more distinct values are skipped by category_insights
+ENGINE_VERSION = "1"  # Bump when the insights output changes, to retire cached results
+
 # def load_best_dataset(dataset_id: str) -> pd.DataFrame:
 #     """
 #     Loads the best available version of a dataset (cleaned, if available).
@@ -44,28 +52,58 @@ def corelation_analysis(df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
     corr = numeric_df.corr().round(3).fillna(0)
     return corr.to_dict()
 
-def category_insights(df: pd.DataFrame) -> Dict[str, Any]:
+def category_insights(
+    df: pd.DataFrame,
+    aggregations: Sequence[str] = ("mean",),
+    max_categories: int = MAX_CATEGORY_LEVELS,
+    engine: str = "numpy",
+    table_name: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Per-category aggregates of every numeric column, for text columns with at
+    most `max_categories` distinct values.
+
+    Each categorical column is grouped once for all numeric columns (see
+    backend.ml.grouped_agg), either from factorized codes in NumPy or as one
+    SQLite GROUP BY on `table_name`.
+
+    Returns:
+        {cat: {num: {group: mean}}} when only "mean" is requested (the original
+        shape), otherwise {cat: {num: {aggregation: {group: value}}}}.
+    """
+    aggregations = validate_aggregations(aggregations)
+    if engine not in GROUP_ENGINES:
+        raise ValueError(f"Unsupported group engine '{engine}'; choose from {', '.join(GROUP_ENGINES)}")
+    if engine == "sqlite" and not table_name:
+        raise ValueError("The sqlite group engine needs the table name")
+
     insights = {}
 
     categorical_cols = df.select_dtypes(include=["object"]).columns
-    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    numeric_cols = list(df.select_dtypes(include=[np.number]).columns)
+    numeric_values = {num: df[num].to_numpy() for num in numeric_cols} if engine == "numpy" else {}
 
     for cat in categorical_cols:
-        if df[cat].nunique() > 25:
+        if engine == "sqlite":
+            grouped = grouped_aggregates_sql(table_name, cat, numeric_cols, aggregations, max_groups=max_categories)
+        else:
+            factorized = factorize_groups(df[cat], max_groups=max_categories)
+            grouped = grouped_aggregates(*factorized, numeric_values, aggregations) if factorized else None
+        if grouped is None:
             continue
-        
-        insights[cat] = {}
-        
-        for num in numeric_cols:
-            try:
-                group = df.groupby(cat)[num].mean().round(3).dropna()
-                insights[cat][num] = group.to_dict()
-            except:
-                continue
+
+        insights[cat] = _category_shape(grouped, aggregations)
 
     return insights
 
 
+def _category_shape(grouped: Dict[str, Any], aggregations: Sequence[str]) -> Dict[str, Any]:
+    """Drops the aggregation level when only the mean is requested (the original response shape)."""
+    if list(aggregations) == ["mean"]:
+        return {num: per_agg["mean"] for num, per_agg in grouped.items()}
+    return grouped
+
+
 def extremes(df: pd.DataFrame) -> Dict[str, Any]:
     info = {}
 
@@ -83,21 +121,89 @@ def extremes(df: pd.DataFrame) -> Dict[str, Any]:
 
 
 
-def generate_insights(dataset_id: str) -> Dict[str, Any]:
+def generate_insights(
+    dataset_id: str,
+    category_aggregations: Sequence[str] = ("mean",),
+    max_categories: int = MAX_CATEGORY_LEVELS,
+    group_engine: str = "numpy",
+    approximate: bool = False,
+) -> Dict[str, Any]:
     """
     Generates a set of analytical insights for a given dataset from the database.
+
+    Args:
+        dataset_id: The dataset to analyze (its cleaned version when available).
+        category_aggregations: Aggregates reported per category (mean, count, sum, std).
+        max_categories: Text columns with more distinct values are skipped.
+        group_engine: "numpy" (factorized codes) or "sqlite" (GROUP BY pushdown).
+        approximate: Stream the table through bounded-memory sketches instead of
+            loading it (see backend.ml.approx_insights); quantiles then come with
+            error bounds and the response carries an "approximation" section.
+
+    Results are cached per (table, ENGINE_VERSION, parameters); see
+    backend.database.result_cache.
     """
     table_name = resolve_best_table_name(dataset_id)
+    params = {
+        "category_aggregations": list(category_aggregations),
+        "max_categories": max_categories,
+        "group_engine": group_engine,
+        "approximate": approximate,
+    }
+    result = cached_result(
+        "insights",
+        table_name,
+        ENGINE_VERSION,
+        params,
+        lambda: _compute_insights(table_name, category_aggregations, max_categories, group_engine, approximate),
+    )
+    # The same table serves its source dataset and its cleaned copy
+    return {"dataset_id": dataset_id, **result}
+
+
+def _compute_insights(
+    table_name: str,
+    category_aggregations: Sequence[str],
+    max_categories: int,
+    group_engine: str,
+    approximate: bool,
+) -> Dict[str, Any]:
+    if approximate:
+        return _approximate(table_name, category_aggregations, max_categories)
+
     df = read_dataframe_from_db(table_name)
 
+    # Fused kernel; the per-function pandas path covers dtypes it cannot reproduce exactly
+    numeric = numeric_insights(df)
+    if numeric is None:
+        numeric = {
+            "numeric_summary": numeric_summary(df),
+            "correlations": corelation_analysis(df),
+            "extremes": extremes(df),
+        }
+
     return {
-        "dataset_id": dataset_id,
         "num_rows": int(df.shape[0]),
         "num_columns": int(df.shape[1]),
-        "numeric_summary": numeric_summary(df),
-        "correlations": corelation_analysis(df),
-        "category_insights": category_insights(df),
-        "extremes": extremes(df),
+        "numeric_summary": numeric["numeric_summary"],
+        "correlations": numeric["correlations"],
+        "category_insights": category_insights(df, category_aggregations, max_categories, group_engine, table_name),
+        "extremes": numeric["extremes"],
+    }
+
+
+def _approximate(table_name: str, aggregations: Sequence[str], max_categories: int) -> Dict[str, Any]:
+    aggregations = validate_aggregations(aggregations)
+    result = approximate_insights(table_name, aggregations, max_categories)
+    return {
+        "num_rows": result["num_rows"],
+        "num_columns": result["num_columns"],
+        "numeric_summary": result["numeric_summary"],
+        "correlations": result["correlations"],
+        "category_insights": {cat: _category_shape(grouped, aggregations) for cat, grouped in result["category_groups"].items()},
+        "extremes": result["extremes"],
+        "approximate": True,
+        "approximation": result["approximation"],
     }
 
 
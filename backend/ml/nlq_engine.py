@@ -1,51 +1,84 @@
-import sqlite3
-from backend.config import DATABASE_FILE
+from typing import Any, Dict
+
+from loguru import logger
+
+from backend.config import NLQ_JSON_MAX_ROWS
+from backend.database.query_cache import run_cached_query
 from backend.database.utils import find_cleaned_dataset_id,resolve_best_table_name
 from backend.ml.text2sql_engine import generate_sql
 from backend.ml.sql_sanitize import validate_sql
-from backend.database.utils import get_table_schema
+from backend.database.schema_store import get_schema_context
+from backend.database.nlq_cache import lookup_sql, store_sql
 # from backend.database.utils import get_table_name_for_dataset
 
 
 
     
 
-def run_nlq(dataset_id: str, question: str):
-    """
-    Executes a SAFE, READ-ONLY NLQ using SQL.
+def prepare_nlq(dataset_id: str, question: str) -> Dict[str, Any]:
     """
+    Resolves the table and produces validated SQL for a question, from the
+    NL-to-SQL cache or the Text2SQL model. Nothing is executed.
 
+    Returns:
+        {"dataset_id", "table", "sql", "cache", "schema_context"}
+    """
     cleaned_dataset_id = resolve_best_table_name(dataset_id)
-    schema = get_table_schema(cleaned_dataset_id)
-    print(f"[NLQ] Schema for table '{cleaned_dataset_id}':\n{schema}")
-
-    raw_sql = generate_sql(schema, question)
-    print(f"[NLQ] Raw SQL from model: {raw_sql!r}")
-
-    if not isinstance(raw_sql, str) or not raw_sql.strip():
-        raise ValueError("Text2SQL model returned invalid or empty output")
-
-    sql = validate_sql(raw_sql)
-    print(f"[NLQ] Sanitized SQL: {sql}")
-
-    conn = sqlite3.connect(DATABASE_FILE)
-    try:
-        cur = conn.cursor()
-        cur.execute(sql)
-        rows = cur.fetchall()
-        columns = [d[0] for d in cur.description] if cur.description else []
-
-        return {
-            "dataset_id": dataset_id,
-            "table": cleaned_dataset_id,
-            "sql": sql,
-            "columns": columns,
-            "rows": rows,
-            "row_count": len(rows)
-        }
-
-    finally:
-        conn.close()
+    schema = get_schema_context(cleaned_dataset_id)
+    logger.debug(f"[NLQ] Schema for table '{cleaned_dataset_id}':\n{schema}")
+
+    cached = lookup_sql(dataset_id, cleaned_dataset_id, schema, question)
+    if cached:
+        # Re-validated: entries may predate the current guards
+        sql = validate_sql(cached["sql"], allowed_tables={cleaned_dataset_id})
+        logger.debug(f"[NLQ] Cached SQL ({cached['match']} match): {sql}")
+    else:
+        raw_sql = generate_sql(schema, question)
+        logger.debug(f"[NLQ] Raw SQL from model: {raw_sql!r}")
+
+        if not isinstance(raw_sql, str) or not raw_sql.strip():
+            raise ValueError("Text2SQL model returned invalid or empty output")
+
+        sql = validate_sql(raw_sql, allowed_tables={cleaned_dataset_id})
+        logger.info(f"[NLQ] Sanitized SQL: {sql}")
+
+    return {
+        "dataset_id": dataset_id,
+        "table": cleaned_dataset_id,
+        "sql": sql,
+        "cache": cached["match"] if cached else None,
+        "schema_context": schema,
+    }
+
+
+def remember_nlq(prepared: Dict[str, Any], question: str) -> None:
+    """Caches freshly generated SQL once it has run."""
+    if not prepared["cache"]:
+        store_sql(prepared["dataset_id"], prepared["table"], prepared["schema_context"], question, prepared["sql"])
+
+
+def run_nlq(dataset_id: str, question: str, max_rows: int = NLQ_JSON_MAX_ROWS):
+    """
+    Executes a SAFE, READ-ONLY NLQ using SQL.
+    Returns at most `max_rows` rows; larger results are flagged as truncated
+    (stream or page through them instead).
+    """
+    prepared = prepare_nlq(dataset_id, question)
+    result = run_cached_query(prepared["sql"], max_rows=max_rows)
+    remember_nlq(prepared, question)
+
+    rows = result["rows"]
+    return {
+        "dataset_id": dataset_id,
+        "table": prepared["table"],
+        "sql": prepared["sql"],
+        "columns": result["columns"],
+        "rows": rows,
+        "row_count": len(rows),
+        "truncated": result["truncated"],
+        "cache": prepared["cache"],
+        "result_cached": result["cached"],
+    }
 
 
 
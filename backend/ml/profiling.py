@@ -1,26 +1,38 @@
 # backend/ml/profiling.py
 
 from typing import Dict, Any
+from backend.database.result_cache import cached_result
 from backend.database.utils import get_table_name_for_dataset, read_dataframe_from_db
-from backend.ml.auto_profiler import generate_ml_profile
+from backend.ml.auto_profiler import PROFILE_MODES, generate_ml_profile
 
-def generate_profile(dataset_id: str) -> Dict[str, Any]:
+ENGINE_VERSION = "2"  # Bump when the profile output changes, to retire cached results
+
+def generate_profile(dataset_id: str, mode: str = "fast") -> Dict[str, Any]:
     table = get_table_name_for_dataset(dataset_id)
     if not table:
         raise FileNotFoundError(f"Dataset {dataset_id} not found")
 
-    df = read_dataframe_from_db(table)
-
-    ml_profile = generate_ml_profile(df)
-    print("Generated ML profile:", ml_profile)
+    ml_profile = profile_table(table, mode)
 
     return {
         "dataset_id": dataset_id,
         "profile": ml_profile
     }
 
+def profile_table(table_name: str, mode: str = "fast") -> Dict[str, Any]:
+    """ML profile of a table ("fast" native or "deep" ydata mode), cached per (table, ENGINE_VERSION, mode)."""
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unsupported profile mode '{mode}'; choose from {', '.join(PROFILE_MODES)}")
+    return cached_result(
+        "profile",
+        table_name,
+        ENGINE_VERSION,
+        {"mode": mode},
+        lambda: generate_ml_profile(read_dataframe_from_db(table_name), mode),
+    )
+
 
-# def generate_profile(dataset_id: str) -> Dict[str, Any]:
+# def generate_profile(dataset_id: str, mode: str = "fast") -> Dict[str, Any]:
 #     """Main entry: load dataset by id from the database, profile it, return structured JSON."""
 #     table_name = get_table_name_for_dataset(dataset_id)
 #     if not table_name:
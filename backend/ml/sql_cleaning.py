@@ -0,0 +1,423 @@
+"""
+SQL-pushdown cleaning: the cleaned table is built inside SQLite.
+
+Statistics are computed with SQL where SQLite can reproduce the in-memory
+engine's rules (backend.ml.cleaning) exactly:
+
+- numeric columns: AVG for the mean fill, and the quartiles of the filled
+  column from ROW_NUMBER() windows over COALESCE(col, mean), interpolated
+  the way NumPy does (see `sql_quartiles`)
+- other columns: the mode from GROUP BY (ties go to the smallest value, as in
+  `Series.mode`)
+
+`plan_cleaning` decides per column. Numeric columns that also hold text (raw
+values kept at ingestion) are read by pandas as object columns, so their mode
+is computed in pandas over a chunked read of just those columns.
+
+The fills and bounds are then bound as parameters into one
+`INSERT INTO ... SELECT COALESCE(...) ... WHERE ...` into a table created with
+the column types the pandas path would write. No row is pulled into Python
+except for pandas-planned columns.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from backend.config import CLEANING_CHUNK_ROWS, CLEANING_MAX_WORKERS
+from backend.database.pool import read_connection, write_connection
+from backend.database.query_builder import quote_identifier
+from backend.database.utils import get_table_columns, is_numeric_affinity, iter_dataframe_chunks
+from backend.ml.chunked_cleaning import ColumnAccumulator
+from backend.ml.cleaning import IQR_MULTIPLIER
+from backend.utils.quantiles import lerp, quantile_ranks
+
+ProgressCallback = Callable[[float, str], None]
+
+QUARTILE_SAMPLE_ROWS = 50_000  # Rows sampled to bracket each quartile before ranking
+QUARTILE_BRACKET_Z = 5.0  # Bracket half-width, in standard deviations of the quartile's sample rank
+
+# Long-lived threads, so each keeps reusing its pooled read connection; the
+# per-column statistics queries run in parallel on them
+_stats_pool: Optional[ThreadPoolExecutor] = None
+_stats_pool_lock = threading.Lock()
+
+
+def _get_stats_pool() -> ThreadPoolExecutor:
+    global _stats_pool
+    with _stats_pool_lock:
+        if _stats_pool is None:
+            _stats_pool = ThreadPoolExecutor(max_workers=CLEANING_MAX_WORKERS, thread_name_prefix="sql-clean")
+        return _stats_pool
+
+
+def plan_cleaning(table_name: str) -> Dict[str, Any]:
+    """
+    Profiles a table in one scan and picks where each column's statistics are computed.
+
+    Returns:
+        {"rows": int, "columns": {column: {"declared_type", "kind", "engine",
+        "reason", "nulls", "mean"}}}; `engine` is "sql" or "pandas" and `mean`
+        is set for numeric columns.
+
+    Raises:
+        ValueError: If the table does not exist.
+    """
+    declared = get_table_columns(table_name)
+    if not declared:
+        raise ValueError(f"Table '{table_name}' does not exist.")
+
+    numeric = [c["name"] for c in declared if is_numeric_affinity(c["type"])]
+    select = ["COUNT(*)"]
+    select += [f"COUNT({quote_identifier(c['name'])})" for c in declared]
+    for col in numeric:
+        q = quote_identifier(col)
+        select += [f"AVG({q})", f"SUM(typeof({q}) IN ('text', 'blob'))"]
+    with read_connection() as conn:
+        row = conn.execute(f"SELECT {', '.join(select)} FROM {quote_identifier(table_name)}").fetchone()
+
+    rows = row[0]
+    non_null = dict(zip((c["name"] for c in declared), row[1:1 + len(declared)]))
+    numeric_stats = {col: (row[1 + len(declared) + 2 * i], row[2 + len(declared) + 2 * i]) for i, col in enumerate(numeric)}
+
+    columns: Dict[str, Dict[str, Any]] = {}
+    for c in declared:
+        col = c["name"]
+        entry = {"declared_type": c["type"], "nulls": rows - non_null[col], "mean": None}
+        if col not in numeric_stats:
+            entry.update(kind="other", engine="sql", reason="mode via GROUP BY")
+        elif numeric_stats[col][1]:
+            entry.update(kind="other", engine="pandas", reason="numeric column holding text; pandas reads it as object")
+        else:
+            entry.update(kind="numeric", engine="sql", reason="AVG and quartiles via ROW_NUMBER()", mean=numeric_stats[col][0])
+        columns[col] = entry
+    return {"rows": rows, "columns": columns}
+
+
+def _value_sql(col: str, fill: Optional[float]) -> Tuple[str, List[Any]]:
+    """The column as the quartiles see it: filled with the mean when it has one."""
+    q = quote_identifier(col)
+    return (q, []) if fill is None else (f"COALESCE({q}, ?)", [fill])
+
+
+def _range_sql(value: str, value_params: List[Any], low: Optional[float], high: Optional[float]) -> Tuple[str, List[Any]]:
+    """`value` within [low, high]; a None end is unbounded."""
+    parts, params = [], []
+    if low is not None:
+        parts.append(f"{value} >= ?")
+        params += value_params + [low]
+    if high is not None:
+        parts.append(f"{value} <= ?")
+        params += value_params + [high]
+    if not parts:
+        return f"{value} IS NOT NULL", list(value_params)
+    return " AND ".join(parts), params
+
+
+def _bracket(sample: np.ndarray, n: int, ranks: Tuple[int, int]) -> Tuple[Optional[float], Optional[float]]:
+    """
+    A value range that contains the given ranks of the full column with high
+    probability, from the sorted sample: the sample rank of the target
+    fraction widened by QUARTILE_BRACKET_Z standard deviations.
+    """
+    m = len(sample)
+    if m == 0 or n < 2:
+        return None, None
+    fraction = ranks[0] / (n - 1)
+    center = fraction * (m - 1)
+    margin = QUARTILE_BRACKET_Z * np.sqrt(m * fraction * (1 - fraction)) + 2
+    low_idx, high_idx = int(np.floor(center - margin)), int(np.ceil(center + margin))
+    low = float(sample[low_idx]) if low_idx >= 0 else None
+    high = float(sample[high_idx]) if high_idx < m else None
+    return low, high
+
+
+def _rank_in_brackets(
+    table_name: str,
+    targets: Dict[str, Tuple[Tuple[str, List[Any]], List[Tuple[Optional[float], Optional[float], int]], List[List[int]]]],
+) -> Dict[str, Dict[int, float]]:
+    """
+    Values at the wanted column ranks of several columns, in one scan: the rows
+    inside any column's brackets are materialized, and a ROW_NUMBER() window
+    per column ranks that column's bracket rows.
+
+    Args:
+        targets: {column: (value_sql, brackets, wanted)}, with brackets as
+                 (low, high, rows below low) and the wanted ranks per bracket.
+    """
+    columns = list(targets)
+    values, value_params, keep, keep_params, ranked, ranked_params = [], [], [], [], [], []
+    for i, col in enumerate(columns):
+        (value, params), brackets, wanted = targets[col]
+        values.append(f"{value} AS v{i}")
+        value_params += params
+        cases, where = [], []
+        for g, ((low, high, below), ranks) in enumerate(zip(brackets, wanted)):
+            condition, condition_params = _range_sql(f"v{i}", [], low, high)
+            keep.append(f"({condition})")
+            keep_params += condition_params
+            cases.append(f"WHEN {condition} THEN {g}")
+            ranked_params += condition_params
+            where.append(f"(grp = {g} AND rn IN ({', '.join(str(r - below) for r in ranks)}))")
+        ranked.append(
+            f"SELECT {i} AS c, grp, rn, v FROM ("
+            "SELECT grp, v, ROW_NUMBER() OVER (PARTITION BY grp ORDER BY v) - 1 AS rn FROM ("
+            f"SELECT v{i} AS v, CASE {' '.join(cases)} END AS grp FROM bracketed"
+            ") WHERE grp IS NOT NULL"
+            f") WHERE {' OR '.join(where)}"
+        )
+    sql = (
+        "WITH bracketed AS MATERIALIZED ("
+        f"SELECT * FROM (SELECT {', '.join(values)} FROM {quote_identifier(table_name)}) WHERE {' OR '.join(keep)}"
+        f") {' UNION ALL '.join(ranked)}"
+    )
+    with read_connection() as conn:
+        rows = conn.execute(sql, value_params + keep_params + ranked_params).fetchall()
+    found: Dict[str, Dict[int, float]] = {col: {} for col in columns}
+    for c, g, rn, v in rows:
+        col = columns[c]
+        found[col][targets[col][1][g][2] + rn] = float(v)
+    return found
+
+
+def sql_quartiles(
+    table_name: str,
+    targets: Dict[str, Tuple[Optional[float], int]],
+    non_null: Dict[str, int],
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Exact 25% and 75% quantiles (NumPy interpolation) of numeric columns, computed inside SQLite.
+
+    Sorting a whole column with a ROW_NUMBER() window costs seconds per
+    million rows, so each quartile is first bracketed from a systematic sample
+    (one scan for all columns), the rows below and inside every bracket are
+    counted (one scan), and the windows then rank only the rows inside the
+    brackets (one scan that materializes them for every column). A column whose
+    brackets miss its ranks falls back to ranking all of its values.
+
+    Args:
+        targets: {column: (fill, n)}: the mean fill value (None if the column
+                 is not filled) and the number of values of the filled column.
+        non_null: {column: number of non-null values}.
+    """
+    source = quote_identifier(table_name)
+    columns = list(targets)
+    values_sql = {col: _value_sql(col, targets[col][0]) for col in columns}
+    quartile_ranks = {col: [quantile_ranks(targets[col][1], p) for p in (0.25, 0.75)] for col in columns}
+
+    # 1. Bracket every quartile from a systematic sample
+    step = max(1, max(n for _, n in targets.values()) // QUARTILE_SAMPLE_ROWS)
+    select = ", ".join(sql for sql, _ in values_sql.values())
+    params = [p for _, ps in values_sql.values() for p in ps]
+    with read_connection() as conn:
+        sample_rows = conn.execute(f"SELECT {select} FROM {source} WHERE rowid % ? = 0", params + [step]).fetchall()
+    brackets: Dict[str, List[Tuple[Optional[float], Optional[float]]]] = {}
+    wanted: Dict[str, List[List[int]]] = {}
+    for i, col in enumerate(columns):
+        sample = np.sort(np.array([row[i] for row in sample_rows if row[i] is not None], dtype=np.float64))
+        (l1, u1, _), (l3, u3, _) = quartile_ranks[col]
+        q1, q3 = _bracket(sample, targets[col][1], (l1, u1)), _bracket(sample, targets[col][1], (l3, u3))
+        if q1[1] is None or q3[0] is None or q3[0] <= q1[1]:
+            # Overlapping brackets are merged so that no row belongs to two of them
+            brackets[col], wanted[col] = [(q1[0], q3[1])], [sorted({l1, u1, l3, u3})]
+        else:
+            brackets[col], wanted[col] = [q1, q3], [sorted({l1, u1}), sorted({l3, u3})]
+
+    # 2. Count the rows below and inside every bracket, and check that each holds its ranks.
+    # Counted on the raw column; the filled rows are added from the fill value and null count
+    select, params = [], []
+    for col in columns:
+        q = quote_identifier(col)
+        for low, high in brackets[col]:
+            select.append(f"SUM({q} < ?)" if low is not None else "0")
+            select.append(f"SUM({q} <= ?)" if high is not None else f"COUNT({q})")
+            params += [v for v in (low, high) if v is not None]
+    with read_connection() as conn:
+        counts = iter(conn.execute(f"SELECT {', '.join(select)} FROM {source}", params).fetchone())
+    located: Dict[str, List[Tuple[Optional[float], Optional[float], int]]] = {}
+    for col in columns:
+        fill, n = targets[col]
+        fill_count = n - non_null[col] if fill is not None else 0
+        located[col] = []
+        hit = True
+        for (low, high), ranks in zip(brackets[col], wanted[col]):
+            below, up_to_high = int(next(counts) or 0), int(next(counts) or 0)
+            if fill_count:
+                below += fill_count if low is not None and fill < low else 0
+                up_to_high += fill_count if high is None or fill <= high else 0
+            hit = hit and all(below <= r < up_to_high for r in ranks)
+            located[col].append((low, high, below))
+        if not hit:
+            logger.debug(f"[Cleaning] Quartile brackets of '{col}' missed; ranking all of its values")
+            located[col] = [(None, None, 0)]
+            wanted[col] = [sorted({r for ranks in wanted[col] for r in ranks})]
+
+    # 3. Rank the rows inside the brackets; columns whose brackets missed are ranked on their own
+    missed = {col for col in columns if located[col][0][:2] == (None, None)}
+    groups = [[col for col in columns if col not in missed]] + [[col] for col in columns if col in missed]
+    values: Dict[str, Dict[int, float]] = {}
+    for group in groups:
+        if group:
+            values.update(_rank_in_brackets(table_name, {col: (values_sql[col], located[col], wanted[col]) for col in group}))
+    quartiles = {}
+    for col in columns:
+        q1, q3 = (lerp(values[col][lower], values[col][upper], t) for lower, upper, t in quartile_ranks[col])
+        quartiles[col] = (float(q1), float(q3))
+    return quartiles
+
+
+def _sql_mode(table_name: str, col: str) -> Any:
+    q = quote_identifier(col)
+    sql = f"SELECT {q} FROM {quote_identifier(table_name)} WHERE {q} IS NOT NULL GROUP BY {q} ORDER BY COUNT(*) DESC, {q} ASC LIMIT 1"
+    with read_connection() as conn:
+        row = conn.execute(sql).fetchone()
+    return None if row is None else row[0]
+
+
+def _pandas_modes(table_name: str, columns: List[str]) -> Dict[str, Any]:
+    accumulators = {col: ColumnAccumulator(col, numeric=False) for col in columns}
+    for chunk in iter_dataframe_chunks(table_name, columns=columns, chunk_rows=CLEANING_CHUNK_ROWS):
+        for col, acc in accumulators.items():
+            acc.update(chunk[col])
+    return {col: acc.frequent.most_frequent() for col, acc in accumulators.items()}
+
+
+def compute_sql_stats(table_name: str, plan: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Fill values and bounds per column, in the shape of `compute_cleaning_stats`."""
+    rows = plan["rows"]
+    stats: Dict[str, Dict[str, Any]] = {}
+    targets: Dict[str, Tuple[Optional[float], int]] = {}
+    modes = {}
+    pandas_columns = []
+    for col, p in plan["columns"].items():
+        s = stats[col] = {"kind": p["kind"], "nulls": p["nulls"], "fill": None, "bounds": None}
+        if p["kind"] == "numeric":
+            if rows - p["nulls"]:
+                # Columns without values get neither a fill nor bounds
+                s["fill"] = p["mean"] if p["nulls"] else None
+                targets[col] = (s["fill"], rows if p["nulls"] else rows - p["nulls"])
+        elif p["nulls"] and p["engine"] == "sql":
+            modes[col] = _get_stats_pool().submit(_sql_mode, table_name, col)
+        elif p["nulls"]:
+            pandas_columns.append(col)
+
+    non_null = {col: rows - plan["columns"][col]["nulls"] for col in targets}
+    quartiles = sql_quartiles(table_name, targets, non_null) if targets else {}
+    for col, (q1, q3) in quartiles.items():
+        iqr = q3 - q1
+        stats[col]["bounds"] = (q1 - IQR_MULTIPLIER * iqr, q3 + IQR_MULTIPLIER * iqr)
+    resolved = {col: future.result() for col, future in modes.items()}
+    if pandas_columns:
+        resolved.update(_pandas_modes(table_name, pandas_columns))
+    for col, mode in resolved.items():
+        stats[col]["fill"] = "Unknown" if mode is None else mode
+    return stats
+
+
+def _keep_condition(col: str, s: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """SQL for "row is inside this column's bounds", matching `cleaning._in_bounds`."""
+    q = quote_identifier(col)
+    lower, upper = s["bounds"]
+    if s["nulls"] and s["fill"] is not None and lower <= s["fill"] <= upper:
+        return f"({q} IS NULL OR {q} BETWEEN ? AND ?)", [lower, upper]
+    return f"({q} BETWEEN ? AND ?)", [lower, upper]
+
+
+def _cleaned_type(p: Dict[str, Any]) -> str:
+    """The column type `to_sql` declares for the cleaned column as pandas would hold it."""
+    if p["kind"] != "numeric":
+        return "TEXT"
+    if p["nulls"]:
+        return "REAL"  # Integer columns with nulls are read, filled and written as floats
+    return p["declared_type"] or "REAL"
+
+
+def clean_table_sql(
+    source_table: str,
+    target_table: str,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    Cleans `source_table` into a new `target_table` without leaving SQLite
+    (except for columns the planner gives to pandas).
+
+    Returns:
+        The cleaning report, with the same fields as `clean_dataframe`'s plus
+        the per-column "plan".
+
+    Raises:
+        ValueError: If the source table does not exist.
+    """
+    report_progress = progress or (lambda fraction, message: None)
+    timings: Dict[str, float] = {}
+    started = step = time.perf_counter()
+
+    def lap(name: str) -> None:
+        nonlocal step
+        now = time.perf_counter()
+        timings[name] = round((now - step) * 1000, 3)
+        step = now
+
+    report_progress(0.05, "Planning")
+    plan = plan_cleaning(source_table)
+    lap("plan")
+    report_progress(0.15, "Computing statistics")
+    stats = compute_sql_stats(source_table, plan)
+    lap("statistics")
+
+    source = quote_identifier(source_table)
+    bounded = [col for col, s in stats.items() if s["bounds"] is not None]
+    conditions = [_keep_condition(col, stats[col]) for col in bounded]
+
+    flagged: Dict[str, int] = {}
+    if bounded:
+        report_progress(0.5, "Counting outliers")
+        select = ", ".join(f"SUM(CASE WHEN {sql} THEN 0 ELSE 1 END)" for sql, _ in conditions)
+        params = [value for _, values in conditions for value in values]
+        with read_connection() as conn:
+            counts = conn.execute(f"SELECT {select} FROM {source}", params).fetchone()
+        flagged = {col: int(count) for col, count in zip(bounded, counts) if count}
+    lap("outlier_mask")
+
+    expressions, params = [], []
+    for col, s in stats.items():
+        q = quote_identifier(col)
+        if s["nulls"] and s["fill"] is not None:
+            expressions.append(f"COALESCE({q}, ?)")
+            params.append(s["fill"])
+        else:
+            expressions.append(q)
+    where = " AND ".join(sql for sql, _ in conditions) or "1"
+    params += [value for _, values in conditions for value in values]
+    column_defs = ", ".join(f"{quote_identifier(col)} {_cleaned_type(p)}" for col, p in plan["columns"].items())
+
+    report_progress(0.6, "Materializing cleaned table")
+    with write_connection() as conn:
+        conn.execute("BEGIN")
+        conn.execute(f"CREATE TABLE {quote_identifier(target_table)} ({column_defs})")
+        cursor = conn.execute(
+            f"INSERT INTO {quote_identifier(target_table)} SELECT {', '.join(expressions)} FROM {source} WHERE {where}",
+            params,
+        )
+        rows_after = cursor.rowcount
+    lap("materialize")
+    timings["total"] = round((time.perf_counter() - started) * 1000, 3)
+
+    logger.info(
+        f"[Cleaning] {source_table} -> {target_table} in SQLite: {plan['rows']} -> {rows_after} rows, "
+        f"{sum(p['engine'] == 'pandas' for p in plan['columns'].values())} pandas-planned columns, {timings['total']:.0f} ms"
+    )
+    return {
+        "rows_before": plan["rows"],
+        "rows_after": rows_after,
+        "missing_values_filled": {
+            col: {"filled_values": s["nulls"]} for col, s in stats.items() if s["nulls"] and s["fill"] is not None
+        },
+        "outliers_removed": flagged,
+        "timings_ms": timings,
+        "plan": {col: {"engine": p["engine"], "reason": p["reason"]} for col, p in plan["columns"].items()},
+    }
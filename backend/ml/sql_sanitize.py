@@ -1,17 +1,271 @@
+"""
+Validation of model-generated SQL before it runs.
+
+SQLite parses the statement itself: `validate_sql` compiles it under
+`EXPLAIN QUERY PLAN` with an authorizer, which sees every table read,
+function call and recursive CTE in the parse tree and denies anything but
+reads of the dataset's tables and safe functions. The same compile yields
+the query plan, from which the cost of nested full scans (cartesian or
+non-equi joins, correlated subqueries over scans) is estimated and refused
+above SQL_MAX_JOIN_SCAN_ROWS. A top-level LIMIT is injected, or clamped to
+SQL_LIMIT_MAX, so SQLite can stop (and sort top-N) early. printf()/format()
+calls must use a literal format without large or `*` widths.
+
+Execution time is bounded separately, by `statement_deadline` in
+backend.database.pool.
+"""
+
 import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.config import SQL_LIMIT_MAX, SQL_MAX_JOIN_SCAN_ROWS, SQL_PRINTF_MAX_WIDTH
+from backend.database.pool import read_connection
+from backend.database.query_builder import quote_identifier
+from backend.database.schema_store import get_schema
+
+# Functions that can allocate unbounded memory or reach outside the database.
+# Everything else is bounded by the read connections' SQLITE_LIMIT_LENGTH
+# (DB_MAX_VALUE_BYTES); printf/format padding is checked in `_check_printf`.
+DENIED_FUNCTIONS = frozenset({"load_extension", "randomblob", "zeroblob", "readfile", "writefile", "edit", "fts3_tokenizer"})
+
+_LIMIT_TAIL_RE = re.compile(r"limit\s+(\d+)\s*(?:(,|offset)\s*(\d+))?\s*$", re.IGNORECASE)
+_SCAN_RE = re.compile(r"^SCAN (\S+)")
+_DERIVED_RE = re.compile(r"^(?:MATERIALIZE|CO-ROUTINE) (\S+)")
+_PRINTF_CALL_RE = re.compile(r"\b(printf|format)\s*\(", re.IGNORECASE)
+_QUOTED_PRINTF_RE = re.compile(r"[\"`\[](printf|format)[\"`\]]\s*\(", re.IGNORECASE)
+_PRINTF_SPEC_RE = re.compile(r"%[-+ 0#,!]*(\*|\d+)?(?:\.(\*|\d+))?")
+
+
+def _strip_fences(sql: str) -> str:
+    sql = re.sub(r"```sql", "", sql.strip(), flags=re.IGNORECASE)
+    return sql.replace("```", "").strip()
+
+
+def _scan(sql: str) -> Tuple[str, str, str]:
+    """
+    One pass over the statement.
+
+    Returns:
+        (code, unquoted, top_level): the statement with comments replaced by
+        spaces; the same text (same length) with string literals and quoted
+        identifiers blanked out; and that text with everything inside
+        parentheses blanked out too, so keywords and semicolons found in it
+        are top-level.
+    """
+    code: List[str] = []
+    unquoted: List[str] = []
+    top: List[str] = []
+    depth = 0
+    i, n = 0, len(sql)
+    while i < n:
+        ch = sql[i]
+        if sql.startswith("--", i):
+            end = sql.find("\n", i)
+            end = n if end == -1 else end
+            code.append(" " * (end - i))
+            unquoted.append(" " * (end - i))
+            top.append(" " * (end - i))
+            i = end
+            continue
+        if sql.startswith("/*", i):
+            end = sql.find("*/", i + 2)
+            end = n if end == -1 else end + 2
+            code.append(" " * (end - i))
+            unquoted.append(" " * (end - i))
+            top.append(" " * (end - i))
+            i = end
+            continue
+        if ch in "'\"`[":
+            close = "]" if ch == "[" else ch
+            end = i + 1
+            while end < n:
+                if sql[end] == close:
+                    # A doubled quote is an escaped quote inside the literal
+                    if close != "]" and end + 1 < n and sql[end + 1] == close:
+                        end += 2
+                        continue
+                    break
+                end += 1
+            end = min(end + 1, n)
+            code.append(sql[i:end])
+            unquoted.append(" " * (end - i))
+            top.append(" " * (end - i))
+            i = end
+            continue
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth = max(depth - 1, 0)
+        code.append(ch)
+        unquoted.append(ch)
+        top.append(ch if depth == 0 and ch != ")" else " ")
+        i += 1
+    return "".join(code), "".join(unquoted), "".join(top)
+
+
+def _apply_limit(code: str, top_level: str, max_rows: int) -> str:
+    """Appends LIMIT max_rows, or clamps an existing top-level LIMIT to it."""
+    positions = [m.start() for m in re.finditer(r"\blimit\b", top_level, re.IGNORECASE)]
+    if not positions:
+        return f"{code} LIMIT {max_rows}"
+    start = positions[-1]
+    match = _LIMIT_TAIL_RE.match(code[start:])
+    if not match:
+        # LIMIT with an expression: cap the result from outside
+        return f"SELECT * FROM ({code}) LIMIT {max_rows}"
+    first, separator, second = match.groups()
+    if separator == ",":
+        offset, count = int(first), int(second)
+    else:
+        count, offset = int(first), int(second) if second else 0
+    limit = f"LIMIT {min(count, max_rows)}" + (f" OFFSET {offset}" if offset else "")
+    return f"{code[:start]}{limit}"
 
-def validate_sql(sql: str) -> str:
-    sql = sql.strip()
 
-    # remove markdown
-    sql = re.sub(r"```sql", "", sql, flags=re.IGNORECASE)
-    sql = sql.replace("```", "")
+def _check_printf(code: str, unquoted: str) -> None:
+    """
+    Rejects printf()/format() calls that can pad a value to an arbitrary size:
+    the format must be a string literal whose widths and precisions are
+    written out and at most SQL_PRINTF_MAX_WIDTH.
+    """
+    quoted = _QUOTED_PRINTF_RE.search(code)
+    if quoted:
+        raise ValueError(f"{quoted.group(1)}() must be called by its plain name")
+    for match in _PRINTF_CALL_RE.finditer(unquoted):
+        literal = re.match(r"\s*'((?:[^']|'')*)'", code[match.end():])
+        if not literal:
+            raise ValueError(f"{match.group(1)}() needs a literal format string")
+        for spec in _PRINTF_SPEC_RE.finditer(literal.group(1).replace("%%", "")):
+            for size in spec.groups():
+                if size == "*" or (size and int(size) > SQL_PRINTF_MAX_WIDTH):
+                    raise ValueError(
+                        f"{match.group(1)}() widths and precisions must be literals up to {SQL_PRINTF_MAX_WIDTH}"
+                    )
 
-    # remove trailing semicolon duplicates
-    sql = sql.strip().rstrip(";")
 
-    # enforce SELECT only
-    if not sql.lower().startswith("select"):
+def _table_rows(conn: sqlite3.Connection, table: str) -> int:
+    entry = get_schema(table)
+    if entry is not None:
+        return int(entry["row_count"])
+    row = conn.execute(f"SELECT MAX(rowid) FROM {quote_identifier(table)}").fetchone()
+    return int(row[0] or 0)
+
+
+def _plan_cost(plan: List[Tuple[int, int, str]], rows: Dict[str, int]) -> int:
+    """
+    Largest product of nested full scans in a query plan: SCAN loops that are
+    siblings in the plan run nested, and a correlated subquery runs once per
+    row of the loops around it. Index searches count as one row. A scan of a
+    table alias is sized as the largest table read; a derived table (CTE or
+    subquery) counts as one row, since its size is unknown until it runs -
+    its own scans are costed separately, and the statement deadline bounds
+    the rest.
+    """
+    children: Dict[int, List[Tuple[int, str]]] = {}
+    derived = set()
+    for node, parent, detail in plan:
+        children.setdefault(parent, []).append((node, detail))
+        match = _DERIVED_RE.match(detail)
+        if match:
+            derived.add(match.group(1))
+    largest = max(rows.values(), default=0)
+
+    def scan_size(detail: str) -> int:
+        match = _SCAN_RE.match(detail)
+        if not match or detail.startswith("SCAN CONSTANT ROW") or match.group(1) in derived:
+            return 1
+        return rows.get(match.group(1), largest)
+
+    def walk(parent: int, outer: int) -> int:
+        worst = 0
+        loops = outer
+        nested_scans = 0
+        for node, detail in children.get(parent, []):
+            if detail.startswith("SCAN "):
+                loops *= max(scan_size(detail), 1)
+                nested_scans += 1
+            if detail.startswith("CORRELATED"):
+                worst = max(worst, walk(node, loops))
+            elif node in children:
+                worst = max(worst, walk(node, 1))
+        if nested_scans > 1 or (outer > 1 and nested_scans):
+            worst = max(worst, loops)
+        return worst
+
+    return walk(0, 1)
+
+
+def validate_sql(sql: str, allowed_tables: Optional[Iterable[str]] = None, max_rows: int = SQL_LIMIT_MAX) -> str:
+    """
+    Checks generated SQL and returns the statement to run.
+
+    Args:
+        sql: The model's output (markdown fences are stripped).
+        allowed_tables: Tables the statement may read; None allows any table.
+        max_rows: LIMIT injected when the statement has none, and the ceiling
+                  an existing LIMIT is clamped to.
+
+    Raises:
+        ValueError: If the statement is not a single read-only SELECT, reads a
+                    table outside `allowed_tables`, uses a denied construct or
+                    function, does not compile, or its nested full scans exceed
+                    SQL_MAX_JOIN_SCAN_ROWS.
+    """
+    code, unquoted, top_level = _scan(_strip_fences(sql))
+    # The three strings are aligned; cut them to the statement without surrounding
+    # whitespace and trailing semicolons
+    start, end = len(code) - len(code.lstrip()), len(code.rstrip())
+    while end > start and top_level[end - 1] == ";":
+        end = len(code[:end - 1].rstrip())
+    code, unquoted, top_level = code[start:end], unquoted[start:end], top_level[start:end]
+    if ";" in top_level:
+        raise ValueError("Only a single SQL statement is allowed")
+    keyword = top_level.split(None, 1)[0].lower() if top_level else ""
+    if keyword not in ("select", "with"):
         raise ValueError("Only SELECT queries allowed")
 
+    _check_printf(code, unquoted)
+
+    sql = _apply_limit(code, top_level, max_rows)
+    allowed = None if allowed_tables is None else {t.lower() for t in allowed_tables}
+    denied: List[str] = []
+    tables = set()
+
+    def authorizer(action, arg1, arg2, db_name, trigger):
+        if action == sqlite3.SQLITE_SELECT:
+            return sqlite3.SQLITE_OK
+        if action == sqlite3.SQLITE_READ:
+            if allowed is not None and (arg1 or "").lower() not in allowed:
+                denied.append(f"Table '{arg1}' is not part of this dataset")
+                return sqlite3.SQLITE_DENY
+            tables.add(arg1)
+            return sqlite3.SQLITE_OK
+        if action == sqlite3.SQLITE_FUNCTION:
+            if (arg2 or "").lower() in DENIED_FUNCTIONS:
+                denied.append(f"Function '{arg2}' is not allowed")
+                return sqlite3.SQLITE_DENY
+            return sqlite3.SQLITE_OK
+        if action == sqlite3.SQLITE_RECURSIVE:
+            denied.append("Recursive CTEs are not allowed")
+        else:
+            denied.append("Only reads are allowed")
+        return sqlite3.SQLITE_DENY
+
+    with read_connection() as conn:
+        conn.set_authorizer(authorizer)
+        try:
+            plan = [(r[0], r[1], r[3]) for r in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+        except sqlite3.DatabaseError as e:
+            raise ValueError(denied[0] if denied else f"Invalid SQL: {e}") from e
+        finally:
+            conn.set_authorizer(None)
+        rows = {table: _table_rows(conn, table) for table in tables}
+
+    cost = _plan_cost(plan, rows)
+    if cost > SQL_MAX_JOIN_SCAN_ROWS:
+        raise ValueError(
+            f"Query joins full table scans (about {cost:,} row combinations, limit {SQL_MAX_JOIN_SCAN_ROWS:,}); "
+            "join on a column with equality or aggregate first"
+        )
     return sql + ";"
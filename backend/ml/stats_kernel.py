@@ -0,0 +1,172 @@
+"""
+Fused statistics kernel for the numeric part of insights.
+
+`numeric_summary`, `extremes` and `corelation_analysis` each re-select the
+numeric columns and re-scan them with separate pandas calls (dropna, mean,
+median, std, two quantiles, nlargest, nsmallest, corr). This kernel extracts
+the numeric columns once into a column-major float64 block and, per column,
+derives every order statistic (min/max, median, quartiles, top/bottom k) from
+one selection pass (`select_ranks`) over all the needed ranks.
+
+Results are bit-for-bit identical to the pandas implementations: sums use the
+same contiguous pairwise summation, quantiles reproduce NumPy's linear
+interpolation, and correlation pairs whose rounded value could depend on the
+last bits of the computation are recomputed with pandas.
+"""
+
+import importlib.util
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from backend.utils.quantiles import lerp, quantile_ranks, select_ranks
+
+TOP_K = 5
+SUMMARY_QUANTILES = (0.25, 0.75)
+CORR_DECIMALS = 3
+CORR_CHUNK_ROWS = 65_536  # Rows centered at a time when accumulating the Gram matrix
+# Correlations within this distance of a rounding boundary (or of zero, where the
+# sign of the rounded value is at stake) are recomputed exactly with pandas
+CORR_EXACT_TOLERANCE = 1e-8
+MAX_EXACT_INT = 2 ** 53  # Larger integers are not exactly representable in the float64 block
+
+# pandas routes std/median through bottleneck when it is installed and enabled,
+# which sums differently; fall back to pandas entirely in that case
+_PANDAS_USES_BOTTLENECK = importlib.util.find_spec("bottleneck") is not None and pd.get_option("compute.use_bottleneck")
+
+
+def _column_stats(x: np.ndarray, int_values: Optional[np.ndarray]) -> Dict[str, Any]:
+    """
+    Summary and extremes of one NaN-free, non-empty float64 column.
+    `int_values` is the original array of an integer column, summed the way
+    pandas sums it (cast to float64 while reducing).
+    """
+    n = len(x)
+    quantile_positions = [quantile_ranks(n, q) for q in SUMMARY_QUANTILES]
+    half = n // 2
+    median_ranks = [half] if n % 2 else [half - 1, half]
+    k = min(TOP_K, n)
+    ranks = {0, n - 1, *median_ranks, *range(k), *range(n - k, n)}
+    for lower, upper, _ in quantile_positions:
+        ranks.update((lower, upper))
+    part = select_ranks(x, ranks)
+
+    total = x.sum() if int_values is None else int_values.sum(dtype=np.float64)
+    mean = total / n
+    if n > 1:
+        std = float(np.sqrt(((mean - x) ** 2).sum() / (n - 1)))
+    else:
+        std = float("nan")
+    median = part[half] if n % 2 else (part[half - 1] + part[half]) / 2
+    quantiles = [lerp(part[lower], part[upper], t) for lower, upper, t in quantile_positions]
+
+    top = np.array([part[r] for r in range(n - 1, n - k - 1, -1)])
+    bottom = np.array([part[r] for r in range(k)])
+    if int_values is not None:
+        top_values, bottom_values = top.astype(np.int64).tolist(), bottom.astype(np.int64).tolist()
+    else:
+        top_values, bottom_values = np.round(top, 3).tolist(), np.round(bottom, 3).tolist()
+
+    return {
+        "summary": {
+            "mean": float(mean),
+            "median": float(median),
+            "std": std,
+            "min": float(part[0]),
+            "max": float(part[n - 1]),
+            "25%": float(quantiles[0]),
+            "75%": float(quantiles[1]),
+        },
+        "extremes": {"top_5": top_values, "bottom_5": bottom_values},
+    }
+
+
+def _correlations(block: np.ndarray, columns: List[str], means: np.ndarray, constant: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """
+    Pearson correlations of a NaN-free block via a chunked, centered Gram
+    matrix, rounded like `DataFrame.corr().round(3).fillna(0)`.
+    """
+    n, k = block.shape
+    gram = np.zeros((k, k))
+    for start in range(0, n, CORR_CHUNK_ROWS):
+        centered = block[start:start + CORR_CHUNK_ROWS] - means
+        gram += centered.T @ centered
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.sqrt(np.diag(gram))
+        corr = gram / np.outer(scale, scale)
+    # pandas yields NaN (filled with 0 below) whenever one side has zero variance
+    corr[constant, :] = np.nan
+    corr[:, constant] = np.nan
+
+    scaled = corr * 10 ** CORR_DECIMALS
+    near_boundary = np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < CORR_EXACT_TOLERANCE * 10 ** CORR_DECIMALS
+    near_zero = np.abs(corr) < CORR_EXACT_TOLERANCE
+    for i, j in zip(*np.nonzero(np.triu(near_boundary | near_zero))):
+        pair = pd.DataFrame({0: block[:, i], 1: block[:, j]})
+        corr[i, j] = corr[j, i] = pair.corr().iloc[0, 1] if i != j else pair[[0]].corr().iloc[0, 0]
+
+    result = pd.DataFrame(corr, index=columns, columns=columns)
+    return result.round(CORR_DECIMALS).fillna(0).to_dict()
+
+
+def numeric_insights(df: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    """
+    Computes numeric_summary, correlations and extremes in one fused pass.
+
+    Returns:
+        Dict with "numeric_summary", "correlations" and "extremes" (same JSON as
+        the per-function pandas implementations), or None when the frame has
+        numeric columns the kernel cannot reproduce exactly (extension dtypes,
+        non-float64 floats, integers beyond 2**53); callers then use the pandas path.
+    """
+    if _PANDAS_USES_BOTTLENECK:
+        return None
+
+    numeric_df = df.select_dtypes(include=[np.number])
+    columns = list(numeric_df.columns)
+    if any(not isinstance(numeric_df[c].dtype, np.dtype) or numeric_df[c].dtype.kind not in "iuf" for c in columns):
+        return None
+
+    block = np.empty((len(numeric_df), len(columns)), dtype=np.float64, order="F")
+    int_values: Dict[int, np.ndarray] = {}
+    for j, col in enumerate(columns):
+        values = numeric_df[col].to_numpy()
+        if values.dtype.kind in "iu":
+            if len(values) and (values.max() >= MAX_EXACT_INT or values.min() <= -MAX_EXACT_INT):
+                return None
+            int_values[j] = values
+        elif values.dtype != np.float64:
+            return None  # pandas accumulates narrower floats differently
+        block[:, j] = values
+
+    summary: Dict[str, Any] = {}
+    extremes: Dict[str, Any] = {}
+    means = np.zeros(len(columns))
+    constant = np.zeros(len(columns), dtype=bool)
+    has_nan = False
+    for j, col in enumerate(columns):
+        x = block[:, j]
+        nan_mask = np.isnan(x)
+        if nan_mask.any():
+            has_nan = True
+            x = x[~nan_mask]
+        if len(x) == 0:
+            constant[j] = True
+            continue
+        stats = _column_stats(x, int_values.get(j))
+        summary[col] = stats["summary"]
+        extremes[col] = stats["extremes"]
+        means[j] = stats["summary"]["mean"]
+        constant[j] = stats["summary"]["min"] == stats["summary"]["max"]
+
+    if len(columns) < 2:
+        correlations: Dict[str, Dict[str, float]] = {}
+    elif has_nan:
+        # Pairwise-complete correlations; pandas' own kernel on the already-extracted block
+        correlations = pd.DataFrame(block, columns=columns).corr().round(CORR_DECIMALS).fillna(0).to_dict()
+    else:
+        correlations = _correlations(block, columns, means, constant)
+
+    return {"numeric_summary": summary, "correlations": correlations, "extremes": extremes}
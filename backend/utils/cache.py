@@ -0,0 +1,120 @@
+"""
+Small thread-safe in-process caches shared by the backend.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache with hit/miss counters.
+
+    Used as the in-process layer in front of SQLite-persisted caches.
+    """
+
+    def __init__(self, maxsize: int, name: str = "cache"):
+        self.maxsize = maxsize
+        self.name = name
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drops every entry for which predicate(key, value) is true. Returns the number dropped."""
+        with self._lock:
+            stale = [k for k, v in self._data.items() if predicate(k, v)]
+            for k in stale:
+                del self._data[k]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        total = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else None,
+        }
+
+
+class SizedLRUCache(LRUCache):
+    """
+    LRU cache bounded by the total size of its values, in bytes, as well as
+    by entry count. Values are (payload, size) pairs; `get` returns the pair.
+    """
+
+    def __init__(self, max_bytes: int, maxsize: int = 1_000_000, name: str = "cache"):
+        super().__init__(maxsize=maxsize, name=name)
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = value[1]
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._data[key] = value
+            self.bytes += size
+            while self.bytes > self.max_bytes or len(self._data) > self.maxsize:
+                _, evicted = self._data.popitem(last=False)
+                self.bytes -= evicted[1]
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        with self._lock:
+            stale = [k for k, v in self._data.items() if predicate(k, v)]
+            for k in stale:
+                self.bytes -= self._data.pop(k)[1]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        stats = super().stats()
+        stats.update({"bytes": self.bytes, "max_bytes": self.max_bytes, "evictions": self.evictions})
+        return stats
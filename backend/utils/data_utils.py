@@ -1,10 +1,21 @@
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import numpy as np
 import pandas as pd
+import io
 import os
 import csv
+import mmap
+import time
 import chardet
+from loguru import logger
 from pandas.errors import ParserError
-from backend.utils.file_utils import sniff_delimiter
+from backend.config import CSV_FALLBACK_BLOCK_BYTES
+
+CSV_SAMPLE_BYTES = 64 * 1024  # Bytes decoded up front for delimiter sniffing and tier selection
+ENCODING_SAMPLE_BYTES = 10000  # Bytes handed to chardet
+MAX_REPORTED_BAD_LINES = 10
 
 
 class CSVValidationError(Exception):
@@ -12,11 +23,74 @@ class CSVValidationError(Exception):
     pass
 
 
-def detect_encoding(path: str) -> str:
-    """Detect file encoding using chardet."""
+@dataclass
+class CSVScanResult:
+    """What a single pre-scan of a CSV learned; handed to the parser so it does not re-read the file."""
+    encoding: str
+    delimiter: str
+    size_bytes: int
+    sample: str                                  # Decoded head of the file (CSV_SAMPLE_BYTES)
+    header: List[str] = field(default_factory=list)
+    data_rows: Optional[int] = None              # None when the structure was not scanned
+    bad_line_count: int = 0
+    bad_lines: List[int] = field(default_factory=list)  # First MAX_REPORTED_BAD_LINES offenders
+    error: Optional[str] = None                  # Encoding/structure failure, if any
+
+    @property
+    def scanned(self) -> bool:
+        return self.data_rows is not None or self.error is not None
+
+    @property
+    def is_valid(self) -> bool:
+        return self.scanned and self.error is None and self.bad_line_count == 0
+
+    @property
+    def validation_message(self) -> Optional[str]:
+        if self.error:
+            return self.error
+        if self.bad_line_count:
+            return (
+                f"CSV has inconsistent column counts. Expected {len(self.header)} columns. "
+                f"Issues at lines: {self.bad_lines}"
+            )
+        return None
+
+
+class _MappedFileReader(io.RawIOBase):
+    """Read-only raw stream over an mmap, so buffered/text readers can share one mapping."""
+
+    def __init__(self, mm: mmap.mmap):
+        self._mm = mm
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = min(len(buffer), len(self._mm) - self._pos)
+        buffer[:n] = self._mm[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+
+def _open_mapped(mm: mmap.mmap) -> io.BufferedReader:
+    """Fresh binary handle positioned at the start of the mapping."""
+    return io.BufferedReader(_MappedFileReader(mm))
+
+
+@contextmanager
+def _mapped_file(path: str):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("CSV file appears to be empty or could not be parsed")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _encoding_from_bytes(raw_data: bytes) -> str:
     try:
-        with open(path, "rb") as f:
-            raw_data = f.read(10000)  # Sample first 10KB
         result = chardet.detect(raw_data)
         encoding = result.get("encoding", "utf-8")
         # Fallback to common encodings if detection is uncertain
@@ -27,43 +101,159 @@ def detect_encoding(path: str) -> str:
         return "utf-8"
 
 
-def validate_csv_structure(path: str, delimiter: str, encoding: str) -> Tuple[bool, Optional[str], List[int]]:
+def _delimiter_from_sample(sample: str) -> str:
+    try:
+        return csv.Sniffer().sniff(sample[:2048]).delimiter
+    except csv.Error:
+        pass
+    # Try common delimiters
+    for delim in [",", ";", "\t", "|"]:
+        if delim in sample[:1024]:
+            return delim
+    return ","  # Default fallback
+
+
+def _scan_mapped(mm: mmap.mmap, validate: bool) -> CSVScanResult:
     """
-    Validate CSV structure before reading.
-    Returns: (is_valid, error_message, problematic_lines)
+    One sequential pass over a mapped CSV: encoding and delimiter from the head,
+    then (if `validate`) row-width checks and row counting over the whole file.
     """
-    problematic_lines = []
+    head = mm[:CSV_SAMPLE_BYTES]
+    encoding = _encoding_from_bytes(head[:ENCODING_SAMPLE_BYTES])
+    sample = head.decode(encoding, errors="replace")
+    result = CSVScanResult(
+        encoding=encoding,
+        delimiter=_delimiter_from_sample(sample),
+        size_bytes=len(mm),
+        sample=sample,
+    )
+    if not validate:
+        return result
+
+    text = io.TextIOWrapper(_open_mapped(mm), encoding=encoding, newline="")
     try:
-        with open(path, "r", encoding=encoding, newline="") as f:
-            reader = csv.reader(f, delimiter=delimiter)
-            header = next(reader, None)
-            if not header:
-                return False, "CSV file is empty", []
-            expected_fields = len(header)
-            
-            for line_num, row in enumerate(reader, start=2):  # Start at 2 (after header)
-                if len(row) != expected_fields:
-                    problematic_lines.append(line_num)
-                    if len(problematic_lines) > 10:  # Limit to first 10 issues
-                        break
+        reader = csv.reader(text, delimiter=result.delimiter)
+        header = next(reader, None)
+        if not header:
+            result.error = "CSV file is empty"
+            return result
+        result.header = header
+        expected_fields = len(header)
+        data_rows = 0
+        for line_num, row in enumerate(reader, start=2):  # Start at 2 (after header)
+            data_rows += 1
+            if len(row) != expected_fields:
+                result.bad_line_count += 1
+                if len(result.bad_lines) < MAX_REPORTED_BAD_LINES:
+                    result.bad_lines.append(line_num)
+        result.data_rows = data_rows
     except UnicodeDecodeError as e:
-        return False, f"Encoding error: {str(e)}. Try a different encoding.", []
+        result.error = f"Encoding error: {str(e)}. Try a different encoding."
     except Exception as e:
-        return False, f"Validation error: {str(e)}", []
-    
-    if problematic_lines:
-        return False, f"CSV has inconsistent column counts. Expected {expected_fields} columns. Issues at lines: {problematic_lines[:10]}", problematic_lines
-    
-    return True, None, []
+        result.error = f"Validation error: {str(e)}"
+    finally:
+        text.close()
+    return result
 
 
-def read_csv_robust(path: str, strict: bool = False) -> pd.DataFrame:
+def scan_csv(path: str, validate: bool = True) -> CSVScanResult:
+    """
+    Fused pre-scan of a CSV file over a single memory mapping.
+
+    Detects encoding and delimiter from the head of the file and, when
+    `validate` is set, checks every row's width and counts data rows in the
+    same pass. This is the only place CSVs are sniffed and validated.
+    """
+    with _mapped_file(path) as mm:
+        return _scan_mapped(mm, validate)
+
+
+def _check_not_empty(df: pd.DataFrame) -> pd.DataFrame:
+    if df.empty:
+        raise ValueError("CSV file appears to be empty or could not be parsed")
+    return df
+
+
+def _read_csv_pyarrow(mm: mmap.mmap, read_kwargs: dict) -> pd.DataFrame:
+    """
+    Multithreaded pyarrow parse. Only used for structurally clean files:
+    pyarrow drops short rows that the other engines pad with NaN.
+    """
+    return pd.read_csv(
+        _open_mapped(mm),
+        sep=read_kwargs["sep"],
+        encoding=read_kwargs["encoding"],
+        quotechar=read_kwargs["quotechar"],
+        engine="pyarrow",
+    )
+
+
+def _read_csv_blockwise(mm: mmap.mmap, read_kwargs: dict, block_bytes: int) -> Tuple[pd.DataFrame, int]:
+    """
+    Parses the file in line-aligned byte blocks with the C engine and re-parses
+    only the blocks the C engine rejects with the python engine.
+
+    Returns:
+        (DataFrame, number of blocks that needed the python engine)
+    """
+    python_blocks = 0
+    frames = []
+    f = _open_mapped(mm)
+    header = f.readline()
+    columns = pd.read_csv(io.BytesIO(header), nrows=0, **read_kwargs, engine="c").columns
+    while True:
+        block = f.read(block_bytes)
+        if not block:
+            break
+        block += f.readline()  # extend to the next line boundary
+        block_kwargs = {**read_kwargs, "header": None, "names": columns}
+        try:
+            part = pd.read_csv(io.BytesIO(block), engine="c", float_precision="round_trip", **block_kwargs)
+        except ParserError:
+            part = pd.read_csv(io.BytesIO(block), engine="python", **block_kwargs)
+            python_blocks += 1
+        frames.append(part)
+    if not frames:
+        return pd.DataFrame(columns=columns), python_blocks
+    return pd.concat(frames, ignore_index=True), python_blocks
+
+
+def _read_csv_python(mm: mmap.mmap, read_kwargs: dict) -> pd.DataFrame:
+    """Last-resort whole-file parse with the forgiving python engine and quote fallbacks."""
+    try:
+        return _check_not_empty(pd.read_csv(_open_mapped(mm), engine="python", **read_kwargs))
+    except ParserError as e:
+        # Try with different quote handling
+        try:
+            return _check_not_empty(pd.read_csv(_open_mapped(mm), engine="python", **{**read_kwargs, "quotechar": "'"}))
+        except Exception:
+            # Final attempt: let pandas auto-detect everything
+            try:
+                df = pd.read_csv(_open_mapped(mm), encoding=read_kwargs["encoding"], engine="python", on_bad_lines="skip")
+                return _check_not_empty(df)
+            except Exception as final_e:
+                raise ParserError(f"Failed to parse CSV after multiple attempts. Original error: {str(e)}. Final error: {str(final_e)}")
+
+
+def read_csv_robust(path: str, strict: bool = False, scan: Optional[CSVScanResult] = None) -> pd.DataFrame:
     """
     Robust CSV reader that handles encoding, delimiter detection, and validation.
+
+    The file is memory-mapped once. A fused pre-scan (see scan_csv) supplies
+    encoding, delimiter, row count and row-width problems, and the parser then
+    reads from the same mapping, so the file is only read from disk once.
+
+    Parsing goes through a ladder of engines, fastest first:
+        1. pyarrow  - multithreaded, only when the scan found no width problems
+        2. c        - pandas C engine over the whole file
+        3. c+python - C engine per byte block, python engine for failing blocks only
+        4. python   - whole-file python engine with quote fallbacks
+    The tier that produced the frame is logged and stored in df.attrs["csv_reader_tier"].
     
     Args:
         path: Path to CSV file
         strict: If True, fail on validation errors. If False, skip bad lines.
+        scan: Result of an earlier scan_csv(path) call, if the caller already has one.
     
     Returns:
         DataFrame
@@ -72,67 +262,119 @@ def read_csv_robust(path: str, strict: bool = False) -> pd.DataFrame:
         CSVValidationError: If validation fails and strict=True
         ParserError: If pandas cannot parse the file
     """
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"File not found: {path}")
-    
-    # Step 1: Detect encoding
-    encoding = detect_encoding(path)
-    
-    # Step 2: Detect delimiter
-    delimiter = sniff_delimiter(path)
-    if not delimiter:
-        # Try common delimiters
-        for delim in [",", ";", "\t", "|"]:
-            try:
-                with open(path, "r", encoding=encoding, newline="") as f:
-                    sample = f.read(1024)
-                    if delim in sample:
-                        delimiter = delim
-                        break
-            except Exception:
-                continue
-        if not delimiter:
-            delimiter = ","  # Default fallback
-    
-    # Step 3: Validate structure
-    is_valid, error_msg, bad_lines = validate_csv_structure(path, delimiter, encoding)
-    
-    if not is_valid and strict:
-        raise CSVValidationError(error_msg)
-    
-    # Step 4: Read with appropriate settings
-    read_kwargs = {
-        "sep": delimiter,
-        "encoding": encoding,
-        "engine": "python",  # More forgiving than C engine
-        "on_bad_lines": "skip" if not strict else "error",
-        "quotechar": '"',
-        "skipinitialspace": True,
-    }
-    
-    # Try reading with detected settings
+    with _mapped_file(path) as mm:
+        start = time.perf_counter()
+
+        # Step 1: Encoding, delimiter and structure in one pass
+        if scan is None or not scan.scanned:
+            scan = _scan_mapped(mm, validate=True)
+        scan_ms = int((time.perf_counter() - start) * 1000)
+
+        if strict and not scan.is_valid:
+            raise CSVValidationError(scan.validation_message)
+        if scan.bad_line_count:
+            logger.warning(f"[CSVReader] {os.path.basename(path)}: {scan.bad_line_count} row(s) with unexpected width, first at lines {scan.bad_lines}")
+
+        # Step 2: Read with appropriate settings
+        read_kwargs = {
+            "sep": scan.delimiter,
+            "encoding": scan.encoding,
+            "on_bad_lines": "skip" if not strict else "error",
+            "quotechar": '"',
+            "skipinitialspace": True,
+        }
+        df, tier = _read_csv_tiered(mm, scan, read_kwargs)
+        elapsed_ms = int((time.perf_counter() - start) * 1000)
+
+    df.attrs["csv_reader_tier"] = tier
+    logger.info(
+        f"[CSVReader] Parsed {os.path.basename(path)} with '{tier}' tier: {len(df)} rows "
+        f"(scan: {scan.data_rows} rows in {scan_ms} ms, total {elapsed_ms} ms)"
+    )
+    return df
+
+
+def _read_csv_tiered(mm: mmap.mmap, scan: CSVScanResult, read_kwargs: dict) -> Tuple[pd.DataFrame, str]:
+    """Walks the engine ladder described in read_csv_robust. Returns (df, tier)."""
+    encoding = read_kwargs["encoding"]
+
+    # pyarrow has no skipinitialspace and drops short rows; only use it when neither matters
+    if scan.is_valid and f"{read_kwargs['sep']} " not in scan.sample:
+        try:
+            return _check_not_empty(_read_csv_pyarrow(mm, read_kwargs)), "pyarrow"
+        except ImportError:
+            pass
+        except (ParserError, ValueError, UnicodeDecodeError) as e:
+            logger.debug(f"[CSVReader] pyarrow tier failed: {e}")
+
     try:
-        df = pd.read_csv(path, **read_kwargs)
-        if df.empty:
-            raise ValueError("CSV file appears to be empty or could not be parsed")
-        return df
+        df = pd.read_csv(_open_mapped(mm), engine="c", float_precision="round_trip", **read_kwargs)
+        return _check_not_empty(df), "c"
     except ParserError as e:
-        # Try with different quote handling
+        logger.debug(f"[CSVReader] C tier failed: {e}")
+
+    # Splitting on b"\n" is only safe for ASCII-compatible encodings
+    if not any(wide in encoding.replace("-", "") for wide in ("utf16", "utf32")):
         try:
-            read_kwargs["quotechar"] = "'"
-            df = pd.read_csv(path, **read_kwargs)
-            if df.empty:
-                raise ValueError("CSV file appears to be empty or could not be parsed")
-            return df
-        except Exception:
-            # Final attempt: let pandas auto-detect everything
-            try:
-                df = pd.read_csv(path, encoding=encoding, engine="python", on_bad_lines="skip")
-                if df.empty:
-                    raise ValueError("CSV file appears to be empty or could not be parsed")
-                return df
-            except Exception as final_e:
-                raise ParserError(f"Failed to parse CSV after multiple attempts. Original error: {str(e)}. Final error: {str(final_e)}")
+            df, python_blocks = _read_csv_blockwise(mm, read_kwargs, CSV_FALLBACK_BLOCK_BYTES)
+            logger.info(f"[CSVReader] {python_blocks} block(s) needed the python engine")
+            return _check_not_empty(df), "c+python"
+        except ParserError as e:
+            logger.debug(f"[CSVReader] Blockwise tier failed: {e}")
+
+    return _read_csv_python(mm, read_kwargs), "python"
+
+
+def iter_csv_chunks(path: str, chunksize: int, strict: bool = False, engine: str = "c") -> Iterator[pd.DataFrame]:
+    """
+    Streams a CSV file as DataFrames of at most `chunksize` rows.
+
+    Uses the same encoding/delimiter detection and parser settings as
+    read_csv_robust, but never holds more than one chunk in memory.
+    The full-file structure scan only runs in strict mode; otherwise only
+    the head of the file is sampled.
+
+    Args:
+        path: Path to CSV file
+        chunksize: Maximum number of rows per yielded DataFrame
+        strict: If True, fail on validation errors. If False, skip bad lines.
+        engine: pandas parser engine ("c" or the slower, more forgiving "python")
+
+    Yields:
+        DataFrame chunks, in file order
+
+    Raises:
+        CSVValidationError: If validation fails and strict=True
+        ValueError: If the file contains no data rows
+    """
+    # Only strict mode pays for the full structure pass
+    scan = scan_csv(path, validate=strict)
+    if strict and not scan.is_valid:
+        raise CSVValidationError(scan.validation_message)
+
+    engine_kwargs = {"float_precision": "round_trip"} if engine == "c" else {}
+    reader = pd.read_csv(
+        path,
+        sep=scan.delimiter,
+        encoding=scan.encoding,
+        engine=engine,
+        **engine_kwargs,
+        on_bad_lines="skip" if not strict else "error",
+        quotechar='"',
+        skipinitialspace=True,
+        chunksize=chunksize,
+    )
+
+    total_rows = 0
+    with reader:
+        for chunk in reader:
+            if chunk.empty:
+                continue
+            total_rows += len(chunk)
+            yield chunk
+
+    if total_rows == 0:
+        raise ValueError("CSV file appears to be empty or could not be parsed")
 
 
 def read_dataframe_auto(path: str, strict: bool = False) -> pd.DataFrame:
@@ -153,20 +395,8 @@ def read_dataframe_auto(path: str, strict: bool = False) -> pd.DataFrame:
     raise ValueError(f"Unsupported file type: {path}")
 
 
-def try_parse_numeric(series: pd.Series) -> pd.Series:
-    try:
-        return pd.to_numeric(series, errors="ignore")
-    except Exception:
-        return series
-
-
-def try_parse_date(series: pd.Series) -> pd.Series:
-    """Try to parse a series as dates."""
-    try:
-        return pd.to_datetime(series, errors="ignore", infer_datetime_format=True)
-    except Exception:
-        return series
-
-
-
-
+def json_default(value):
+    """`json.dumps` fallback for NumPy scalars and other non-JSON values (stringified)."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
@@ -0,0 +1,161 @@
+"""
+Bounded executors for blocking work called from async handlers.
+
+Two shared pools keep blocking calls off the event loop: `cpu` for pandas
+work (ingestion, cleaning, insights, profiling, reports) sized to the cores,
+and `io` for calls that mostly wait (SQLite lookups, file writes, LLM
+requests). Each pool admits at most `max_workers + max_queue` calls; beyond
+that `PoolSaturated` (a 503 with a Retry-After estimated from the pool's
+recent run times) is raised instead of letting requests pile up without bound.
+Handlers that convert every exception into a 500 must re-raise it.
+"""
+
+import asyncio
+import contextvars
+import functools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from fastapi import HTTPException
+
+from backend.config import CPU_POOL_QUEUE, CPU_POOL_WORKERS, IO_POOL_QUEUE, IO_POOL_WORKERS
+
+T = TypeVar("T")
+
+MAX_RETRY_AFTER_S = 60
+
+
+class PoolSaturated(HTTPException):
+    """Raised when a pool's workers and queue are all taken; served as 503 with Retry-After."""
+
+    def __init__(self, pool: str, retry_after: int):
+        super().__init__(
+            status_code=503,
+            detail=f"The {pool} worker pool is saturated; retry in {retry_after}s",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class BoundedExecutor:
+    """Thread pool with an admission limit and per-pool counters."""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._metrics = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "wait_ms_total": 0.0,
+            "wait_ms_max": 0.0,
+            "run_ms_total": 0.0,
+            "run_ms_max": 0.0,
+        }
+
+    def _retry_after(self) -> int:
+        finished = self._metrics["completed"] + self._metrics["failed"]
+        avg_run_s = self._metrics["run_ms_total"] / finished / 1000 if finished else 1.0
+        # Time for the work already admitted to drain through the workers
+        return max(1, min(MAX_RETRY_AFTER_S, math.ceil(avg_run_s * self._pending / self.max_workers)))
+
+    def _call(self, submitted_at: float, fn: Callable[..., T]) -> T:
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            wait_ms = (started - submitted_at) * 1000
+            self._metrics["wait_ms_total"] += wait_ms
+            self._metrics["wait_ms_max"] = max(self._metrics["wait_ms_max"], wait_ms)
+        failed = False
+        try:
+            return fn()
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            run_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._running -= 1
+                self._metrics["failed" if failed else "completed"] += 1
+                self._metrics["run_ms_total"] += run_ms
+                self._metrics["run_ms_max"] = max(self._metrics["run_ms_max"], run_ms)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Runs fn(*args, **kwargs) on the pool and awaits its result.
+
+        Raises:
+            PoolSaturated: If the pool is at its admission limit.
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._metrics["rejected"] += 1
+                raise PoolSaturated(self.name, self._retry_after())
+            self._pending += 1
+            self._metrics["submitted"] += 1
+        # The caller's context variables (e.g. its query cancellation scope) carry over to the thread
+        context = contextvars.copy_context()
+        try:
+            future = self._pool.submit(self._call, time.perf_counter(), functools.partial(context.run, fn, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        # Released when the call itself finishes, even if the awaiting request is cancelled
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self._metrics)
+            running, pending = self._running, self._pending
+        started = metrics["completed"] + metrics["failed"] + running
+        finished = metrics["completed"] + metrics["failed"]
+        metrics["wait_ms_avg"] = round(metrics["wait_ms_total"] / started, 3) if started else 0.0
+        metrics["run_ms_avg"] = round(metrics["run_ms_total"] / finished, 3) if finished else 0.0
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": running,
+            "queued": pending - running,
+            **metrics,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+cpu_pool = BoundedExecutor("cpu", CPU_POOL_WORKERS, CPU_POOL_QUEUE)
+io_pool = BoundedExecutor("io", IO_POOL_WORKERS, IO_POOL_QUEUE)
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Runs CPU-heavy blocking work (pandas/NumPy) on the bounded cpu pool."""
+    return await cpu_pool.run(fn, *args, **kwargs)
+
+
+async def run_io(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Runs blocking I/O (SQLite, files, network) on the bounded io pool."""
+    return await io_pool.run(fn, *args, **kwargs)
+
+
+def executor_metrics() -> Dict[str, Any]:
+    return {"cpu": cpu_pool.metrics(), "io": io_pool.metrics()}
+
+
+def shutdown_executors() -> None:
+    cpu_pool.shutdown()
+    io_pool.shutdown()
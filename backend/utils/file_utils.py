@@ -6,6 +6,7 @@ import csv
 from typing import Optional, List
 from fastapi import UploadFile,HTTPException
 from backend.config import DATA_DIR
+from backend.utils.executors import run_io
 
 DATASET_DIR = os.path.join(DATA_DIR, "datasets")
 METADATA_DIR = os.path.join(DATA_DIR, "metadata")
@@ -20,6 +21,10 @@ def get_extension(filename: str) -> str:
         return ".xlsx"
     raise HTTPException(status_code=400, detail="Unsupported file extension")
 
+def _write_file(path: str, content: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(content)
+
 async def save_dataset(file: UploadFile) -> dict:
     ext = get_extension(file.filename)
     dataset_id = str(uuid.uuid4())
@@ -27,9 +32,8 @@ async def save_dataset(file: UploadFile) -> dict:
     # suffix = pathlib.Path(file.filename).suffix
     # fd, tmp_path = tempfile.mkstemp(prefix="upload_", suffix=suffix, dir=DATA_DIR)
     # os.close(fd)
-    with open(save_path, "wb") as f:
-        content = await file.read()
-        f.write(content)
+    content = await file.read()
+    await run_io(_write_file, save_path, content)
     return {
         "dataset_id": dataset_id,
         "file_path": save_path,
@@ -0,0 +1,64 @@
+"""
+Exact order statistics shared by the insights kernel and the cleaning engines:
+NumPy's 'linear' quantile split into the ranks it reads and the interpolation
+between them, and a selection of several ranks in one pass.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+def lerp(a: float, b: float, t: float) -> float:
+    """NumPy's linear interpolation, including its t >= 0.5 branch."""
+    diff = b - a
+    if t >= 0.5:
+        return b - diff * (1 - t)
+    return a + diff * t
+
+
+def quantile_ranks(n: int, q: float) -> Tuple[int, int, float]:
+    """(lower rank, upper rank, weight) of NumPy's 'linear' quantile on n sorted values."""
+    virtual = (n - 1) * q
+    lower = int(np.floor(virtual))
+    if virtual >= n - 1:
+        return n - 1, n - 1, 0.0
+    return lower, lower + 1, virtual - lower
+
+
+def select_ranks(x: np.ndarray, ranks: Iterable[int]) -> Dict[int, float]:
+    """
+    Values at the given ranks of `x` (as if sorted), in expected O(n).
+
+    NumPy's `partition` with several kth values falls back to a scalar
+    introselect that is ~4x slower than a single-kth partition, so the ranks are
+    split recursively around a middle rank with single-kth in-place partitions
+    on one working copy. A run of ranks at either end of a segment (min/max,
+    top/bottom k) is resolved with one partition plus a sort of the k values.
+    """
+    work = x.copy()
+    values: Dict[int, float] = {}
+
+    def visit(lo: int, hi: int, wanted: List[int]) -> None:
+        if not wanted:
+            return
+        m = len(wanted)
+        seg = work[lo:hi]
+        if wanted[0] == lo and wanted[-1] == lo + m - 1:
+            if m < len(seg):
+                seg.partition(m - 1)
+            values.update(zip(wanted, np.sort(seg[:m])))
+            return
+        if wanted[-1] == hi - 1 and wanted[0] == hi - m:
+            if m < len(seg):
+                seg.partition(len(seg) - m)
+            values.update(zip(wanted, np.sort(seg[len(seg) - m:])))
+            return
+        mid = wanted[m // 2]
+        seg.partition(mid - lo)
+        values[mid] = work[mid]
+        visit(lo, mid, wanted[:m // 2])
+        visit(mid + 1, hi, wanted[m // 2 + 1:])
+
+    visit(0, len(work), sorted(set(ranks)))
+    return values
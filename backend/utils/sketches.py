@@ -0,0 +1,338 @@
+"""
+Mergeable streaming sketches for column statistics computed chunk by chunk.
+"""
+
+import warnings
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+DISTINCT_SKETCH_K = 1024  # Hashes kept by the distinct-count sketch (~3% relative error)
+QUANTILE_SKETCH_K = 400  # Top-level capacity of the KLL quantile sketch (~1% rank error at 10M values)
+TOP_K = 5
+FREQUENT_ITEMS_K = 1024  # Counters kept by the frequent-items (mode) summary
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """
+    64-bit hashes of the non-null values of a series. Numeric columns are
+    hashed as float64 and datetimes at nanosecond resolution, so chunks that
+    were parsed to different dtypes (int vs float because of nulls, or
+    datetime64[s] vs [ns] depending on the CSV reader) hash equal values
+    identically.
+    """
+    values = series.dropna()
+    if values.dtype.kind in ("i", "u", "f", "b"):
+        values = values.astype("float64")
+    elif values.dtype.kind == "M":
+        values = values.dt.as_unit("ns")
+    return pd.util.hash_pandas_object(values, index=False).to_numpy()
+
+
+class DistinctSketch:
+    """
+    K-minimum-values distinct count estimator.
+
+    Keeps the `k` smallest distinct hashes seen; exact while fewer than `k`
+    distinct values have been seen. Sketches of different chunks merge by
+    union, so chunked and in-memory computations agree.
+    """
+
+    def __init__(self, k: int = DISTINCT_SKETCH_K):
+        self.k = k
+        self._mins = np.empty(0, dtype=np.uint64)
+
+    def update(self, series: pd.Series) -> None:
+        self._add(pd.unique(hash_values(series)))
+
+    def merge(self, other: "DistinctSketch") -> None:
+        self._add(other._mins)
+
+    def _add(self, hashes: np.ndarray) -> None:
+        if len(hashes) > self.k:
+            hashes = np.partition(hashes, self.k - 1)[:self.k]
+        merged = np.union1d(self._mins, hashes)
+        self._mins = merged[:self.k]
+
+    def estimate(self) -> int:
+        if len(self._mins) < self.k:
+            return int(len(self._mins))
+        kth = float(self._mins[-1]) / 2.0 ** 64
+        return int(round((self.k - 1) / kth))
+
+
+def distinct_relative_error(sketch: DistinctSketch, z: float = 2.576) -> float:
+    """Relative error of a KMV estimate at the confidence of the z-score (99% by default); 0 while exact."""
+    if len(sketch._mins) < sketch.k:
+        return 0.0
+    return float(z / np.sqrt(sketch.k - 2))
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch over float values.
+
+    Levels of sorted compactors: level h holds items of weight 2**h and, when
+    over capacity, is compacted by keeping every other item (random offset)
+    at level h + 1. Memory stays around 3 * k items whatever the stream length.
+    A compaction at level h moves the rank of any value by at most 2**h with a
+    zero-mean error, so the total rank error is bounded with Hoeffding's
+    inequality from the sum of the squared weights compacted so far. Until the
+    first compaction every value is kept and quantiles are exact.
+    """
+
+    def __init__(self, k: int = QUANTILE_SKETCH_K, seed: Optional[int] = None):
+        self.k = k
+        self.n = 0
+        self._levels: List[np.ndarray] = [np.empty(0)]
+        self._squared_error = 0.0
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self._levels[0] = np.concatenate([self._levels[0], values])
+        self._compress()
+
+    def add(self, value: float, count: int) -> None:
+        """Adds `count` copies of one value exactly: one item per set bit of `count`, at that bit's level."""
+        if count <= 0 or np.isnan(value):
+            return
+        self.n += count
+        h = 0
+        while count:
+            if count & 1:
+                while len(self._levels) <= h:
+                    self._levels.append(np.empty(0))
+                self._levels[h] = np.append(self._levels[h], value)
+            count >>= 1
+            h += 1
+        self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        while len(self._levels) < len(other._levels):
+            self._levels.append(np.empty(0))
+        for h, items in enumerate(other._levels):
+            self._levels[h] = np.concatenate([self._levels[h], items])
+        self.n += other.n
+        self._squared_error += other._squared_error
+        self._compress()
+
+    def _compress(self) -> None:
+        h = 0
+        while h < len(self._levels):
+            items = self._levels[h]
+            if len(items) <= self._capacity(h):
+                h += 1
+                continue
+            if h + 1 == len(self._levels):
+                self._levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays at this level; the rest is halved
+            keep = items[-1:] if len(items) % 2 else items[:0]
+            paired = items[:len(items) - len(keep)]
+            offset = int(self._rng.integers(2))
+            self._levels[h] = keep
+            self._levels[h + 1] = np.concatenate([self._levels[h + 1], paired[offset::2]])
+            self._squared_error += float(2 ** h) ** 2
+            h = 0  # Capacities shrink when a level is added
+
+    @property
+    def exact(self) -> bool:
+        return self._squared_error == 0
+
+    def rank_error(self, confidence: float = 0.99) -> float:
+        """Normalized rank error that holds for any single query with the given confidence."""
+        if self.exact or self.n == 0:
+            return 0.0
+        return float(np.sqrt(2 * np.log(2 / (1 - confidence)) * self._squared_error) / self.n)
+
+    def quantile(self, q: float) -> float:
+        if self.n == 0:
+            return float("nan")
+        if self.exact and not any(len(items) for items in self._levels[1:]):
+            return float(np.quantile(self._levels[0], q))
+        values = np.concatenate(self._levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** h) for h, items in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        cumulative = np.cumsum(weights[order])
+        idx = int(np.searchsorted(cumulative, q * (cumulative[-1] - 1), side="right"))
+        return float(values[order][min(idx, len(order) - 1)])
+
+    def bounds(self, q: float, confidence: float = 0.99) -> Tuple[float, float]:
+        """Value interval containing the true q-quantile with the given confidence."""
+        eps = self.rank_error(confidence)
+        if eps == 0:
+            value = self.quantile(q)
+            return value, value
+        return self.quantile(max(0.0, q - eps)), self.quantile(min(1.0, q + eps))
+
+
+class FrequentItems:
+    """
+    Mergeable Misra-Gries summary of the most frequent values of a stream.
+
+    Exact while at most `k` distinct values have been seen. Past that, each
+    prune subtracts the (k+1)-th largest count from every counter, so a
+    reported count undercounts its value by at most `max_error`, and any
+    value seen more than n / (k + 1) times is guaranteed to be kept.
+    """
+
+    def __init__(self, k: int = FREQUENT_ITEMS_K):
+        self.k = k
+        self.n = 0
+        self.max_error = 0
+        self._counts = pd.Series(dtype="int64")
+
+    def update(self, series: pd.Series) -> None:
+        counts = series.value_counts(dropna=True)
+        if counts.empty:
+            return
+        self.n += int(counts.sum())
+        self._counts = counts if self._counts.empty else self._counts.add(counts, fill_value=0).astype("int64")
+        self._prune()
+
+    def merge(self, other: "FrequentItems") -> None:
+        self.n += other.n
+        self.max_error += other.max_error
+        self._counts = self._counts.add(other._counts, fill_value=0).astype("int64")
+        self._prune()
+
+    def _prune(self) -> None:
+        if len(self._counts) <= self.k:
+            return
+        threshold = int(self._counts.nlargest(self.k + 1).iloc[-1])
+        self.max_error += threshold
+        self._counts = self._counts[self._counts > threshold] - threshold
+
+    @property
+    def exact(self) -> bool:
+        return self.max_error == 0
+
+    def most_frequent(self) -> Optional[Any]:
+        """The value with the highest count (the smallest one on ties, like `Series.mode`), or None."""
+        if self._counts.empty:
+            return None
+        top = self._counts[self._counts == self._counts.max()]
+        try:
+            return top.index.sort_values()[0]
+        except TypeError:
+            return top.index[0]
+
+
+class Moments:
+    """Count, mean, M2 (Welford/Chan), min and max of a float stream."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        mean = values.mean()
+        self._combine(len(values), mean, float(((values - mean) ** 2).sum()))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def merge(self, other: "Moments") -> None:
+        if other.n:
+            self._combine(other.n, other.mean, other.m2)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+    def _combine(self, n: int, mean: float, m2: float) -> None:
+        total = self.n + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.n * n / total
+        self.n = total
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else float("nan")
+
+
+class TopK:
+    """The k largest and k smallest values of a stream, exactly, in O(k) memory."""
+
+    def __init__(self, k: int = TOP_K):
+        self.k = k
+        self._largest = np.empty(0)
+        self._smallest = np.empty(0)
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values)
+        values = values[~np.isnan(values)] if values.dtype.kind == "f" else values
+        if len(values) == 0:
+            return
+        self._largest = self._keep(np.concatenate([self._largest, values]), largest=True)
+        self._smallest = self._keep(np.concatenate([self._smallest, values]), largest=False)
+
+    def _keep(self, values: np.ndarray, largest: bool) -> np.ndarray:
+        if len(values) <= self.k:
+            return values
+        if largest:
+            return np.partition(values, len(values) - self.k)[-self.k:]
+        return np.partition(values, self.k - 1)[:self.k]
+
+    def largest(self) -> np.ndarray:
+        return np.sort(self._largest)[::-1]
+
+    def smallest(self) -> np.ndarray:
+        return np.sort(self._smallest)
+
+
+class CoMoments:
+    """
+    Pairwise-complete co-moments of a stream of float row blocks, for Pearson
+    correlations matching `DataFrame.corr()` (rows where either side is NaN
+    are skipped per pair). Values are shifted by a per-column reference taken
+    from the first block so that the accumulated raw sums stay well conditioned.
+    """
+
+    def __init__(self, n_columns: int):
+        self._shift: Optional[np.ndarray] = None
+        shape = (n_columns, n_columns)
+        self._count = np.zeros(shape)
+        self._sum = np.zeros(shape)      # [i, j]: sum of column i over rows where i and j are present
+        self._sum_sq = np.zeros(shape)
+        self._cross = np.zeros(shape)
+
+    def update(self, block: np.ndarray) -> None:
+        block = np.asarray(block, dtype=np.float64)
+        if self._shift is None:
+            with np.errstate(invalid="ignore"), warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                self._shift = np.nan_to_num(np.nanmean(block, axis=0))
+        shifted = block - self._shift
+        present = ~np.isnan(shifted)
+        values = np.where(present, shifted, 0.0)
+        present = present.astype(np.float64)
+        self._count += present.T @ present
+        self._sum += values.T @ present
+        self._sum_sq += (values * values).T @ present
+        self._cross += values.T @ values
+
+    def correlation(self) -> np.ndarray:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = self._count
+            cov = self._cross - self._sum * self._sum.T / n
+            var_x = self._sum_sq - self._sum ** 2 / n
+            var_y = var_x.T
+            corr = cov / np.sqrt(var_x * var_y)
+        corr[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
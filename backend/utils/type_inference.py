@@ -0,0 +1,167 @@
+"""
+Sampling-based column type inference for ingested DataFrames.
+
+Each object column is classified as int / float / bool / date / category / text
+from a stratified sample using vectorized regex checks. The full column is only
+cast when the sample is conclusive (every sampled value fits one type); mixed
+samples are left as text without touching the rest of the column. Casts are
+strict, so a conclusive sample that is contradicted further down the column
+falls back to text instead of silently producing NULLs.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from backend.config import TYPE_INFERENCE_SAMPLE_ROWS
+
+LOGICAL_TYPES = ("int", "float", "bool", "date", "category", "text")
+
+_INT_RE = r"[+-]?\d+"
+_FLOAT_RE = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|[+-]?(?:nan|inf|infinity)"
+_BOOL_VALUES = {"true": True, "false": False}
+_ISO_DATE_RE = r"\d{4}-\d{1,2}-\d{1,2}(?:[ T]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?(?:Z|[+-]\d{2}:?\d{2})?"
+_OTHER_DATE_RE = (
+    r"\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4}(?: \d{1,2}:\d{2}(?::\d{2})?)?"
+    r"|\d{4}/\d{1,2}/\d{1,2}(?: \d{1,2}:\d{2}(?::\d{2})?)?"
+    r"|[A-Za-z]{3,9}\.? \d{1,2},? \d{4}"
+    r"|\d{1,2} [A-Za-z]{3,9},? \d{4}"
+)
+
+# A text column is reported as categorical when the sample repeats values often enough
+CATEGORY_MAX_DISTINCT = 50
+CATEGORY_MAX_DISTINCT_RATIO = 0.5
+
+
+def stratified_sample(series: pd.Series, n: int = TYPE_INFERENCE_SAMPLE_ROWS) -> pd.Series:
+    """
+    Picks up to `n` non-null values spread evenly over the column, so values
+    from the head, middle and tail of the file are all represented.
+    """
+    values = series.dropna()
+    if len(values) <= n:
+        return values
+    positions = np.linspace(0, len(values) - 1, num=n).astype(np.int64)
+    return values.iloc[positions]
+
+
+def classify_sample(sample: pd.Series) -> Tuple[str, bool]:
+    """
+    Classifies a sample of non-null values.
+
+    Returns:
+        (logical_type, conclusive). `conclusive` is False when the sample does
+        not fit a single parseable type, in which case the type is "text".
+    """
+    if sample.empty:
+        return "text", False
+
+    text = sample.astype(str).str.strip()
+
+    if text.str.fullmatch(_INT_RE).all():
+        return "int", True
+    if text.str.fullmatch(_FLOAT_RE, case=False).all():
+        return "float", True
+    if text.str.lower().isin(_BOOL_VALUES.keys()).all():
+        return "bool", True
+    if text.str.fullmatch(_ISO_DATE_RE).all() or text.str.fullmatch(_OTHER_DATE_RE).all():
+        return "date", True
+
+    distinct = text.nunique()
+    if distinct <= CATEGORY_MAX_DISTINCT and distinct <= CATEGORY_MAX_DISTINCT_RATIO * len(text):
+        return "category", True
+    return "text", False
+
+
+def cast_column(series: pd.Series, logical_type: str) -> Optional[pd.Series]:
+    """
+    Strictly casts a full column to `logical_type`.
+
+    Returns:
+        The cast series, or None if any non-null value does not fit.
+    """
+    try:
+        if logical_type in ("int", "float"):
+            return pd.to_numeric(series)
+        if logical_type == "bool":
+            mapped = series.astype(str).str.strip().str.lower().map(_BOOL_VALUES)
+            if mapped.isna().sum() != series.isna().sum():
+                return None
+            return mapped.astype("boolean") if series.isna().any() else mapped.astype(bool)
+        if logical_type == "date":
+            iso = series.dropna().astype(str).str.fullmatch(_ISO_DATE_RE).all()
+            return pd.to_datetime(series, format="ISO8601" if iso else "mixed")
+        if logical_type == "category":
+            return series.astype("category")
+        return series
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def infer_column(series: pd.Series, sample_rows: int = TYPE_INFERENCE_SAMPLE_ROWS) -> Tuple[pd.Series, str]:
+    """
+    Classifies one column from a sample and casts it when the sample is conclusive.
+
+    Non-object columns are already typed by the parser and are only labelled.
+
+    Returns:
+        (possibly cast series, logical_type)
+    """
+    if series.dtype != "object":
+        return series, logical_type_of(series)
+
+    logical_type, conclusive = classify_sample(stratified_sample(series, sample_rows))
+    if not conclusive:
+        return series, "text"
+
+    cast = cast_column(series, logical_type)
+    if cast is None:
+        return series, "text"
+    if logical_type in ("int", "float"):
+        # An int-looking sample can still hide decimals further down
+        return cast, logical_type_of(cast)
+    return cast, logical_type
+
+
+def logical_type_of(series: pd.Series) -> str:
+    """Maps an already-typed pandas column to its logical type."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return "category"
+    if pd.api.types.is_bool_dtype(dtype):
+        return "bool"
+    if pd.api.types.is_integer_dtype(dtype):
+        return "int"
+    if pd.api.types.is_float_dtype(dtype):
+        return "float"
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return "date"
+    return "text"
+
+
+def infer_and_cast(df: pd.DataFrame, sample_rows: int = TYPE_INFERENCE_SAMPLE_ROWS) -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """
+    Infers and applies column types for a whole DataFrame.
+
+    Columns are processed one after another: the `.str` regex checks on object
+    columns are Python-level loops, and the numeric and date casts of object
+    arrays hold the GIL as well, so a thread pool would not run them in parallel.
+
+    Returns:
+        (DataFrame with cast columns, {column: logical_type})
+    """
+    columns = list(df.columns)
+    object_columns = [c for c in columns if df[c].dtype == "object"]
+
+    results = {c: infer_column(df[c], sample_rows) for c in object_columns}
+
+    logical_types: Dict[str, str] = {}
+    for col in columns:
+        if col in results:
+            series, logical_types[col] = results[col]
+            if series.dtype != df[col].dtype:
+                df[col] = series
+        else:
+            logical_types[col] = logical_type_of(df[col])
+    return df, logical_types
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: SQL-pushdown cleaning vs the in-memory pandas engine.
+
+Loads a synthetic table (default 1,000,000 rows: float columns with missing
+values and outliers, an integer column and a text column with missing values)
+into a scratch SQLite database, cleans it with each engine through
+`clean_dataset`, checks that both produce the same rows and prints the timings
+and each engine's per-step timings.
+
+Usage (from the repository root):
+    python -m benchmarks.cleaning_engines [--rows N] [--floats K] [--nan-frac F] [--engines pandas,sql,chunked]
+"""
+
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def build_frame(rows: int, floats: int, nan_frac: float, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {}
+    for j in range(floats):
+        values = rng.normal(loc=j, scale=j + 1, size=rows) if j % 2 == 0 else rng.exponential(scale=j + 1, size=rows)
+        values[rng.random(rows) < nan_frac] = np.nan
+        data[f"float_{j}"] = values
+    data["count"] = rng.integers(0, 1_000, size=rows)
+    text = rng.choice(np.array(["north", "south", "east", "west", "central"], dtype=object), size=rows, p=[0.3, 0.25, 0.2, 0.15, 0.1])
+    text[rng.random(rows) < nan_frac] = None
+    data["region"] = text
+    return pd.DataFrame(data)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--floats", type=int, default=6)
+    parser.add_argument("--nan-frac", type=float, default=0.05, help="Fraction of missing values in float/text columns")
+    parser.add_argument("--engines", default="pandas,sql", help="Comma-separated engines to run")
+    args = parser.parse_args()
+    engines = args.engines.split(",")
+
+    # The database lives under DATA_DIR, which is relative to the working directory
+    workdir = tempfile.mkdtemp(prefix="saga-bench-")
+    os.chdir(workdir)
+
+    from backend.database.init_db import init_database
+    from backend.database.utils import get_dataset_metadata, insert_dataset_metadata, load_dataframe_to_db, read_dataframe_from_db
+    from backend.ml.cleaning_pipeline import clean_dataset
+
+    init_database()
+    df = build_frame(args.rows, args.floats, args.nan_frac)
+    load_dataframe_to_db(df, "dataset_bench")
+    insert_dataset_metadata(dataset_id="bench", filename="bench.csv", table_name="dataset_bench")
+    print(f"Table: {args.rows:,} rows x {len(df.columns)} columns ({df.memory_usage(deep=True).sum() / 1e6:.0f} MB in pandas), scratch dir {workdir}")
+    del df
+
+    outputs = {}
+    for engine in engines:
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        result = clean_dataset("bench", engine=engine)
+        seconds = time.perf_counter() - start
+        rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        report = result["report"]
+        table = get_dataset_metadata(result["cleaned_dataset_id"])["table_name"]
+        outputs[engine] = read_dataframe_from_db(table)
+        print(
+            f"{engine:8s}: {seconds:7.2f} s  rows {report['rows_before']:,} -> {report['rows_after']:,}  "
+            f"peak RSS growth {(rss_after - rss_before) / 1024:.0f} MB  steps {report['timings_ms']}"
+        )
+        if "plan" in report:
+            print(f"          plan: {sorted({p['engine'] for p in report['plan'].values()})}")
+
+    if "pandas" in outputs and "sql" in outputs:
+        a, b = outputs["pandas"], outputs["sql"]
+        same_rows = len(a) == len(b)
+        close = same_rows and all(
+            np.allclose(a[c], b[c], rtol=1e-9, equal_nan=True) if a[c].dtype.kind in "if" else a[c].equals(b[c])
+            for c in a.columns
+        )
+        print(f"pandas and sql outputs match: {close}")
+        if not close:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
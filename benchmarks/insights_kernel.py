@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: fused numeric insights kernel vs the per-function pandas path.
+
+Builds a synthetic frame (default 1,000,000 rows x 50 numeric columns: a mix
+of floats, integers and correlated columns), runs both implementations, checks
+that their JSON output is identical and prints the timings.
+
+Usage (from the repository root):
+    python -m benchmarks.insights_kernel [--rows N] [--cols K] [--nan-frac F]
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.ml.insights_engine import numeric_summary, corelation_analysis, extremes
+from backend.ml.stats_kernel import numeric_insights
+
+
+def build_frame(rows: int, cols: int, nan_frac: float, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=rows)
+    data = {}
+    for j in range(cols):
+        kind = j % 3
+        if kind == 0:
+            values = rng.normal(loc=j * 10, scale=j + 1, size=rows)
+        elif kind == 1:
+            values = rng.integers(-10_000, 10_000, size=rows)
+        else:
+            values = base * (j % 7 + 1) + rng.normal(scale=0.5, size=rows)  # Correlated with `base`
+        if nan_frac and kind != 1:
+            values = values.astype(np.float64)
+            values[rng.random(rows) < nan_frac] = np.nan
+        data[f"col_{j}"] = values
+    return pd.DataFrame(data)
+
+
+def run_legacy(df: pd.DataFrame) -> dict:
+    return {
+        "numeric_summary": numeric_summary(df),
+        "correlations": corelation_analysis(df),
+        "extremes": extremes(df),
+    }
+
+
+def timed(fn, df: pd.DataFrame, repeat: int):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cols", type=int, default=50)
+    parser.add_argument("--nan-frac", type=float, default=0.0, help="Fraction of NaNs in float columns")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    df = build_frame(args.rows, args.cols, args.nan_frac)
+    print(f"Frame: {args.rows:,} rows x {args.cols} columns ({df.memory_usage().sum() / 1e6:.0f} MB)")
+
+    legacy_s, legacy = timed(run_legacy, df, args.repeat)
+    fused_s, fused = timed(numeric_insights, df, args.repeat)
+
+    identical = json.dumps(legacy) == json.dumps(fused)
+    print(f"pandas path : {legacy_s:8.2f} s")
+    print(f"fused kernel: {fused_s:8.2f} s")
+    print(f"speedup     : {legacy_s / fused_s:8.1f}x")
+    print(f"identical JSON output: {identical}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
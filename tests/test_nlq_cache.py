@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from backend.database.nlq_cache import _SchemaIndex, _schema_vocabulary, embed_question, normalize_question
+
+SCHEMA = """Table: products_sales
+Columns: product (TEXT, e.g. widget, gadget), region (TEXT, e.g. north, south), price (REAL), sales (INTEGER)"""
+
+
+def _index(question: str) -> _SchemaIndex:
+    normalized = normalize_question(question)
+    row = (1, normalized, "SELECT 1", embed_question(normalized).tobytes(), time.time())
+    return _SchemaIndex([row], _schema_vocabulary(SCHEMA))
+
+
+def _find(cached: str, question: str):
+    normalized = normalize_question(question)
+    return _index(cached).find(normalized, embed_question(normalized), 0.0)
+
+
+@pytest.mark.parametrize(
+    "cached, question",
+    [
+        (
+            "which region has the highest total sales for widget products",
+            "which region has the lowest total sales for widget products",
+        ),
+        ("list products ordered by price ascending", "list products ordered by price descending"),
+        ("number of products with sales not above average", "number of products with sales above average"),
+        ("number of products with sales above average", "number of products with sales below average"),
+        ("average price by region", "average price by product"),
+        ("average price by region", "total price by region"),
+    ],
+)
+def test_semantic_match_rejects_questions_with_different_meaning(cached, question):
+    assert _find(cached, question) is None
+    assert _find(question, cached) is None
+
+
+@pytest.mark.parametrize(
+    "cached, question",
+    [
+        ("what is the average price per region", "average price by region"),
+        ("what is the average price for each region", "average price per region"),
+    ],
+)
+def test_semantic_match_accepts_paraphrases(cached, question):
+    hit = _find(cached, question)
+    assert hit is not None and hit["match"] in ("exact", "semantic")
+
+
+def test_exact_match():
+    hit = _find("Average price by region?", "average  price by region")
+    assert hit["match"] == "exact"
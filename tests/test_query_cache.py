@@ -0,0 +1,36 @@
+import pytest
+
+from backend.database.query_cache import _is_volatile, normalize_sql
+
+
+@pytest.mark.parametrize(
+    "functions, sql",
+    [
+        ({"random"}, "SELECT random() AS r, a FROM t1 LIMIT 1"),
+        ({"current_timestamp"}, "SELECT CURRENT_TIMESTAMP FROM t1"),
+        ({"strftime"}, "select strftime('%f','now') from t1"),
+        ({"strftime"}, "select count(*) from t where d >= strftime('%Y-%m-%d')"),
+        ({"date"}, "select a from t1 where d > date('NOW', '-7 day')"),
+        ({"date"}, "select a from t1 where d > date()"),
+        ({"julianday"}, "select julianday() - julianday(d) from t1"),
+        ({"date", "strftime"}, "select date(d), strftime('%Y', 'now') from t1"),
+        ({"timediff"}, "select timediff(d, 'now') from t1"),
+        ({"date"}, 'select "date"() from t1'),
+    ],
+)
+def test_volatile_statements(functions, sql):
+    assert _is_volatile(functions, normalize_sql(sql))
+
+
+@pytest.mark.parametrize(
+    "functions, sql",
+    [
+        (set(), "select a from t1"),
+        ({"date"}, "select date(d), a from t1"),
+        ({"strftime"}, "select strftime('%Y-%m', d) as month, count(*) from t1 group by 1"),
+        ({"date"}, "select a from t1 where d > date('2024-01-01', '-7 day')"),
+        ({"strftime", "date"}, "select strftime('%Y', date(d, '+1 day')) from t1 where b = 'now'"),
+    ],
+)
+def test_deterministic_statements(functions, sql):
+    assert not _is_volatile(functions, normalize_sql(sql))